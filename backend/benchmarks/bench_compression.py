@@ -0,0 +1,111 @@
+"""
+Compression benchmark: bytes saved and CPU cost of gzip and brotli
+for typical weather and list payloads.
+Run from backend folder: python -m benchmarks.bench_compression
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, ".")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "planner_outdoor.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from po_app.compact_forecast import CompactForecast  # noqa: E402
+from po_app.middleware import compress, compressed_body_cache, get_response_compression_settings  # noqa: E402
+from po_app.weather import (  # noqa: E402
+    build_all_forecast_details,
+    build_daily_forecast,
+    build_weather_response,
+    iter_hourly_forecast,
+)
+from benchmarks.bench_forecast_memory import make_payload  # noqa: E402
+
+LEVELS = [("gzip", 1), ("gzip", 6), ("gzip", 9), ("br", 1), ("br", 5), ("br", 11)]
+
+
+def build_payload_data():
+    """
+    Return data of typical responses by name.
+    """
+    weather_data = CompactForecast.from_raw_data(make_payload(0))
+    activities = [
+        {"id": index, "name": f"Activity {index}", "description": "Explore nature and discover natural trails"}
+        for index in range(17)
+    ]
+    planned_activities = [
+        {
+            "id": index,
+            "user": 1,
+            "activity": index % 17,
+            "location": {"name": "Lyon", "lat": 45.7578137, "lon": 4.8320114, "country": "FR"},
+            "start_datetime": "2025-01-01T10:00:00Z",
+            "end_datetime": "2025-01-01T12:00:00Z",
+        }
+        for index in range(200)
+    ]
+    return {
+        "weather (15 days)": build_weather_response(build_daily_forecast(weather_data), False),
+        "weather-details (all days)": build_weather_response(build_all_forecast_details(weather_data), False),
+        "weather-hourly (168 hours)": {"data": list(iter_hourly_forecast(weather_data, range(168), [
+            "temperature", "humidity", "sea_level", "wind", "rain", "snow", "iso0", "clouds", "weather",
+        ]))},
+        "activities list": activities,
+        "planned activities list (200)": planned_activities,
+    }
+
+
+def build_payloads():
+    """
+    Return rendered JSON payloads by name.
+    """
+    renderer = JSONRenderer()
+    return {name: renderer.render(data) for name, data in build_payload_data().items()}
+
+
+def measure(content, encoding, level, iterations):
+    """
+    Return (compressed size, microseconds per compression).
+    """
+    compression_settings = {"GZIP_LEVEL": level, "BROTLI_QUALITY": level}
+    started = time.perf_counter()
+    for _ in range(iterations):
+        body = compress(content, encoding, compression_settings)
+    return len(body), (time.perf_counter() - started) / iterations * 1e6
+
+
+def measure_cache_hit(content, iterations):
+    """
+    Return microseconds per compressed body cache hit.
+    """
+    key = ('"etag"', "application/json", "br")
+    compressed_body_cache.set(key, compress(content, "br", get_response_compression_settings()))
+    started = time.perf_counter()
+    for _ in range(iterations):
+        compressed_body_cache.get(key)
+    compressed_body_cache.clear()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    for name, content in build_payloads().items():
+        print(f"\n{name}: {len(content)} bytes")
+        print(f"  {'encoding':<10}{'level':>6}{'bytes':>10}{'saved':>8}{'cpu (us)':>12}")
+        for encoding, level in LEVELS:
+            size, cpu = measure(content, encoding, level, args.iterations)
+            saved = 100 * (1 - size / len(content))
+            print(f"  {encoding:<10}{level:>6}{size:>10}{saved:>7.1f}%{cpu:>12.1f}")
+        print(f"  cached compressed body: {measure_cache_hit(content, args.iterations * 10):.2f} us")
+
+
+if __name__ == "__main__":
+    main()
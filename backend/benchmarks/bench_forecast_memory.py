@@ -0,0 +1,100 @@
+"""
+Memory benchmark: Meteofrance forecast dict payloads vs compact columnar forecasts.
+Run from backend folder: python -m benchmarks.bench_forecast_memory --locations 10000
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, ".")
+
+from po_app.compact_forecast import CompactForecast  # noqa: E402
+
+
+def make_payload(index, days=15):
+    """
+    Build a payload shaped like a Meteofrance forecast API response.
+    """
+    start_dt = 1735689600
+    daily_forecast = [
+        {
+            "dt": start_dt + day * 86400,
+            "T": {"min": 2.0 + day + index % 7, "max": 10.0 + day, "sea": None},
+            "humidity": {"min": 40 + day, "max": 80 + day},
+            "precipitation": {"24h": 0.5 * day},
+            "uv": 2,
+            "weather12H": {"icon": "p2j", "desc": "Sunny"},
+            "sun": {"rise": start_dt + day * 86400 + 28800, "set": start_dt + day * 86400 + 61200},
+        }
+        for day in range(days)
+    ]
+    forecast = [
+        {
+            "dt": start_dt + hour * 3600,
+            "T": {"value": 5.0 + hour % 10 + index % 3, "windchill": 3.0},
+            "humidity": 70,
+            "sea_level": 1015.5,
+            "wind": {"speed": 10 + hour % 20, "gust": 0, "direction": 90, "icon": "E"},
+            "rain": {"1h": 0.2 * (hour % 3)},
+            "snow": {"1h": 0},
+            "iso0": 1500 + hour,
+            "rain snow limit": "Non pertinent",
+            "clouds": 30,
+            "weather": {"icon": "p2j", "desc": "Sunny"},
+        }
+        for hour in range(days * 24)
+    ]
+    return {
+        "position": {
+            "lat": 42.0 + index * 0.001,
+            "lon": 2.0 + index * 0.001,
+            "alti": 35,
+            "name": f"Place {index}",
+            "country": "FR - France",
+            "dept": "75",
+            "timezone": "Europe/Paris",
+        },
+        "updated_on": 1735686000,
+        "daily_forecast": daily_forecast,
+        "forecast": forecast,
+    }
+
+
+def measure(build, locations):
+    """
+    Return (retained bytes, seconds) to build forecasts for locations.
+    """
+    tracemalloc.start()
+    started = time.perf_counter()
+    forecasts = [build(index) for index in range(locations)]
+    elapsed = time.perf_counter() - started
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del forecasts
+    return retained, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--locations", type=int, default=10000)
+    parser.add_argument("--days", type=int, default=15)
+    args = parser.parse_args()
+
+    dict_bytes, dict_seconds = measure(
+        lambda index: make_payload(index, args.days), args.locations)
+    compact_bytes, compact_seconds = measure(
+        lambda index: CompactForecast.from_raw_data(make_payload(index, args.days)),
+        args.locations)
+
+    mega = 1024 * 1024
+    print(f"locations: {args.locations}, days: {args.days}")
+    print(f"dict payloads:      {dict_bytes / mega:8.1f} MiB "
+          f"({dict_bytes / args.locations / 1024:.1f} KiB/location) in {dict_seconds:.1f}s")
+    print(f"compact forecasts:  {compact_bytes / mega:8.1f} MiB "
+          f"({compact_bytes / args.locations / 1024:.1f} KiB/location) in {compact_seconds:.1f}s")
+    print(f"memory ratio:       {dict_bytes / compact_bytes:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+JSON benchmark: DRF JSONRenderer/JSONParser vs orjson renderer/parser
+on typical weather and list payloads.
+Run from backend folder: python -m benchmarks.bench_json
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, ".")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "planner_outdoor.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from po_app.renderers import OrjsonParser, OrjsonRenderer  # noqa: E402
+from benchmarks.bench_compression import build_payload_data  # noqa: E402
+
+
+def timed(fn, iterations):
+    """
+    Return microseconds per call of fn.
+    """
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{'payload':<32}{'bytes':>8}{'render drf':>12}{'orjson':>9}{'x':>6}"
+          f"{'parse drf':>12}{'orjson':>9}{'x':>6}  (us)")
+    for name, data in build_payload_data().items():
+        content = JSONRenderer().render(data)
+        if OrjsonRenderer().render(data) != content:
+            print(f"{name}: orjson output differs from JSONRenderer output")
+        render_drf = timed(lambda: JSONRenderer().render(data), args.iterations)
+        render_orjson = timed(lambda: OrjsonRenderer().render(data), args.iterations)
+        parse_drf = timed(lambda: JSONParser().parse(io.BytesIO(content)), args.iterations)
+        parse_orjson = timed(lambda: OrjsonParser().parse(io.BytesIO(content)), args.iterations)
+        print(f"{name:<32}{len(content):>8}{render_drf:>12.1f}{render_orjson:>9.1f}"
+              f"{render_drf / render_orjson:>6.1f}{parse_drf:>12.1f}{parse_orjson:>9.1f}"
+              f"{parse_drf / parse_orjson:>6.1f}")
+
+
+if __name__ == "__main__":
+    main()
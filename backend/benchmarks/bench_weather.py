@@ -0,0 +1,234 @@
+"""
+Weather endpoints benchmark against the offline stub server:
+throughput and p50/p95/p99 latencies, cold (every location is a cache miss)
+and warm (same locations again, served from caches).
+Run from backend folder: python -m benchmarks.bench_weather --output before.json
+then after a change: python -m benchmarks.bench_weather --compare before.json
+A test database is created, the configured database is left untouched
+(with SQLite, run geocoding with --concurrency 1, concurrent cache writes lock it).
+With --background N, N threads fetch other forecasts in the background lane
+during the run, like a bulk prefetch competing with user requests.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import requests
+
+sys.path.insert(0, ".")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "planner_outdoor.settings")
+
+from benchmarks.stub_server import StubServer, load_payloads  # noqa: E402
+
+ENDPOINTS = {
+    "weather": lambda lat, lon, index: f"/weather/{lat}/{lon}/",
+    "weather-details": lambda lat, lon, index: f"/weather-details/{lat}/{lon}/{index % 10}/",
+    "weather-details-all": lambda lat, lon, index: f"/weather-details/{lat}/{lon}/",
+    "geocoding": lambda lat, lon, index: f"/geocoding/benchcity{index}/",
+}
+
+
+def location(index):
+    """
+    Return coordinates of location index, each one in its own forecast grid cell.
+    """
+    return round(43 + index // 100 * 0.05, 4), round(-1 + index % 100 * 0.05, 4)
+
+
+def reset_caches():
+    """
+    Empty forecast, geocoding and compressed body caches, close circuit breakers.
+    """
+    from po_app.circuit_breaker import meteofrance_breaker, openweathermap_breaker
+    from po_app.forecast_cache import forecast_cache
+    from po_app.middleware import compressed_body_cache
+    from po_app.models import GeocodingCache
+
+    forecast_cache.clear()
+    compressed_body_cache.clear()
+    meteofrance_breaker.reset()
+    openweathermap_breaker.reset()
+    GeocodingCache.objects.all().delete()
+
+
+def run_phase(paths, concurrency):
+    """
+    Request paths with concurrency clients.
+    Return latencies in milliseconds, error count and elapsed seconds.
+    """
+    from django.test import Client
+
+    local = threading.local()
+
+    def request(path):
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = Client(raise_request_exception=False)
+        started = time.perf_counter()
+        status = client.get(path).status_code
+        return (time.perf_counter() - started) * 1000, status >= 400
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(request, paths))
+    elapsed = time.perf_counter() - started
+    return [latency for latency, _ in results], sum(error for _, error in results), elapsed
+
+
+def run_background_load(threads, stop_event, report):
+    """
+    Fetch forecasts of locations no request asks for, in the background lane,
+    with threads workers until stop_event is set. Count calls and errors in report.
+    """
+    from po_app.lanes import background_lane
+    from po_app.weather import fetch_forecast
+
+    counter = iter(range(10**6))
+    lock = threading.Lock()
+
+    @background_lane()
+    def work():
+        while not stop_event.is_set():
+            with lock:
+                index = next(counter)
+            lat, lon = location(index)
+            try:
+                fetch_forecast(lat + 5, lon)
+                key = "calls"
+            except Exception:
+                key = "errors"
+            with lock:
+                report[key] += 1
+
+    workers = [threading.Thread(target=work, daemon=True) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    return workers
+
+
+def get_upstream_calls(stub, stub_url):
+    """
+    Return the stub server request counts.
+    """
+    if stub is not None:
+        return dict(stub.counts)
+    return requests.get(f"{stub_url}/__stats", timeout=5).json()
+
+
+def run_benchmark(endpoints, requests_count, concurrency, stub=None, stub_url=None, background=0):
+    """
+    Run cold then warm phases of each endpoint, return results by "endpoint cold|warm".
+    """
+    results = {}
+    stop_event = threading.Event()
+    background_report = {"calls": 0, "errors": 0}
+    workers = run_background_load(background, stop_event, background_report)
+    for name in endpoints:
+        paths = [ENDPOINTS[name](*location(index), index) for index in range(requests_count)]
+        reset_caches()
+        for phase in ("cold", "warm"):
+            calls_before = sum(get_upstream_calls(stub, stub_url).values())
+            latencies, errors, elapsed = run_phase(paths, concurrency)
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            results[f"{name} {phase}"] = {
+                "requests": len(paths),
+                "errors": errors,
+                "throughput": len(paths) / elapsed,
+                "p50": p50,
+                "p95": p95,
+                "p99": p99,
+                "upstream_calls": sum(get_upstream_calls(stub, stub_url).values()) - calls_before,
+            }
+    stop_event.set()
+    for worker in workers:
+        worker.join()
+    if background:
+        print(f"background: {background_report['calls']} calls, {background_report['errors']} errors")
+    return results
+
+
+def print_results(results, baseline=None, threshold=10):
+    """
+    Print results, with change against baseline results and regressions
+    when throughput drops or p95 rises more than threshold percent.
+    """
+    print(f"{'endpoint':<28}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'errors':>8}{'upstream':>10}" + ("   vs baseline" if baseline else ""))
+    for name, result in results.items():
+        line = (f"{name:<28}{result['throughput']:>9.1f}{result['p50']:>9.2f}{result['p95']:>9.2f}"
+                f"{result['p99']:>9.2f}{result['errors']:>8}{result['upstream_calls']:>10}")
+        if baseline and name in baseline:
+            throughput = 100 * (result["throughput"] / baseline[name]["throughput"] - 1)
+            p95 = 100 * (result["p95"] / baseline[name]["p95"] - 1)
+            # sub-millisecond p95 changes of warm phases are noise
+            regression = throughput < -threshold or (
+                p95 > threshold and result["p95"] - baseline[name]["p95"] > 1)
+            line += f"   req/s {throughput:+.0f}%, p95 {p95:+.0f}%" + ("  REGRESSION" if regression else "")
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS),
+                        help="Comma separated endpoints: " + ", ".join(ENDPOINTS))
+    parser.add_argument("--requests", type=int, default=200, help="Requests (distinct locations) per phase.")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=50, help="Stub server latency.")
+    parser.add_argument("--jitter-ms", type=float, default=10)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--payloads", default=None, help="Folder of recorded payloads.")
+    parser.add_argument("--stub-url", default=None, help="Use a running stub server instead.")
+    parser.add_argument("--output", default=None, help="Save results to a JSON file.")
+    parser.add_argument("--compare", default=None, help="Compare with results of a JSON file.")
+    parser.add_argument("--threshold", type=float, default=10, help="Regression threshold in percent.")
+    parser.add_argument("--keep-quota", action="store_true", help="Apply UPSTREAM_QUOTA budgets.")
+    parser.add_argument("--background", type=int, default=0, help="Background forecast fetching threads.")
+    args = parser.parse_args()
+
+    stub, stub_url = None, args.stub_url
+    if stub_url is None:
+        stub = StubServer(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                          error_rate=args.error_rate, payloads=load_payloads(args.payloads), seed=0)
+        stub_url = stub.start()
+    # upstream clients read their URLs from settings at import
+    os.environ["METEOFRANCE_URL"] = stub_url
+    os.environ["GEOCODING_URL"] = f"{stub_url}/geo/1.0/direct"
+
+    import django
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    django.setup()
+    setup_test_environment()
+    if not args.keep_quota:
+        from po_app.quota import upstream_ledger
+        for ledger in upstream_ledger.providers.values():
+            ledger.bucket.rate = 0
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        results = run_benchmark(args.endpoints.split(","), args.requests, args.concurrency, stub, stub_url,
+                                args.background)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+        if stub is not None:
+            stub.stop()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+    print_results(results, baseline, args.threshold)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
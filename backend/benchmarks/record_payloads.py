@@ -0,0 +1,71 @@
+"""
+Record Meteofrance and Openweathermap geocoding responses for the stub server.
+Run from backend folder, with network access:
+python -m benchmarks.record_payloads --output payloads --lat 48.85 --lon 2.35 --department 75 --cities Paris Lyon
+then replay them: python -m benchmarks.stub_server --payloads payloads
+Geocoding is only recorded with OWM_API_KEY set in the environment.
+"""
+from meteofrance_api.session import MeteoFranceSession
+import argparse
+import json
+import os
+
+import requests
+
+GEOCODING_URL = "http://api.openweathermap.org/geo/1.0/direct"
+TIMEOUT = 10
+
+
+def record_meteofrance(session, lat, lon, department):
+    """
+    Return forecast, rain and warning payloads by route name.
+    """
+    position = {"lat": lat, "lon": lon, "lang": "fr"}
+    return {
+        "forecast": session.request("get", "forecast", params=position, timeout=TIMEOUT).json(),
+        "rain": session.request("get", "rain", params=position, timeout=TIMEOUT).json(),
+        "warning": session.request(
+            "get", "v3/warning/currentphenomenons", params={"domain": department, "depth": 0}, timeout=TIMEOUT,
+        ).json(),
+    }
+
+
+def record_geocoding(cities, api_key):
+    """
+    Return Openweathermap results by city, keyed by the query the app sends.
+    """
+    results = {}
+    for city in cities:
+        query = " ".join(city.split()).casefold()
+        response = requests.get(
+            GEOCODING_URL, params={"q": query, "limit": 10, "appid": api_key}, timeout=TIMEOUT)
+        response.raise_for_status()
+        results[query] = response.json()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default="payloads", help="Folder of recorded payloads.")
+    parser.add_argument("--lat", type=float, default=48.85)
+    parser.add_argument("--lon", type=float, default=2.35)
+    parser.add_argument("--department", default="75")
+    parser.add_argument("--cities", nargs="*", default=["Paris", "Lyon", "Marseille"])
+    args = parser.parse_args()
+
+    payloads = record_meteofrance(MeteoFranceSession(), args.lat, args.lon, args.department)
+    api_key = os.environ.get("OWM_API_KEY")
+    if api_key:
+        payloads["geocoding"] = record_geocoding(args.cities, api_key)
+    else:
+        print("OWM_API_KEY not set, geocoding not recorded.")
+
+    os.makedirs(args.output, exist_ok=True)
+    for name, payload in payloads.items():
+        with open(os.path.join(args.output, f"{name}.json"), "w", encoding="utf-8") as file:
+            json.dump(payload, file, ensure_ascii=False)
+    print(f"Recorded {', '.join(payloads)} in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
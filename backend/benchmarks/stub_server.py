@@ -0,0 +1,235 @@
+"""
+Offline stub of Meteofrance and Openweathermap geocoding APIs,
+serving payloads with configurable latency and error rate.
+Run from backend folder: python -m benchmarks.stub_server --port 8900 --latency-ms 80
+then start django with METEOFRANCE_URL=http://localhost:8900
+and GEOCODING_URL=http://localhost:8900/geo/1.0/direct.
+Payloads are synthetic, shaped like upstream responses. Recorded ones are read
+from --payloads folder (forecast.json, geocoding.json, rain.json, warning.json),
+recorded with: python -m benchmarks.record_payloads --output <folder>
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import zlib
+
+sys.path.insert(0, ".")
+
+from benchmarks.bench_forecast_memory import make_payload  # noqa: E402
+
+ROUTES = {
+    "/forecast": "forecast",
+    "/rain": "rain",
+    "/v3/warning/currentphenomenons": "warning",
+    "/geo/1.0/direct": "geocoding",
+}
+
+
+def make_rain_payload(start_dt=1735689600):
+    """
+    Build a payload shaped like a Meteofrance rain API response.
+    """
+    return {
+        "position": {"lat": 48.85, "lon": 2.35, "timezone": "Europe/Paris"},
+        "updated_on": start_dt,
+        "quality": 0,
+        "forecast": [
+            {"dt": start_dt + index * 300, "rain": 1 + index % 3, "desc": "Rain" if index % 3 else "Dry"}
+            for index in range(12)
+        ],
+    }
+
+
+def make_warning_payload(department="75"):
+    """
+    Build a payload shaped like a Meteofrance current phenomenons API response.
+    """
+    return {
+        "update_time": 1735686000,
+        "end_validity_time": 1735772400,
+        "domain_id": department,
+        "phenomenons_max_colors": [
+            {"phenomenon_id": str(phenomenon_id), "phenomenon_max_color_id": 1}
+            for phenomenon_id in range(1, 10)
+        ],
+    }
+
+
+def load_payloads(folder=None):
+    """
+    Return payloads by route name, recorded ones from folder, otherwise synthetic.
+    geocoding.json maps city names to Openweathermap results.
+    """
+    payloads = {
+        "forecast": make_payload(0),
+        "rain": make_rain_payload(),
+        "warning": make_warning_payload(),
+        "geocoding": {},
+    }
+    for name in payloads:
+        path = os.path.join(folder or "", f"{name}.json")
+        if folder and os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                payloads[name] = json.load(file)
+    return payloads
+
+
+def fake_geocoding(city):
+    """
+    Return stable Openweathermap-like results of an unknown city,
+    no result for names starting with "unknown".
+    """
+    if city.lower().startswith("unknown"):
+        return []
+    seed = zlib.crc32(city.encode())
+    return [{
+        "name": city.title(),
+        "lat": round(42 + seed % 8000 / 1000, 4),
+        "lon": round(-4 + seed // 8000 % 12000 / 1000, 4),
+        "country": "FR",
+    }]
+
+
+class StubServer():
+    """
+    Threaded HTTP server replaying payloads.
+    Each request waits latency_ms (+/- jitter_ms), then fails
+    with a 503 at error_rate, otherwise returns the payload.
+    """
+
+    def __init__(self, port=0, latency_ms=0, jitter_ms=0, error_rate=0, payloads=None, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.payloads = payloads or load_payloads()
+        self.random = random.Random(seed)
+        self.counts = {}
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self.build_handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        """
+        Return the base URL of the server.
+        """
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def build_handler(self):
+        """
+        Return the request handler class bound to this server.
+        """
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def count(self, name):
+        """
+        Count a request of route name.
+        """
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def handle(self, handler):
+        """
+        Answer a request with delay, error or payload.
+        """
+        url = urlparse(handler.path)
+        if url.path == "/__stats":
+            with self._lock:
+                return self.send_json(handler, 200, dict(self.counts))
+        name = ROUTES.get(url.path)
+        if name is None:
+            return self.send_json(handler, 404, {"error": "Not found."})
+        self.count(name)
+        with self._lock:
+            delay = max(0, self.latency_ms + self.random.uniform(-self.jitter_ms, self.jitter_ms))
+            failed = self.random.random() < self.error_rate
+        time.sleep(delay / 1000)
+        if failed:
+            self.count("errors")
+            return self.send_json(handler, 503, {"error": "Service unavailable."})
+
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if name == "geocoding":
+            city = query.get("q", "")
+            return self.send_json(handler, 200, self.payloads["geocoding"].get(city, fake_geocoding(city)))
+        payload = self.payloads[name]
+        if name in ("forecast", "rain") and "lat" in query:
+            payload = {**payload, "position": {
+                **payload["position"], "lat": float(query["lat"]), "lon": float(query["lon"])}}
+        elif name == "warning":
+            payload = {**payload, "domain_id": query.get("domain", payload["domain_id"])}
+        return self.send_json(handler, 200, payload)
+
+    def send_json(self, handler, status, data):
+        """
+        Write a JSON response.
+        """
+        body = json.dumps(data).encode()
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def reset_counts(self):
+        """
+        Reset request counters.
+        """
+        with self._lock:
+            self.counts = {}
+
+    def start(self):
+        """
+        Serve in a background thread, return the base URL.
+        """
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="stub-server", daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        """
+        Stop serving and close the socket.
+        """
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--jitter-ms", type=float, default=10)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--payloads", default=None, help="Folder of recorded payloads.")
+    args = parser.parse_args()
+
+    stub = StubServer(args.port, args.latency_ms, args.jitter_ms, args.error_rate, load_payloads(args.payloads))
+    print(f"Stub server on {stub.url} (stats on {stub.url}/__stats)")
+    synthetic = [name for name in ROUTES.values()
+                 if not args.payloads or not os.path.exists(os.path.join(args.payloads, f"{name}.json"))]
+    if synthetic:
+        print(f"Synthetic payloads: {', '.join(synthetic)}")
+    try:
+        stub.httpd.serve_forever()
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -56,6 +56,7 @@ AUTHENTICATION_BACKENDS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'po_app.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.middleware.security.SecurityMiddleware',
@@ -138,6 +139,15 @@ REST_FRAMEWORK = {
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
+    "DEFAULT_RENDERER_CLASSES": (
+        "po_app.renderers.OrjsonRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "po_app.renderers.OrjsonParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
     "DEFAULT_SCHEMA_CLASS": ("drf_spectacular.openapi.AutoSchema"),
 }
 
@@ -184,6 +194,197 @@ SPECTACULAR_SETTINGS = {
     # OTHER SETTINGS
 }
 
+# Forecast cache, shared by weather views
+# TTL: seconds a forecast is fresh, HARD_TTL: seconds a stale forecast
+# is still served while it is refreshed in background
+# GRID_RESOLUTION in degrees, close to Meteofrance model resolution
+# DB_LOCK: one upstream call per grid cell at a time across all workers (MySQL),
+# the others get its forecast from FORECAST_SNAPSHOTS, which must be enabled
+FORECAST_CACHE = {
+    "TTL": 900,
+    "HARD_TTL": 3600,
+    "REFRESH_WORKERS": 2,
+    "MAX_ENTRIES": 5000,
+    "GRID_RESOLUTION": 0.025,
+    "DB_LOCK": False,
+    "DB_LOCK_TIMEOUT": 10,
+}
+
+# Forecast snapshots: fetched forecasts stored delta-compressed by grid cell (ForecastSnapshots)
+# workers load snapshots fetched within WARM_MAX_AGE seconds into their cache on startup
+# a keyframe is stored every KEYFRAME_INTERVAL snapshots of a cell, COMPRESSION_LEVEL from 1 to 9
+# snapshots older than RETENTION_DAYS are deleted by forecast_snapshots --prune
+# BASE_CACHE_ENTRIES: latest snapshots kept in memory to compress the next ones
+FORECAST_SNAPSHOTS = {
+    "ENABLED": False,
+    "WARM_ON_STARTUP": True,
+    "WARM_MAX_AGE": 10800,
+    "KEYFRAME_INTERVAL": 24,
+    "COMPRESSION_LEVEL": 6,
+    "RETENTION_DAYS": 30,
+    "BASE_CACHE_ENTRIES": 500,
+}
+
+# Circuit breakers for Meteofrance and Openweathermap APIs
+# open after FAILURE_THRESHOLD consecutive failures,
+# allow a trial call after RECOVERY_TIMEOUT seconds
+CIRCUIT_BREAKER = {
+    "FAILURE_THRESHOLD": 5,
+    "RECOVERY_TIMEOUT": 30,
+}
+
+# Background prefetch of upcoming planned activities forecasts
+# INTERVAL: seconds between runs of the background jobs, 0 to disable (prefetch_forecasts command)
+# REFRESH_MARGIN: refresh cached forecasts expiring within these seconds
+FORECAST_PREFETCH = {
+    "INTERVAL": 0,
+    "HORIZON_DAYS": 15,
+    "REFRESH_MARGIN": 300,
+}
+
+# Popular locations cache warming, before peak hours
+# SCHEDULE: "HH:MM" run times in TIME_ZONE, empty to disable (warm_popular_forecasts command)
+# locations are ranked by requests of the last WINDOW_HOURS and users living there,
+# the TOP_N ones are fetched if missing or expiring within REFRESH_MARGIN seconds,
+# at most BUDGET upstream calls per run
+# with forecast snapshots, each process adds its requests counts to LocationRequests
+# every FLUSH_INTERVAL seconds (0 to disable), so locations are ranked by requests of all processes
+CACHE_WARMING = {
+    "SCHEDULE": [],
+    "TOP_N": 300,
+    "BUDGET": 100,
+    "WINDOW_HOURS": 24,
+    "REQUEST_WEIGHT": 1,
+    "USER_WEIGHT": 1,
+    "REFRESH_MARGIN": 300,
+    "FLUSH_INTERVAL": 60,
+}
+
+# Meteofrance weather warnings fan-out to users with upcoming planned activities
+# INTERVAL: seconds between runs, 0 to disable (notify_weather_warnings command)
+# MIN_COLOR: lowest warning level notified, 2 yellow, 3 orange, 4 red
+# BATCH_SIZE: emails sent per batch over one mail connection
+WEATHER_WARNINGS = {
+    "INTERVAL": 0,
+    "HORIZON_HOURS": 48,
+    "MIN_COLOR": 3,
+    "BATCH_SIZE": 100,
+    "FROM_EMAIL": "noreply@po-team.com",
+}
+
+# Next hour rain nowcast of planned activities starting within WINDOW_MINUTES
+# INTERVAL: seconds between polls, 0 to disable (poll_rain_nowcasts command)
+# REFRESH_INTERVAL: seconds before a location nowcast is fetched again,
+# nowcasts older than MAX_AGE seconds are not served
+RAIN_NOWCAST = {
+    "INTERVAL": 0,
+    "WINDOW_MINUTES": 60,
+    "REFRESH_INTERVAL": 300,
+    "MAX_AGE": 900,
+}
+
+# Weather batch endpoint limits
+# MAX_WORKERS: concurrent upstream calls shared by all batch requests
+WEATHER_BATCH = {
+    "MAX_LOCATIONS": 50,
+    "MAX_WORKERS": 8,
+}
+
+# Geocoding results cache, stored in database
+# TTL in seconds, NEGATIVE_TTL for "City not found" answers
+GEOCODING_CACHE = {
+    "TTL": 30 * 86400,
+    "NEGATIVE_TTL": 86400,
+}
+
+# Offline gazetteer, imported with import_gazetteer command
+# geocoding uses it first and calls Openweathermap only on a miss
+# reverse geocoding returns REVERSE_LIMIT places within REVERSE_MAX_DISTANCE_KM,
+# spatial index CELL_SIZE in degrees
+GAZETTEER = {
+    "ENABLED": True,
+    "LIMIT": 10,
+    "REVERSE_LIMIT": 5,
+    "REVERSE_MAX_DISTANCE_KM": 50,
+    "CELL_SIZE": 0.25,
+}
+
+# HTTP caching of responses: weather max-age follows FORECAST_CACHE TTL,
+# geocoding max-age in seconds
+HTTP_CACHE = {
+    "GEOCODING_MAX_AGE": 86400,
+}
+
+# Response compression, brotli or gzip negotiated with Accept-Encoding
+# MIN_SIZE in bytes, CACHE_ENTRIES: compressed bodies of responses with an ETag
+RESPONSE_COMPRESSION = {
+    "MIN_SIZE": 1024,
+    "GZIP_LEVEL": 6,
+    "BROTLI_QUALITY": 5,
+    "CACHE_ENTRIES": 1000,
+}
+
+# Pooled HTTP clients for Meteofrance and Openweathermap APIs
+# timeouts in seconds, RETRY_STATUSES are retried on GET only,
+# with a random backoff up to BACKOFF_MAX seconds
+# METEOFRANCE_URL and GEOCODING_URL can point to the benchmarks stub server
+UPSTREAM_HTTP = {
+    "METEOFRANCE_URL": os.environ.get("METEOFRANCE_URL", "https://webservice.meteofrance.com"),
+    "GEOCODING_URL": os.environ.get("GEOCODING_URL", "http://api.openweathermap.org/geo/1.0/direct"),
+    "CONNECT_TIMEOUT": 3,
+    "READ_TIMEOUT": 10,
+    "POOL_CONNECTIONS": 10,
+    "POOL_MAXSIZE": 20,
+    "MAX_RETRIES": 2,
+    "BACKOFF_FACTOR": 0.3,
+    "BACKOFF_MAX": 2,
+    "RETRY_STATUSES": [429, 502, 503, 504],
+}
+
+# Upstream quotas, a token bucket per provider in each worker process
+# (divide provider quotas by the number of workers)
+# RATE: calls per second, 0 for no limit, BURST: calls allowed at once
+# calls wait up to MAX_WAIT seconds for the budget, then are refused (503)
+UPSTREAM_QUOTA = {
+    "Meteofrance": {"RATE": 5, "BURST": 20, "MAX_WAIT": 2},
+    "Openweathermap": {"RATE": 1, "BURST": 60, "MAX_WAIT": 2},
+}
+
+# Upstream calls lanes: user requests are interactive, prefetch, nowcast and warnings jobs background
+# background calls of a provider run BACKGROUND_CONCURRENCY at most, wait while INTERACTIVE_BUSY
+# interactive calls are running, never spend the INTERACTIVE_RESERVE share of BURST,
+# and are dropped after BACKGROUND_MAX_WAIT seconds
+UPSTREAM_LANES = {
+    "BACKGROUND_CONCURRENCY": 2,
+    "INTERACTIVE_BUSY": 4,
+    "INTERACTIVE_RESERVE": 0.5,
+    "BACKGROUND_MAX_WAIT": 60,
+}
+
+# Hourly forecast endpoint paging, items are streamed in chunks of STREAM_CHUNK hours
+WEATHER_HOURLY = {
+    "PAGE_SIZE": 48,
+    "MAX_PAGE_SIZE": 168,
+    "STREAM_CHUNK": 24,
+}
+
+# Activity weather scoring
+# windows are consecutive forecast hours scoring at least MIN_SCORE (0 to 1)
+# a checked value missing from the forecast scores MISSING_SCORE
+ACTIVITY_SCORING = {
+    "MIN_SCORE": 0.6,
+    "MAX_WINDOWS": 5,
+    "MISSING_SCORE": 0.5,
+}
+
+# Background jobs: prefetch, warnings, nowcast and cache warming schedulers
+# started on startup of every process if START_BACKGROUND_JOBS is "True", for single process servers only,
+# otherwise run in one dedicated process: python manage.py run_background_jobs
+START_BACKGROUND_JOBS = os.environ.get("START_BACKGROUND_JOBS", "False") == "True"
+
+# Serve weather and geocoding with async views (ASGI server required)
+WEATHER_ASYNC_VIEWS = os.environ.get("WEATHER_ASYNC_VIEWS", "False") == "True"
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
 
@@ -14,6 +14,7 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path
 from po_app.validators_views import ValidationRulesView
@@ -36,9 +37,25 @@ from drf_spectacular.views import (
 )
 from po_app.weather import (
     GeocodingView,
+    ReverseGeocodingView,
     WeatherView,
     WeatherDetailsView,
+    WeatherHourlyView,
+    WeatherBatchView,
+    ActivityWeatherView,
+    WeatherCacheStatsView,
 )
+from po_app.async_weather import (
+    AsyncGeocodingView,
+    AsyncWeatherView,
+    AsyncWeatherDetailsView,
+)
+
+# async weather views need an ASGI server, synchronous views are the fallback
+if settings.WEATHER_ASYNC_VIEWS:
+    GeocodingView = AsyncGeocodingView
+    WeatherView = AsyncWeatherView
+    WeatherDetailsView = AsyncWeatherDetailsView
 
 urlpatterns = [
     # django admin console
@@ -154,6 +171,11 @@ urlpatterns = [
         GeocodingView.as_view(),
         name="geocoding",
     ),
+    path(
+        "reverse-geocoding/<path:lat>/<path:lon>/",
+        ReverseGeocodingView.as_view(),
+        name="reverse-geocoding",
+    ),
     path(
         "weather/<path:lat>/<path:lon>/",
         WeatherView.as_view(),
@@ -164,6 +186,31 @@ urlpatterns = [
         WeatherDetailsView.as_view(),
         name="weather-details",
     ),
+    path(
+        "weather-details/<path:lat>/<path:lon>/",
+        WeatherDetailsView.as_view(),
+        name="weather-details-all",
+    ),
+    path(
+        "weather-hourly/<path:lat>/<path:lon>/",
+        WeatherHourlyView.as_view(),
+        name="weather-hourly",
+    ),
+    path(
+        "weather-batch/",
+        WeatherBatchView.as_view(),
+        name="weather-batch",
+    ),
+    path(
+        "activity-weather/<path:lat>/<path:lon>/",
+        ActivityWeatherView.as_view(),
+        name="activity-weather",
+    ),
+    path(
+        "weather-cache-stats/",
+        WeatherCacheStatsView.as_view(),
+        name="weather-cache-stats",
+    ),
     # Documentation API endpoints
     path(
         "schema/",
@@ -1,8 +1,29 @@
 from django.contrib import admin
-from .models import Users, Activities, UserActivities, PlannedActivities
+from .models import (
+    Users,
+    Activities,
+    UserActivities,
+    PlannedActivities,
+    GeocodingCache,
+    Places,
+    ActivityWeatherThresholds,
+    LocationDepartments,
+    WeatherWarningNotifications,
+    RainNowcasts,
+    ForecastSnapshots,
+    LocationRequests,
+)
 
 
 admin.site.register(Users)
 admin.site.register(Activities)
 admin.site.register(UserActivities)
 admin.site.register(PlannedActivities)
+admin.site.register(GeocodingCache)
+admin.site.register(Places)
+admin.site.register(ActivityWeatherThresholds)
+admin.site.register(LocationDepartments)
+admin.site.register(WeatherWarningNotifications)
+admin.site.register(RainNowcasts)
+admin.site.register(ForecastSnapshots)
+admin.site.register(LocationRequests)
@@ -1,6 +1,23 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class PoAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'po_app'
+
+    def ready(self):
+        """
+        Warm the forecast cache of this process from snapshots and share its
+        requests counts, if snapshots are enabled.
+        Start background jobs in this process if START_BACKGROUND_JOBS is enabled,
+        otherwise they run in a dedicated process, see run_background_jobs command.
+        """
+        from .popularity import start_request_counts_flush
+        from .snapshots import start_snapshot_warmup
+        start_snapshot_warmup()
+        start_request_counts_flush()
+        if not getattr(settings, "START_BACKGROUND_JOBS", False):
+            return
+        from .jobs import start_background_jobs
+        start_background_jobs()
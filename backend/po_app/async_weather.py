@@ -0,0 +1,274 @@
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views import View
+from meteofrance_api.const import METEOFRANCE_API_TOKEN
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from .forecast_cache import forecast_cache, snap_to_grid
+from .circuit_breaker import UpstreamUnavailableError, meteofrance_breaker, openweathermap_breaker
+from .compact_forecast import CompactForecast
+from .conditional import add_cache_headers, not_modified_response, forecast_validators, geocoding_validators
+from .gazetteer import search_gazetteer
+from .geocoding_cache import normalize_city, get_cached_geocoding, set_cached_geocoding
+from .popularity import location_popularity
+from .quota import upstream_ledger
+from .snapshots import get_shared_forecast, record_snapshot_later, snapshots_enabled
+from .upstream import get_upstream_settings
+from .weather import (
+    build_geocoding_data,
+    build_daily_forecast,
+    build_forecast_details,
+    build_all_forecast_details,
+    build_weather_response,
+    get_coordinates,
+    is_valid_day_id,
+    INVALID_DAYS_MESSAGE,
+)
+import asyncio
+import httpx
+import os
+import time
+import weakref
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# one client per event loop, connections are kept alive between requests
+_http_clients = weakref.WeakKeyDictionary()
+
+
+def get_provider_ledger(url):
+    """
+    Return the upstream ledger of the provider serving url, None if unknown.
+    """
+    upstream_settings = get_upstream_settings()
+    for provider, key in [("Meteofrance", "METEOFRANCE_URL"), ("Openweathermap", "GEOCODING_URL")]:
+        if url.host == httpx.URL(upstream_settings[key]).host:
+            return upstream_ledger.get(provider)
+    return None
+
+
+class LedgerTransport(httpx.AsyncHTTPTransport):
+    """
+    Transport waiting for provider quotas, and recording calls
+    with their latency and status in the upstream ledger.
+    """
+
+    async def handle_async_request(self, request):
+        """
+        Send request within its provider quota.
+        """
+        ledger = get_provider_ledger(request.url)
+        if ledger is None:
+            return await super().handle_async_request(request)
+        async with ledger.aslot():
+            started = time.perf_counter()
+            try:
+                api_response = await super().handle_async_request(request)
+            except Exception:
+                ledger.record(time.perf_counter() - started)
+                raise
+        ledger.record(time.perf_counter() - started, api_response.status_code)
+        return api_response
+
+
+def get_http_client():
+    """
+    Return the non-blocking HTTP client of the running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    client = _http_clients.get(loop)
+    if client is None or client.is_closed:
+        upstream_settings = get_upstream_settings()
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(upstream_settings["READ_TIMEOUT"],
+                                  connect=upstream_settings["CONNECT_TIMEOUT"]),
+            transport=LedgerTransport(limits=httpx.Limits(
+                max_connections=100, max_keepalive_connections=upstream_settings["POOL_MAXSIZE"])),
+        )
+        _http_clients[loop] = client
+    return client
+
+
+async def async_get_forecast(lat, lon):
+    """
+    Async version of weather.get_forecast.
+    Share the forecast cache with synchronous views.
+    """
+    grid_lat, grid_lon = snap_to_grid(lat, lon)
+    location_popularity.record((grid_lat, grid_lon))
+    return await forecast_cache.aget_or_fetch(
+        (grid_lat, grid_lon),
+        lambda: async_fetch_forecast(grid_lat, grid_lon),
+        # snapshots are read in a thread, only if enabled
+        shared=(lambda: sync_to_async(get_shared_forecast)(grid_lat, grid_lon)) if snapshots_enabled() else None,
+    )
+
+
+async def async_fetch_forecast(grid_lat, grid_lon):
+    """
+    Get compact forecast from Meteofrance API without blocking the event loop,
+    through its circuit breaker.
+    """
+    async def upstream_call():
+        api_response = await get_http_client().get(
+            f"{get_upstream_settings()['METEOFRANCE_URL']}/forecast",
+            params={
+                "lat": grid_lat,
+                "lon": grid_lon,
+                "lang": "en",
+                "token": METEOFRANCE_API_TOKEN,
+            },
+        )
+        api_response.raise_for_status()
+        return CompactForecast.from_raw_data(api_response.json())
+
+    forecast = await meteofrance_breaker.acall(upstream_call)
+    record_snapshot_later(grid_lat, grid_lon, forecast)
+    return forecast
+
+
+async def async_get_forecast_or_last_good(lat, lon):
+    """
+    Async version of weather.get_forecast_or_last_good.
+    """
+    try:
+        return await async_get_forecast(lat, lon), False
+    except Exception:
+        weather_data = forecast_cache.get_last_good(snap_to_grid(lat, lon))
+        if weather_data is None:
+            raise
+        return weather_data, True
+
+
+class AsyncGeocodingView(View):
+    """
+    Async version of GeocodingView.
+    Using offline gazetteer, then Openweathermap Geocoding API.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        """
+        Get coordinates from city name.
+        """
+        city = normalize_city(kwargs.get("city"))
+        params = {
+            "q": city,
+            "limit": 10,
+            "appid": os.environ.get("OWM_API_KEY"),
+        }
+        geocoding_url = get_upstream_settings()["GEOCODING_URL"]
+
+        async def upstream_call():
+            api_response = await get_http_client().get(geocoding_url, params=params)
+            api_response.raise_for_status()
+            return api_response
+
+        try:
+            output_data = (await sync_to_async(search_gazetteer)(city)
+                           or await sync_to_async(get_cached_geocoding)(city))
+            if output_data is None:
+                data = (await openweathermap_breaker.acall(upstream_call)).json()
+                output_data = build_geocoding_data(data)
+                await sync_to_async(set_cached_geocoding)(city, output_data)
+            if output_data:
+                validators = geocoding_validators(request, output_data)
+                return (not_modified_response(request, validators)
+                        or add_cache_headers(JsonResponse({"data": output_data}, status=status.HTTP_200_OK),
+                                             validators))
+            else:
+                return JsonResponse({"error": "City not found."}, status=status.HTTP_404_NOT_FOUND)
+        except UpstreamUnavailableError as e:
+            return JsonResponse({"error": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        except httpx.HTTPError as e:
+            return JsonResponse({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class AsyncWeatherView(View):
+    """
+    Async version of WeatherView.
+    Using Meteofrance API.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        """
+        Get weather data from coordinates.
+        """
+        try:
+            lat, lon = get_coordinates(kwargs)
+        except ValidationError as e:
+            return JsonResponse(e.detail, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            weather_data, is_stale = await async_get_forecast_or_last_good(lat, lon)
+            validators = forecast_validators(request, lat, lon, weather_data, is_stale)
+            not_modified = not_modified_response(request, validators)
+            if not_modified:
+                return not_modified
+            return add_cache_headers(JsonResponse(
+                build_weather_response(build_daily_forecast(weather_data), is_stale), status=status.HTTP_200_OK),
+                validators)
+        except UpstreamUnavailableError as e:
+            return JsonResponse({"error": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        except Exception as e:
+            return JsonResponse({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class AsyncWeatherDetailsView(View):
+    """
+    Async version of WeatherDetailsView.
+    Using Meteofrance API.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        """
+        Get weather data details from coordinates.
+        Without day_id, get details for all days, or for days
+        selected with "days" query parameter (ex: ?days=0-4).
+        """
+        try:
+            lat, lon = get_coordinates(kwargs)
+        except ValidationError as e:
+            return JsonResponse(e.detail, status=status.HTTP_400_BAD_REQUEST)
+        if "day_id" not in kwargs:
+            return await self.get_all_days(lat, lon, request.GET.get("days"))
+        day_id = int(kwargs.get("day_id"))
+        try:
+            weather_data, is_stale = await async_get_forecast_or_last_good(lat, lon)
+
+            if not is_valid_day_id(weather_data, day_id):
+                return JsonResponse({"error": "Invalid day ID"}, status=status.HTTP_400_BAD_REQUEST)
+
+            validators = forecast_validators(request, lat, lon, weather_data, is_stale)
+            not_modified = not_modified_response(request, validators)
+            if not_modified:
+                return not_modified
+            return add_cache_headers(JsonResponse(
+                build_weather_response(build_forecast_details(weather_data, day_id), is_stale),
+                status=status.HTTP_200_OK), validators)
+        except UpstreamUnavailableError as e:
+            return JsonResponse({"error": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        except Exception as e:
+            return JsonResponse({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    async def get_all_days(self, lat, lon, days):
+        """
+        Get weather data details for several days from one forecast.
+        """
+        try:
+            weather_data, is_stale = await async_get_forecast_or_last_good(lat, lon)
+            try:
+                output_data = build_all_forecast_details(weather_data, days)
+            except ValueError:
+                return JsonResponse({"error": INVALID_DAYS_MESSAGE}, status=status.HTTP_400_BAD_REQUEST)
+            validators = forecast_validators(self.request, lat, lon, weather_data, is_stale)
+            not_modified = not_modified_response(self.request, validators)
+            if not_modified:
+                return not_modified
+
+            return add_cache_headers(JsonResponse(
+                build_weather_response(output_data, is_stale), status=status.HTTP_200_OK), validators)
+        except UpstreamUnavailableError as e:
+            return JsonResponse({"error": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        except Exception as e:
+            return JsonResponse({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,209 @@
+from django.conf import settings
+import httpx
+import requests
+import threading
+import time
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+DEFAULT_CIRCUIT_BREAKER = {
+    "FAILURE_THRESHOLD": 5,
+    "RECOVERY_TIMEOUT": 30,
+}
+
+
+def get_circuit_breaker_settings():
+    """
+    Return circuit breaker settings, with defaults.
+    """
+    return {**DEFAULT_CIRCUIT_BREAKER, **getattr(settings, "CIRCUIT_BREAKER", {})}
+
+
+class UpstreamUnavailableError(Exception):
+    """
+    Raised when a call is refused before reaching the upstream provider.
+    """
+
+    def __init__(self, name, message=None):
+        super().__init__(message or f"{name} service unavailable, please retry later.")
+        self.name = name
+
+
+class CircuitOpenError(UpstreamUnavailableError):
+    """
+    Raised when a call is refused because the circuit is open.
+    """
+
+    def __init__(self, name):
+        super().__init__(name, f"{name} service unavailable, please retry later.")
+
+
+def is_upstream_failure(error):
+    """
+    Tell whether error shows the upstream provider failing: timeouts,
+    connection errors and 5xx responses. Other errors, like 4xx responses
+    or unexpected data, are not failures of the provider.
+    """
+    if isinstance(error, (TimeoutError, ConnectionError, requests.Timeout, requests.ConnectionError,
+                          httpx.TransportError)):
+        return True
+    if isinstance(error, (requests.HTTPError, httpx.HTTPStatusError)):
+        response = error.response
+        return response is not None and response.status_code >= 500
+    return False
+
+
+class CircuitBreaker():
+    """
+    Thread safe circuit breaker for an upstream provider.
+    After FAILURE_THRESHOLD consecutive upstream failures the circuit opens
+    and calls fail fast. After RECOVERY_TIMEOUT seconds one trial call is
+    allowed (half open), its result closes or reopens the circuit.
+    """
+
+    def __init__(self, name, failure_threshold, recovery_timeout, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = 0
+        self._trial_running = False
+        self.rejected = 0
+        self.transitions = {}
+
+    def _set_state(self, state):
+        """
+        Change state and count the transition. Lock must be held.
+        """
+        if state == self.state:
+            return
+        transition = f"{self.state}->{state}"
+        self.transitions[transition] = self.transitions.get(transition, 0) + 1
+        logger.warning("Circuit breaker %s: %s", self.name, transition)
+        self.state = state
+        if state == OPEN:
+            self._opened_at = self.clock()
+
+    def before_call(self):
+        """
+        Raise CircuitOpenError if the call is not allowed.
+        """
+        with self._lock:
+            if self.state == OPEN and self.clock() - self._opened_at >= self.recovery_timeout:
+                self._set_state(HALF_OPEN)
+            if self.state == OPEN or (self.state == HALF_OPEN and self._trial_running):
+                self.rejected += 1
+                raise CircuitOpenError(self.name)
+            if self.state == HALF_OPEN:
+                self._trial_running = True
+
+    def on_success(self):
+        """
+        Record a successful call.
+        """
+        with self._lock:
+            self._failures = 0
+            self._trial_running = False
+            self._set_state(CLOSED)
+
+    def on_ignored(self):
+        """
+        Record a call neither succeeding nor failing upstream: refused before
+        reaching it, or raising an error which is not an upstream failure.
+        """
+        with self._lock:
+            self._trial_running = False
+
+    def on_failure(self):
+        """
+        Record a failed call.
+        """
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self.state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._set_state(OPEN)
+
+    def call(self, fn):
+        """
+        Call fn() through the circuit breaker.
+        """
+        self.before_call()
+        try:
+            result = fn()
+        except UpstreamUnavailableError:
+            # refused before reaching upstream (quota, lane), not a failure
+            self.on_ignored()
+            raise
+        except Exception as e:
+            if is_upstream_failure(e):
+                self.on_failure()
+            else:
+                self.on_ignored()
+            raise
+        self.on_success()
+        return result
+
+    async def acall(self, fn):
+        """
+        Async version of call, fn is a coroutine function.
+        """
+        self.before_call()
+        try:
+            result = await fn()
+        except UpstreamUnavailableError:
+            # refused before reaching upstream (quota, lane), not a failure
+            self.on_ignored()
+            raise
+        except Exception as e:
+            if is_upstream_failure(e):
+                self.on_failure()
+            else:
+                self.on_ignored()
+            raise
+        self.on_success()
+        return result
+
+    def reset(self):
+        """
+        Close the circuit and reset counters.
+        """
+        with self._lock:
+            self.state = CLOSED
+            self._failures = 0
+            self._trial_running = False
+            self.rejected = 0
+            self.transitions = {}
+
+    def stats(self):
+        """
+        Return circuit breaker state and counters.
+        """
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self._failures,
+                "rejected": self.rejected,
+                "transitions": dict(self.transitions),
+            }
+
+
+meteofrance_breaker = CircuitBreaker(
+    "Meteofrance",
+    failure_threshold=get_circuit_breaker_settings()["FAILURE_THRESHOLD"],
+    recovery_timeout=get_circuit_breaker_settings()["RECOVERY_TIMEOUT"],
+)
+openweathermap_breaker = CircuitBreaker(
+    "Openweathermap",
+    failure_threshold=get_circuit_breaker_settings()["FAILURE_THRESHOLD"],
+    recovery_timeout=get_circuit_breaker_settings()["RECOVERY_TIMEOUT"],
+)
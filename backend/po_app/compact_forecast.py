@@ -0,0 +1,199 @@
+from meteofrance_api.helpers import timestamp_to_dateime_with_locale_tz
+import numpy as np
+import orjson
+import sys
+
+POSITION_KEYS = ["lat", "lon", "alti", "name", "country", "dept", "timezone"]
+
+
+def _float_column(rows, *path):
+    """
+    Build a float column from nested dicts, missing values are NaN.
+    """
+    values = []
+    for row in rows:
+        value = row
+        for key in path:
+            value = value.get(key) if isinstance(value, dict) else None
+        values.append(np.nan if value is None else value)
+    return np.array(values, dtype=np.float64)
+
+
+def _int_column(rows, *path):
+    """
+    Build an integer column (timestamps) from nested dicts.
+    """
+    values = []
+    for row in rows:
+        value = row
+        for key in path:
+            value = value.get(key) if isinstance(value, dict) else None
+        values.append(0 if value is None else value)
+    return np.array(values, dtype=np.int64)
+
+
+def _str_column(rows, *path):
+    """
+    Build a string column from nested dicts, repeated strings are shared.
+    """
+    values = []
+    for row in rows:
+        value = row
+        for key in path:
+            value = value.get(key) if isinstance(value, dict) else None
+        values.append(sys.intern(value) if isinstance(value, str) else value)
+    return tuple(values)
+
+
+def column_to_list(column, integer=False):
+    """
+    Convert a float column to a list, NaN values become None.
+    """
+    if integer:
+        return [None if value != value else int(value) for value in column.tolist()]
+    return [None if value != value else value for value in column.tolist()]
+
+
+class CompactForecast():
+    """
+    Compact columnar forecast, built from a Meteofrance Forecast.
+    Daily and hourly values are stored in numpy columns,
+    so conversions run on whole columns.
+    """
+    __slots__ = (
+        "position",
+        "updated_on",
+        "daily_dt",
+        "daily_sunrise",
+        "daily_sunset",
+        "daily_t_min",
+        "daily_t_max",
+        "daily_humidity_min",
+        "daily_humidity_max",
+        "daily_uv",
+        "daily_weather_desc",
+        "daily_weather_icon",
+        "hourly_dt",
+        "hourly_t",
+        "hourly_humidity",
+        "hourly_sea_level",
+        "hourly_wind_speed",
+        "hourly_wind_gust",
+        "hourly_wind_direction",
+        "hourly_rain_1h",
+        "hourly_rain_3h",
+        "hourly_rain_6h",
+        "hourly_snow_1h",
+        "hourly_snow_3h",
+        "hourly_snow_6h",
+        "hourly_iso0",
+        "hourly_clouds",
+        "hourly_weather_desc",
+        "hourly_weather_icon",
+    )
+    COLUMNS = __slots__[2:]
+    INT_COLUMNS = ("daily_dt", "daily_sunrise", "daily_sunset", "hourly_dt")
+    STR_COLUMNS = ("daily_weather_desc", "daily_weather_icon", "hourly_weather_desc", "hourly_weather_icon")
+
+    @classmethod
+    def from_forecast(cls, forecast):
+        """
+        Build a CompactForecast from a Meteofrance Forecast.
+        """
+        return cls.from_raw_data(forecast.raw_data)
+
+    @classmethod
+    def from_raw_data(cls, raw_data):
+        """
+        Build a CompactForecast from Meteofrance forecast API data.
+        """
+        compact = cls()
+        position = raw_data.get("position", {})
+        compact.position = {key: position.get(key) for key in POSITION_KEYS}
+        compact.updated_on = raw_data.get("updated_on")
+
+        daily = raw_data.get("daily_forecast", [])
+        compact.daily_dt = _int_column(daily, "dt")
+        compact.daily_sunrise = _int_column(daily, "sun", "rise")
+        compact.daily_sunset = _int_column(daily, "sun", "set")
+        compact.daily_t_min = _float_column(daily, "T", "min")
+        compact.daily_t_max = _float_column(daily, "T", "max")
+        compact.daily_humidity_min = _float_column(daily, "humidity", "min")
+        compact.daily_humidity_max = _float_column(daily, "humidity", "max")
+        compact.daily_uv = _float_column(daily, "uv")
+        compact.daily_weather_desc = _str_column(daily, "weather12H", "desc")
+        compact.daily_weather_icon = _str_column(daily, "weather12H", "icon")
+
+        hourly = raw_data.get("forecast", [])
+        compact.hourly_dt = _int_column(hourly, "dt")
+        compact.hourly_t = _float_column(hourly, "T", "value")
+        compact.hourly_humidity = _float_column(hourly, "humidity")
+        compact.hourly_sea_level = _float_column(hourly, "sea_level")
+        compact.hourly_wind_speed = _float_column(hourly, "wind", "speed")
+        compact.hourly_wind_gust = _float_column(hourly, "wind", "gust")
+        compact.hourly_wind_direction = _float_column(
+            hourly, "wind", "direction")
+        compact.hourly_rain_1h = _float_column(hourly, "rain", "1h")
+        compact.hourly_rain_3h = _float_column(hourly, "rain", "3h")
+        compact.hourly_rain_6h = _float_column(hourly, "rain", "6h")
+        compact.hourly_snow_1h = _float_column(hourly, "snow", "1h")
+        compact.hourly_snow_3h = _float_column(hourly, "snow", "3h")
+        compact.hourly_snow_6h = _float_column(hourly, "snow", "6h")
+        compact.hourly_iso0 = _float_column(hourly, "iso0")
+        compact.hourly_clouds = _float_column(hourly, "clouds")
+        compact.hourly_weather_desc = _str_column(hourly, "weather", "desc")
+        compact.hourly_weather_icon = _str_column(hourly, "weather", "icon")
+        return compact
+
+    def to_columns(self):
+        """
+        Serialize to JSON bytes by column, position and updated_on in "meta".
+        """
+        columns = {"meta": orjson.dumps({"position": self.position, "updated_on": self.updated_on})}
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            if name in self.STR_COLUMNS:
+                columns[name] = orjson.dumps(list(column))
+            else:
+                columns[name] = orjson.dumps(column_to_list(column, integer=name in self.INT_COLUMNS))
+        return columns
+
+    @classmethod
+    def from_columns(cls, columns):
+        """
+        Build a CompactForecast from JSON bytes by column, see to_columns.
+        """
+        compact = cls()
+        meta = orjson.loads(columns["meta"])
+        compact.position = meta["position"]
+        compact.updated_on = meta["updated_on"]
+        for name in cls.COLUMNS:
+            values = orjson.loads(columns[name])
+            if name in cls.STR_COLUMNS:
+                column = tuple(sys.intern(value) if isinstance(value, str) else value for value in values)
+            elif name in cls.INT_COLUMNS:
+                column = np.array(values, dtype=np.int64)
+            else:
+                column = np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+            setattr(compact, name, column)
+        return compact
+
+    @property
+    def daily_count(self):
+        """
+        Return number of days in forecast.
+        """
+        return len(self.daily_dt)
+
+    @property
+    def hourly_count(self):
+        """
+        Return number of hourly steps in forecast.
+        """
+        return len(self.hourly_dt)
+
+    def timestamp_to_locale_time(self, timestamp):
+        """
+        Convert timestamp in datetime in the forecast location timezone.
+        """
+        return timestamp_to_dateime_with_locale_tz(int(timestamp), self.position["timezone"])
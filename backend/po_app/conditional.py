@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from .forecast_cache import forecast_cache, snap_to_grid
+import hashlib
+import json
+
+DEFAULT_HTTP_CACHE = {
+    "GEOCODING_MAX_AGE": 86400,
+}
+
+
+def get_http_cache_settings():
+    """
+    Return HTTP cache settings, with defaults.
+    """
+    return {**DEFAULT_HTTP_CACHE, **getattr(settings, "HTTP_CACHE", {})}
+
+
+def make_etag(*parts):
+    """
+    Return a quoted ETag from response variant parts.
+    """
+    return '"' + hashlib.md5("|".join(str(part) for part in parts).encode()).hexdigest() + '"'
+
+
+def forecast_validators(request, lat, lon, weather_data, is_stale):
+    """
+    Return ETag, Last-Modified and max-age of a forecast response.
+    ETag changes with request path and query, and forecast update time.
+    max-age is the time left before cached forecast is stale.
+    """
+    etag = make_etag(request.get_full_path(), weather_data.updated_on, is_stale)
+    max_age = 0 if is_stale else int(forecast_cache.time_to_live(snap_to_grid(lat, lon)))
+    return etag, weather_data.updated_on, max_age
+
+
+def geocoding_validators(request, output_data):
+    """
+    Return ETag, Last-Modified and max-age of a geocoding response.
+    """
+    etag = make_etag(request.get_full_path(), json.dumps(output_data, sort_keys=True))
+    return etag, None, get_http_cache_settings()["GEOCODING_MAX_AGE"]
+
+
+def add_cache_headers(response, validators):
+    """
+    Add ETag, Last-Modified and Cache-Control headers to response.
+    """
+    etag, last_modified, max_age = validators
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified)
+    patch_cache_control(response, public=True, max_age=max_age)
+    patch_vary_headers(response, ["Accept"])
+    return response
+
+
+def not_modified_response(request, validators):
+    """
+    Return a 304 response if request validators match, None otherwise.
+    """
+    etag, last_modified, _ = validators
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is None:
+        return None
+    return add_cache_headers(not_modified, validators)
@@ -0,0 +1,344 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import close_old_connections
+from .singleflight import SingleFlight, AsyncSingleFlight
+import threading
+import asyncio
+import time
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FORECAST_CACHE = {
+    "TTL": 900,
+    "HARD_TTL": 3600,
+    "REFRESH_WORKERS": 2,
+    "MAX_ENTRIES": 5000,
+    "GRID_RESOLUTION": 0.025,
+    "DB_LOCK": False,
+    "DB_LOCK_TIMEOUT": 10,
+}
+
+
+def get_forecast_cache_settings():
+    """
+    Return forecast cache settings, with defaults.
+    """
+    return {**DEFAULT_FORECAST_CACHE, **getattr(settings, "FORECAST_CACHE", {})}
+
+
+def snap_to_grid(lat, lon, resolution=None):
+    """
+    Snap coordinates to the weather provider grid.
+    Nearby coordinates share the same grid cell, so the same forecast.
+    """
+    if resolution is None:
+        resolution = get_forecast_cache_settings()["GRID_RESOLUTION"]
+    grid_lat = round(round(float(lat) / resolution) * resolution, 4)
+    grid_lon = round(round(float(lon) / resolution) * resolution, 4)
+    return grid_lat, grid_lon
+
+
+class ForecastCache():
+    """
+    Thread safe in-memory forecast cache.
+    Entries are fresh for TTL seconds, then served stale until HARD_TTL
+    while a background refresh runs (stale-while-revalidate).
+    Least recently used entries are evicted first.
+    Concurrent misses on the same key are coalesced into one fetch.
+    """
+
+    def __init__(self, ttl, max_entries, hard_ttl=None, refresh_executor=None, clock=time.monotonic):
+        self.ttl = ttl
+        self.hard_ttl = max(hard_ttl or ttl, ttl)
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._last_good = OrderedDict()
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self._async_flight = AsyncSingleFlight()
+        self._refresh_executor = refresh_executor
+        self._refreshing = set()
+        self._refresh_tasks = set()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.background_refreshes = 0
+        self.refresh_errors = 0
+
+    def _lookup(self, key):
+        """
+        Return (value, is_fresh) for key, (None, False) if missing.
+        Entries older than HARD_TTL are removed. Lock must be held.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, False
+        fresh_until, stale_until, value = entry
+        now = self.clock()
+        if stale_until <= now:
+            del self._entries[key]
+            return None, False
+        self._entries.move_to_end(key)
+        return value, fresh_until > now
+
+    def get(self, key):
+        """
+        Return fresh cached value for key, or None if missing or expired.
+        """
+        with self._lock:
+            value, is_fresh = self._lookup(key)
+            if is_fresh:
+                self.hits += 1
+                return value
+            self.misses += 1
+            return None
+
+    def get_stale(self, key):
+        """
+        Return (value, is_stale) for key, stale values are within HARD_TTL.
+        Return (None, False) if missing or expired.
+        """
+        with self._lock:
+            value, is_fresh = self._lookup(key)
+            if value is None:
+                self.misses += 1
+            elif is_fresh:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+            return value, value is not None and not is_fresh
+
+    def _peek(self, key):
+        """
+        Return fresh cached value for key without touching counters.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self.clock():
+                return entry[2]
+            return None
+
+    def set(self, key, value, age=0):
+        """
+        Store value for key, evicting least recently used entries if full.
+        age is the number of seconds since value was fetched.
+        """
+        with self._lock:
+            fetched_at = self.clock() - age
+            self._entries[key] = (fetched_at + self.ttl, fetched_at + self.hard_ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            self._last_good[key] = value
+            self._last_good.move_to_end(key)
+            while len(self._last_good) > self.max_entries:
+                self._last_good.popitem(last=False)
+
+    def get_last_good(self, key):
+        """
+        Return the last value stored for key, even older than HARD_TTL.
+        Used as fallback when the upstream provider is unavailable.
+        """
+        with self._lock:
+            return self._last_good.get(key)
+
+    def time_to_live(self, key):
+        """
+        Return seconds before key becomes stale, 0 if missing or stale.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return 0
+            return max(entry[0] - self.clock(), 0)
+
+    def refresh(self, key, fetch, shared=None):
+        """
+        Fetch and store value for key, even if a cached value exists.
+        """
+        return self._flight.do(key, lambda: self._store(key, fetch, shared))
+
+    def get_or_fetch(self, key, fetch, shared=None):
+        """
+        Return cached value for key, calling fetch() on a miss.
+        Only one fetch per key runs at a time, waiters share its result.
+        A stale value is returned at once and refreshed in background.
+        shared() may return (value, age) of a value fresh in a store shared
+        by all processes, used instead of calling fetch().
+        """
+        value, is_stale = self.get_stale(key)
+        if value is None:
+            value = self._flight.do(key, lambda: self._load(key, fetch, shared))
+        elif is_stale and self._start_refresh(key):
+            self._get_refresh_executor().submit(
+                self._background_refresh, key, fetch, shared)
+        return value
+
+    def _store(self, key, fetch, shared):
+        """
+        Store and return the value found by shared(), or fetch() if none.
+        """
+        found = shared() if shared is not None else None
+        if found is None:
+            value, age = fetch(), 0
+        else:
+            value, age = found
+        self.set(key, value, age=age)
+        return value
+
+    def _load(self, key, fetch, shared=None):
+        """
+        Fetch and store value, unless a previous fetch already stored it.
+        """
+        value = self._peek(key)
+        if value is None:
+            value = self._store(key, fetch, shared)
+        return value
+
+    def _get_refresh_executor(self):
+        """
+        Return executor running background refreshes.
+        """
+        with self._lock:
+            if self._refresh_executor is None:
+                self._refresh_executor = ThreadPoolExecutor(
+                    max_workers=get_forecast_cache_settings()["REFRESH_WORKERS"],
+                    thread_name_prefix="forecast-refresh",
+                )
+            return self._refresh_executor
+
+    def _start_refresh(self, key):
+        """
+        Mark key as refreshing, return False if a refresh already runs.
+        """
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def _end_refresh(self, key, error=None):
+        """
+        Unmark key as refreshing and count the refresh result.
+        """
+        with self._lock:
+            self._refreshing.discard(key)
+            if error is None:
+                self.background_refreshes += 1
+            else:
+                self.refresh_errors += 1
+        if error is not None:
+            logger.warning("Forecast refresh failed for %s: %s", key, error)
+
+    def _background_refresh(self, key, fetch, shared=None):
+        """
+        Refresh a stale value, keep serving it if refresh fails.
+        The database connection of the executor thread is closed as after a request.
+        """
+        try:
+            self.refresh(key, fetch, shared)
+        except Exception as e:
+            self._end_refresh(key, e)
+        else:
+            self._end_refresh(key)
+        finally:
+            close_old_connections()
+
+    async def aget_or_fetch(self, key, fetch, shared=None):
+        """
+        Async version of get_or_fetch, fetch and shared are coroutine functions.
+        """
+        value, is_stale = self.get_stale(key)
+        if value is None:
+            value = await self._async_flight.do(key, lambda: self._aload(key, fetch, shared))
+        elif is_stale and self._start_refresh(key):
+            task = asyncio.get_running_loop().create_task(
+                self._abackground_refresh(key, fetch, shared))
+            # keep a reference until the task is done
+            self._refresh_tasks.add(task)
+            task.add_done_callback(self._refresh_tasks.discard)
+        return value
+
+    async def _astore(self, key, fetch, shared):
+        """
+        Async version of _store.
+        """
+        found = await shared() if shared is not None else None
+        if found is None:
+            value, age = await fetch(), 0
+        else:
+            value, age = found
+        self.set(key, value, age=age)
+        return value
+
+    async def _aload(self, key, fetch, shared=None):
+        """
+        Async version of _load.
+        """
+        value = self._peek(key)
+        if value is None:
+            value = await self._astore(key, fetch, shared)
+        return value
+
+    async def _abackground_refresh(self, key, fetch, shared=None):
+        """
+        Async version of _background_refresh.
+        """
+        try:
+            await self._async_flight.do(key, lambda: self._astore(key, fetch, shared))
+        except Exception as e:
+            self._end_refresh(key, e)
+        else:
+            self._end_refresh(key)
+
+    def clear(self):
+        """
+        Remove all entries and reset counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._last_good.clear()
+            self.hits = 0
+            self.stale_hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.background_refreshes = 0
+            self.refresh_errors = 0
+        self._flight.reset_stats()
+        self._async_flight.reset_stats()
+
+    def stats(self):
+        """
+        Return cache counters.
+        """
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            served = self.hits + self.stale_hits
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "hit_ratio": round(served / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "background_refreshes": self.background_refreshes,
+                "refresh_errors": self.refresh_errors,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hard_ttl": self.hard_ttl,
+                "single_flight": self._flight.stats(),
+                "async_single_flight": self._async_flight.stats(),
+            }
+
+
+forecast_cache = ForecastCache(
+    ttl=get_forecast_cache_settings()["TTL"],
+    max_entries=get_forecast_cache_settings()["MAX_ENTRIES"],
+    hard_ttl=get_forecast_cache_settings()["HARD_TTL"],
+)
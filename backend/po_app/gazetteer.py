@@ -0,0 +1,287 @@
+from bisect import bisect_left
+from django.conf import settings
+from .models import Places
+import numpy as np
+import re
+import sys
+import threading
+import time
+import unicodedata
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# results of prefixes matching more names are memoized (short prefixes)
+MEMOIZE_RANGE = 1000
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.195
+
+DEFAULT_GAZETTEER = {
+    "ENABLED": True,
+    "LIMIT": 10,
+    "REVERSE_LIMIT": 5,
+    "REVERSE_MAX_DISTANCE_KM": 50,
+    "CELL_SIZE": 0.25,
+}
+
+
+def get_gazetteer_settings():
+    """
+    Return offline gazetteer settings, with defaults.
+    """
+    return {**DEFAULT_GAZETTEER, **getattr(settings, "GAZETTEER", {})}
+
+
+def fold_name(name):
+    """
+    Fold place name for prefix search:
+    lowercase, without accents, hyphens and apostrophes.
+    """
+    name = unicodedata.normalize("NFKD", name or "")
+    name = "".join(char for char in name if not unicodedata.combining(char))
+    for separator in "-'’":
+        name = name.replace(separator, " ")
+    return " ".join(name.split()).casefold()
+
+
+class PrefixIndex():
+    """
+    Compact in-memory prefix index over places.
+    Folded names are kept in one sorted list searched by bisection,
+    places values are stored in columns, results are ranked by population.
+    """
+
+    def __init__(self, places):
+        """
+        Build index from (name, ascii_name, lat, lon, country, population) rows.
+        """
+        names, ascii_names, countries, keys = [], [], [], []
+        lats, lons, populations = [], [], []
+        for index, (name, ascii_name, lat, lon, country, population) in enumerate(places):
+            names.append(name)
+            ascii_names.append(ascii_name)
+            countries.append(sys.intern(country))
+            lats.append(lat)
+            lons.append(lon)
+            populations.append(population)
+            for key in {fold_name(name), fold_name(ascii_name)}:
+                if key:
+                    keys.append((key, index))
+        keys.sort()
+        self.keys = [key for key, _ in keys]
+        self.key_places = np.array([index for _, index in keys], dtype=np.int32)
+        self.names = names
+        self.ascii_names = ascii_names
+        self.countries = countries
+        self.lats = np.array(lats, dtype=np.float64)
+        self.lons = np.array(lons, dtype=np.float64)
+        self.populations = np.array(populations, dtype=np.int64)
+        self.memoized = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def search(self, query, limit=10):
+        """
+        Return places whose name starts with query, most populated first.
+        """
+        prefix = fold_name(query)
+        if not prefix:
+            return []
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + "\U0010ffff", start)
+        if end - start > MEMOIZE_RANGE:
+            memoized = self.memoized.get((prefix, limit))
+            if memoized is None:
+                memoized = self.memoized[(prefix, limit)] = self.rank(start, end, limit)
+            return memoized
+        return self.rank(start, end, limit)
+
+    def rank(self, start, end, limit):
+        """
+        Return most populated places of keys range.
+        """
+        places = np.unique(self.key_places[start:end])
+        if len(places) > limit:
+            places = places[np.argpartition(-self.populations[places], limit)[:limit]]
+        places = places[np.argsort(-self.populations[places], kind="stable")]
+        return [
+            {
+                "name": self.names[place],
+                "lat": float(self.lats[place]),
+                "lon": float(self.lons[place]),
+                "country": self.countries[place],
+            }
+            for place in places.tolist()
+        ]
+
+
+def location_name(name):
+    """
+    Return place name accepted by location validator (letters, spaces and -).
+    """
+    return " ".join(re.sub(r"[^a-zA-Z\s-]", " ", name).split())
+
+
+def haversine_km(lat, lon, lats, lons):
+    """
+    Return great-circle distances in km from one point to columns of points.
+    """
+    lat, lon = np.radians(lat), np.radians(lon)
+    lats, lons = np.radians(lats), np.radians(lons)
+    a = (np.sin((lats - lat) / 2) ** 2
+         + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class SpatialIndex():
+    """
+    Geohash-like grid index over places of a PrefixIndex.
+    Places are sorted by grid cell, a lookup only reads cells
+    of the bounding box around the point.
+    """
+
+    def __init__(self, places, cell_size=0.25):
+        self.places = places
+        self.cell_size = cell_size
+        self.columns = int(np.ceil(360 / cell_size))
+        cells = self.cell_ids(places.lats, places.lons)
+        self.order = np.argsort(cells, kind="stable").astype(np.int32)
+        sorted_cells = cells[self.order]
+        cell_ids, starts, counts = np.unique(sorted_cells, return_index=True, return_counts=True)
+        self.cells = {
+            cell: (start, start + count)
+            for cell, start, count in zip(cell_ids.tolist(), starts.tolist(), counts.tolist())
+        }
+
+    def cell_ids(self, lats, lons):
+        """
+        Return grid cell ids of coordinates.
+        """
+        rows = np.floor((np.asarray(lats) + 90) / self.cell_size).astype(np.int64)
+        columns = np.floor((np.asarray(lons) + 180) / self.cell_size).astype(np.int64) % self.columns
+        return rows * self.columns + columns
+
+    def candidates(self, lat, lon, max_distance):
+        """
+        Return places of the cells around the point, within max_distance km.
+        """
+        lat_span = max_distance / KM_PER_DEGREE
+        cos_lat = np.cos(np.radians(min(abs(lat) + lat_span, 90)))
+        lon_span = 180 if cos_lat < 1e-6 else min(180, max_distance / (KM_PER_DEGREE * cos_lat))
+        first_row = int(np.floor((max(lat - lat_span, -90) + 90) / self.cell_size))
+        last_row = int(np.floor((min(lat + lat_span, 90) + 90) / self.cell_size))
+        first_column = int(np.floor((lon - lon_span + 180) / self.cell_size))
+        last_column = int(np.floor((lon + lon_span + 180) / self.cell_size))
+        columns = {column % self.columns for column in range(first_column, last_column + 1)}
+        ranges = [
+            self.cells[cell]
+            for row in range(first_row, last_row + 1)
+            for cell in (row * self.columns + column for column in columns)
+            if cell in self.cells
+        ]
+        if not ranges:
+            return np.array([], dtype=np.int32)
+        return np.concatenate([self.order[start:end] for start, end in ranges])
+
+    def nearest(self, lat, lon, limit=5, max_distance=50):
+        """
+        Return locations of the nearest places within max_distance km,
+        nearest first.
+        """
+        places = self.candidates(lat, lon, max_distance)
+        distances = haversine_km(lat, lon, self.places.lats[places], self.places.lons[places])
+        within = distances <= max_distance
+        places, distances = places[within], distances[within]
+        if len(places) > limit:
+            nearest = np.argpartition(distances, limit)[:limit]
+            places, distances = places[nearest], distances[nearest]
+        places = places[np.argsort(distances, kind="stable")]
+        return [
+            {
+                "name": location_name(self.places.ascii_names[place] or self.places.names[place]),
+                "lat": float(self.places.lats[place]),
+                "lon": float(self.places.lons[place]),
+                "country": self.places.countries[place],
+            }
+            for place in places.tolist()
+        ]
+
+
+_index = None
+_spatial_index = None
+_index_lock = threading.Lock()
+
+
+def load_gazetteer():
+    """
+    Build prefix index from Places table.
+    """
+    started = time.monotonic()
+    index = PrefixIndex(Places.objects.values_list(
+        "name", "ascii_name", "lat", "lon", "country", "population").iterator(chunk_size=5000))
+    logger.info(f"Gazetteer loaded: {len(index)} places in {time.monotonic() - started:.1f}s")
+    return index
+
+
+def get_gazetteer():
+    """
+    Return prefix index of this worker, loaded on first use.
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = load_gazetteer()
+    return _index
+
+
+def get_spatial_index():
+    """
+    Return spatial index of this worker, built on first use.
+    """
+    global _spatial_index
+    if _spatial_index is None:
+        index = get_gazetteer()
+        with _index_lock:
+            if _spatial_index is None:
+                _spatial_index = SpatialIndex(index, get_gazetteer_settings()["CELL_SIZE"])
+    return _spatial_index
+
+
+def reset_gazetteer():
+    """
+    Drop prefix and spatial indexes, they are reloaded on next use.
+    """
+    global _index, _spatial_index
+    with _index_lock:
+        _index = None
+        _spatial_index = None
+
+
+def search_gazetteer(city):
+    """
+    Return places matching city from offline gazetteer,
+    empty list if disabled or not found.
+    """
+    gazetteer_settings = get_gazetteer_settings()
+    if not gazetteer_settings["ENABLED"]:
+        return []
+    return get_gazetteer().search(city, gazetteer_settings["LIMIT"])
+
+
+def reverse_gazetteer(lat, lon):
+    """
+    Return locations of nearest places from offline gazetteer,
+    empty list if disabled or none nearby.
+    """
+    gazetteer_settings = get_gazetteer_settings()
+    if not gazetteer_settings["ENABLED"]:
+        return []
+    return get_spatial_index().nearest(
+        lat, lon,
+        limit=gazetteer_settings["REVERSE_LIMIT"],
+        max_distance=gazetteer_settings["REVERSE_MAX_DISTANCE_KM"],
+    )
@@ -0,0 +1,53 @@
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from .models import GeocodingCache
+import unicodedata
+
+DEFAULT_GEOCODING_CACHE = {
+    "TTL": 30 * 86400,
+    "NEGATIVE_TTL": 86400,
+}
+
+
+def get_geocoding_cache_settings():
+    """
+    Return geocoding cache settings, with defaults.
+    """
+    return {**DEFAULT_GEOCODING_CACHE, **getattr(settings, "GEOCODING_CACHE", {})}
+
+
+def normalize_city(city):
+    """
+    Normalize city name used as geocoding query and cache key.
+    """
+    city = unicodedata.normalize("NFC", city or "")
+    return " ".join(city.split()).casefold()[:100]
+
+
+def get_cached_geocoding(query):
+    """
+    Return cached geocoding results of normalized query,
+    None if missing or expired.
+    """
+    entry = GeocodingCache.objects.filter(
+        query=query, expires_at__gt=timezone.now()).only("results").first()
+    if entry is None:
+        return None
+    return entry.results
+
+
+def set_cached_geocoding(query, results):
+    """
+    Store geocoding results of normalized query.
+    Empty results (city not found) are kept for a shorter time.
+    """
+    cache_settings = get_geocoding_cache_settings()
+    ttl = cache_settings["TTL"] if results else cache_settings["NEGATIVE_TTL"]
+    GeocodingCache.objects.update_or_create(
+        query=query,
+        defaults={
+            "results": results,
+            "expires_at": timezone.now() + timedelta(seconds=ttl),
+        },
+    )
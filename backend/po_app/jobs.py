@@ -0,0 +1,18 @@
+from .nowcast import start_nowcast_scheduler
+from .prefetch import start_prefetch_scheduler
+from .vigilance import start_warnings_scheduler
+from .warming import start_warming_scheduler
+
+
+def start_background_jobs():
+    """
+    Start schedulers enabled in settings in background threads.
+    Return the stop events of started schedulers.
+    """
+    stop_events = [
+        start_prefetch_scheduler(),
+        start_warnings_scheduler(),
+        start_nowcast_scheduler(),
+        start_warming_scheduler(),
+    ]
+    return [stop_event for stop_event in stop_events if stop_event is not None]
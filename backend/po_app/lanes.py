@@ -0,0 +1,209 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from .circuit_breaker import UpstreamUnavailableError
+import asyncio
+import threading
+import time
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+DEFAULT_UPSTREAM_LANES = {
+    "BACKGROUND_CONCURRENCY": 2,
+    "INTERACTIVE_BUSY": 4,
+    "INTERACTIVE_RESERVE": 0.5,
+    "BACKGROUND_MAX_WAIT": 60,
+}
+
+
+def get_upstream_lanes_settings():
+    """
+    Return upstream lanes settings, with defaults.
+    """
+    return {**DEFAULT_UPSTREAM_LANES, **getattr(settings, "UPSTREAM_LANES", {})}
+
+
+class LaneTimeoutError(UpstreamUnavailableError):
+    """
+    Raised when a background call waited too long for interactive calls.
+    """
+
+    def __init__(self, name):
+        super().__init__(name, f"{name} busy with interactive calls, background call dropped.")
+
+
+class Lane():
+    """
+    Lane of upstream calls. A background call is promoted
+    to interactive when a user request waits for its result.
+    """
+
+    def __init__(self, name=INTERACTIVE):
+        self.name = name
+        self.promoted = False
+
+    @property
+    def interactive(self):
+        return self.name == INTERACTIVE or self.promoted
+
+    def promote(self):
+        """
+        Run the call in the interactive lane.
+        """
+        self.promoted = True
+
+
+_current_lane = ContextVar("upstream_lane", default=Lane())
+
+
+def current_lane():
+    """
+    Return the lane of upstream calls of the current context, interactive by default.
+    """
+    return _current_lane.get()
+
+
+@contextmanager
+def use_lane(lane):
+    """
+    Run upstream calls of the block in lane.
+    """
+    token = _current_lane.set(lane)
+    try:
+        yield lane
+    finally:
+        _current_lane.reset(token)
+
+
+def background_lane():
+    """
+    Run upstream calls of the block, or of the decorated function, in the background lane.
+    """
+    return use_lane(Lane(BACKGROUND))
+
+
+class LaneScheduler():
+    """
+    Interactive and background lanes of one provider calls.
+    Interactive calls never wait for background ones. Background calls run
+    at most background_concurrency at a time, only while fewer than
+    interactive_busy interactive calls are running, and leave the
+    interactive_reserve share of the token bucket to interactive calls.
+    """
+
+    def __init__(self, name, bucket, background_concurrency, interactive_busy, interactive_reserve,
+                 background_max_wait, clock=time.monotonic, poll_interval=0.05):
+        self.name = name
+        self.bucket = bucket
+        self.background_concurrency = background_concurrency
+        self.interactive_busy = interactive_busy
+        self.reserved_tokens = interactive_reserve * bucket.capacity
+        self.background_max_wait = background_max_wait
+        self.clock = clock
+        self.poll_interval = poll_interval
+        self._condition = threading.Condition()
+        self.reset()
+
+    def reset(self):
+        """
+        Reset counters.
+        """
+        with self._condition:
+            self.running = {INTERACTIVE: 0, BACKGROUND: 0}
+            self.calls = {INTERACTIVE: 0, BACKGROUND: 0}
+            self.yields = 0
+            self.yield_seconds = 0.0
+            self.promoted = 0
+            self.dropped = 0
+
+    def _try_enter(self, lane, waited):
+        """
+        Take a slot in lane if allowed, return the lane name or None. Lock must be held.
+        """
+        if lane.interactive:
+            if lane.name == BACKGROUND:
+                self.promoted += 1
+            name = INTERACTIVE
+        elif (self.running[INTERACTIVE] < self.interactive_busy
+              and self.running[BACKGROUND] < self.background_concurrency
+              and self.bucket.try_take(self.reserved_tokens)):
+            name = BACKGROUND
+        else:
+            return None
+        self.running[name] += 1
+        self.calls[name] += 1
+        if waited:
+            self.yields += 1
+        return name
+
+    def _give_up(self, started):
+        """
+        Count a dropped background call and raise LaneTimeoutError. Lock must be held.
+        """
+        self.dropped += 1
+        self.yields += 1
+        self.yield_seconds += self.clock() - started
+        raise LaneTimeoutError(self.name)
+
+    def enter(self, lane):
+        """
+        Wait for a slot in lane, return the lane name to leave.
+        Raise LaneTimeoutError if a background call waited more than background_max_wait.
+        """
+        started = self.clock()
+        with self._condition:
+            name = self._try_enter(lane, waited=False)
+            while name is None:
+                remaining = started + self.background_max_wait - self.clock()
+                if remaining <= 0:
+                    self._give_up(started)
+                self._condition.wait(min(self.poll_interval, remaining))
+                name = self._try_enter(lane, waited=True)
+            if name == BACKGROUND:
+                self.yield_seconds += self.clock() - started
+            return name
+
+    async def aenter(self, lane):
+        """
+        Async version of enter, waits without blocking the event loop.
+        """
+        started = self.clock()
+        waited = False
+        while True:
+            with self._condition:
+                name = self._try_enter(lane, waited)
+                if name is not None:
+                    if name == BACKGROUND:
+                        self.yield_seconds += self.clock() - started
+                    return name
+                remaining = started + self.background_max_wait - self.clock()
+                if remaining <= 0:
+                    self._give_up(started)
+            waited = True
+            await asyncio.sleep(min(self.poll_interval, remaining))
+
+    def leave(self, name):
+        """
+        Release a slot of lane name, wake waiting background calls.
+        """
+        with self._condition:
+            self.running[name] -= 1
+            self._condition.notify_all()
+
+    def stats(self):
+        """
+        Return lanes counters.
+        """
+        with self._condition:
+            return {
+                INTERACTIVE: {"running": self.running[INTERACTIVE], "calls": self.calls[INTERACTIVE]},
+                BACKGROUND: {
+                    "running": self.running[BACKGROUND],
+                    "calls": self.calls[BACKGROUND],
+                    "yields": self.yields,
+                    "yield_seconds": round(self.yield_seconds, 3),
+                    "promoted": self.promoted,
+                    "dropped": self.dropped,
+                },
+            }
@@ -0,0 +1,73 @@
+from datetime import datetime, timezone as dt_timezone
+from django.core.management.base import BaseCommand, CommandError
+from po_app.forecast_cache import snap_to_grid
+from po_app.snapshots import snapshot_store
+import numpy as np
+
+
+class Command(BaseCommand):
+    """
+    Show forecast snapshots usage, prune them, or show how a forecast evolved.
+    """
+    help = "Show forecast snapshots count and compression, prune old snapshots, or show forecast history."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--prune",
+            action="store_true",
+            help="Delete snapshots older than RETENTION_DAYS.",
+        )
+        parser.add_argument(
+            "--retention-days",
+            type=int,
+            default=None,
+            help="Delete snapshots older than this number of days.",
+        )
+        parser.add_argument(
+            "--history",
+            nargs=2,
+            type=float,
+            metavar=("LAT", "LON"),
+            help="Show each snapshot forecast of a location.",
+        )
+        parser.add_argument(
+            "--at",
+            default=None,
+            help="With --history, forecast hour to follow (ISO format, UTC), default first hour.",
+        )
+
+    def handle(self, *args, **options):
+        if options["prune"]:
+            deleted = snapshot_store.prune(options["retention_days"])
+            self.stdout.write(self.style.SUCCESS(f"{deleted} snapshots deleted."))
+        elif options["history"]:
+            self.show_history(*options["history"], options["at"])
+        else:
+            stats = snapshot_store.stats()
+            self.stdout.write(self.style.SUCCESS(
+                f"{stats['snapshots']} snapshots of {stats['grid_cells']} locations, "
+                f"{stats['keyframes']} keyframes: {stats['stored_bytes']} bytes stored "
+                f"for {stats['raw_bytes']} bytes, compression ratio {stats['compression_ratio']}."
+            ))
+
+    def show_history(self, lat, lon, at):
+        """
+        Write temperature, rain and wind forecast at one hour, as seen by each snapshot.
+        """
+        timestamp = None
+        if at is not None:
+            try:
+                timestamp = int(datetime.fromisoformat(at).replace(tzinfo=dt_timezone.utc).timestamp())
+            except ValueError:
+                raise CommandError(f"Invalid --at datetime: {at}")
+        for fetched_at, forecast in snapshot_store.history(*snap_to_grid(lat, lon)):
+            hour_dt = forecast.hourly_dt[0] if timestamp is None else timestamp
+            indexes = np.flatnonzero(forecast.hourly_dt == hour_dt)
+            if not len(indexes):
+                continue
+            index = indexes[0]
+            self.stdout.write(
+                f"{fetched_at:%Y-%m-%d %H:%M} run {forecast.updated_on}: "
+                f"{forecast.hourly_t[index]} C, rain {forecast.hourly_rain_1h[index]} mm, "
+                f"wind {forecast.hourly_wind_speed[index]} km/h"
+            )
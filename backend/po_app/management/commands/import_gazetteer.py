@@ -0,0 +1,139 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from po_app.gazetteer import reset_gazetteer
+from po_app.models import Places
+import csv
+import io
+import sys
+import zipfile
+
+# GeoNames dump columns
+# https://download.geonames.org/export/dump/readme.txt
+GEONAME_ID = 0
+NAME = 1
+ASCII_NAME = 2
+LATITUDE = 4
+LONGITUDE = 5
+FEATURE_CLASS = 6
+COUNTRY_CODE = 8
+POPULATION = 14
+
+
+def get_conflict_fields():
+    """
+    Return the conflict target of places upserts, None where the database
+    backend takes no target (MySQL ON DUPLICATE KEY UPDATE on geoname_id).
+    """
+    if connection.features.supports_update_conflicts_with_target:
+        return ["geoname_id"]
+    return None
+
+
+def open_dump(path):
+    """
+    Open a GeoNames dump, plain text or zip archive.
+    """
+    if zipfile.is_zipfile(path):
+        archive = zipfile.ZipFile(path)
+        names = [name for name in archive.namelist()
+                 if name.endswith(".txt") and name != "readme.txt"]
+        if not names:
+            raise CommandError(f"No dump file found in {path}.")
+        return io.TextIOWrapper(archive.open(names[0]), encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+class Command(BaseCommand):
+    """
+    Import populated places of a GeoNames dump in the offline gazetteer.
+    """
+    help = "Import a GeoNames dump (e.g. cities500.zip) in Places table, used by geocoding."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            help="GeoNames dump file, tab separated text or zip archive.",
+        )
+        parser.add_argument(
+            "--min-population",
+            type=int,
+            default=0,
+            help="Skip places with a lower population.",
+        )
+        parser.add_argument(
+            "--countries",
+            default="",
+            help="Comma separated country codes to import, all by default.",
+        )
+        parser.add_argument(
+            "--replace",
+            action="store_true",
+            help="Delete existing places before import.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Number of places inserted per query.",
+        )
+
+    def read_places(self, dump, min_population, countries):
+        """
+        Yield populated places of the dump.
+        """
+        csv.field_size_limit(sys.maxsize)
+        for row in csv.reader(dump, delimiter="\t", quoting=csv.QUOTE_NONE):
+            if len(row) <= POPULATION or row[FEATURE_CLASS] != "P":
+                continue
+            population = int(row[POPULATION] or 0)
+            if population < min_population:
+                continue
+            if countries and row[COUNTRY_CODE] not in countries:
+                continue
+            yield Places(
+                geoname_id=int(row[GEONAME_ID]),
+                name=row[NAME][:200],
+                ascii_name=row[ASCII_NAME][:200],
+                lat=float(row[LATITUDE]),
+                lon=float(row[LONGITUDE]),
+                country=row[COUNTRY_CODE],
+                population=population,
+            )
+
+    def handle(self, *args, **options):
+        countries = {code.strip().upper()
+                     for code in options["countries"].split(",") if code.strip()}
+        try:
+            dump = open_dump(options["path"])
+        except OSError as e:
+            raise CommandError(str(e))
+
+        imported = 0
+        batch = []
+        with dump, transaction.atomic():
+            if options["replace"]:
+                Places.objects.all().delete()
+            for place in self.read_places(dump, options["min_population"], countries):
+                batch.append(place)
+                if len(batch) >= options["batch_size"]:
+                    imported += self.save_batch(batch)
+                    batch = []
+            imported += self.save_batch(batch)
+        reset_gazetteer()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{imported} places imported, {Places.objects.count()} places in gazetteer."
+        ))
+
+    def save_batch(self, batch):
+        """
+        Insert or update a batch of places, on geoname_id conflicts.
+        MySQL updates on any unique key conflict and refuses a conflict target.
+        """
+        Places.objects.bulk_create(
+            batch,
+            update_conflicts=True,
+            unique_fields=get_conflict_fields(),
+            update_fields=["name", "ascii_name", "lat", "lon", "country", "population"],
+        )
+        return len(batch)
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from po_app.vigilance import fan_out_weather_warnings
+
+
+class Command(BaseCommand):
+    """
+    Notify users of weather warnings on their upcoming planned activities.
+    """
+    help = "Fetch Meteofrance weather warnings once per department and email affected users."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--horizon-hours",
+            type=int,
+            default=None,
+            help="Only planned activities starting within this number of hours.",
+        )
+        parser.add_argument(
+            "--min-color",
+            type=int,
+            default=None,
+            help="Lowest warning level notified: 2 yellow, 3 orange, 4 red.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report warnings without sending emails.",
+        )
+
+    def handle(self, *args, **options):
+        report = fan_out_weather_warnings(
+            horizon_hours=options["horizon_hours"],
+            min_color=options["min_color"],
+            dry_run=options["dry_run"],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['planned_activities']} planned activities in {report['departments']} departments: "
+            f"{report['upstream_calls']} upstream calls, {report['errors']} errors, "
+            f"{report['warnings']} warnings, {report['notifications']} notifications "
+            f"for {report['users']} users, {report['emails']} emails sent."
+        ))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from po_app.nowcast import poll_rain_nowcasts
+
+
+class Command(BaseCommand):
+    """
+    Poll rain nowcasts of planned activities starting soon.
+    """
+    help = "Refresh next hour rain forecasts of imminent planned activities locations, grouped by grid cell."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--window-minutes",
+            type=int,
+            default=None,
+            help="Only planned activities starting within this number of minutes.",
+        )
+        parser.add_argument(
+            "--refresh-interval",
+            type=int,
+            default=None,
+            help="Refresh nowcasts older than this number of seconds.",
+        )
+
+    def handle(self, *args, **options):
+        report = poll_rain_nowcasts(
+            window_minutes=options["window_minutes"],
+            refresh_interval=options["refresh_interval"],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['planned_activities']} planned activities in {report['locations']} locations: "
+            f"{report['upstream_calls']} upstream calls, {report['already_fresh']} already fresh, "
+            f"{report['errors']} errors, {report['upstream_calls_saved']} upstream calls saved."
+        ))
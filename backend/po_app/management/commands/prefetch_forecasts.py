@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+from po_app.forecast_cache import forecast_cache
+from po_app.prefetch import prefetch_planned_forecasts
+from po_app.snapshots import snapshot_store, snapshots_enabled, wait_for_snapshots
+
+
+class Command(BaseCommand):
+    """
+    Prefetch forecasts of upcoming planned activities locations.
+    Forecasts are stored as snapshots, read by web workers on a cache miss.
+    """
+    help = "Refresh forecast snapshots of upcoming planned activities locations, grouped by grid cell."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--horizon-days",
+            type=int,
+            default=None,
+            help="Only planned activities starting within this number of days.",
+        )
+        parser.add_argument(
+            "--refresh-margin",
+            type=int,
+            default=None,
+            help="Refresh cached forecasts expiring within this number of seconds.",
+        )
+
+    def handle(self, *args, **options):
+        if not snapshots_enabled():
+            raise CommandError("FORECAST_SNAPSHOTS must be enabled, prefetched forecasts are shared as snapshots.")
+        # forecasts fetched recently by any process are not fetched again
+        snapshot_store.warm_cache(forecast_cache, forecast_cache.ttl)
+        report = prefetch_planned_forecasts(
+            horizon_days=options["horizon_days"],
+            refresh_margin=options["refresh_margin"],
+        )
+        wait_for_snapshots()
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['planned_activities']} planned activities in {report['locations']} locations: "
+            f"{report['upstream_calls']} upstream calls, {report['already_cached']} already cached, "
+            f"{report['errors']} errors, {report['upstream_calls_saved']} upstream calls saved."
+        ))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from po_app.jobs import start_background_jobs
+from po_app.snapshots import run_snapshot_warmup, snapshots_enabled, wait_for_snapshots
+import threading
+
+
+class Command(BaseCommand):
+    """
+    Run background jobs in one dedicated process.
+    """
+    help = ("Run forecast prefetch, weather warnings, rain nowcast and cache warming schedulers "
+            "enabled in settings, until interrupted.")
+
+    def handle(self, *args, **options):
+        if snapshots_enabled():
+            # forecasts fetched recently by any process are not fetched again
+            run_snapshot_warmup()
+        else:
+            self.stderr.write(self.style.WARNING(
+                "FORECAST_SNAPSHOTS is disabled, forecasts fetched by jobs are not shared with web workers."))
+        stop_events = start_background_jobs()
+        if not stop_events:
+            raise CommandError("No background job enabled in settings.")
+        self.stdout.write(f"{len(stop_events)} background jobs running, press CTRL-C to stop.")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            for stop_event in stop_events:
+                stop_event.set()
+            wait_for_snapshots()
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+from po_app.snapshots import snapshots_enabled, wait_for_snapshots
+from po_app.warming import warm_popular_forecasts
+
+
+class Command(BaseCommand):
+    """
+    Warm forecasts of the most popular locations.
+    Requests counts of all processes are read from LocationRequests, warmed forecasts are stored as snapshots.
+    """
+    help = "Refresh forecast snapshots of the most requested locations and users home locations, within a budget."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--top",
+            type=int,
+            default=None,
+            help="Number of most popular locations to warm.",
+        )
+        parser.add_argument(
+            "--budget",
+            type=int,
+            default=None,
+            help="Maximum number of upstream calls.",
+        )
+        parser.add_argument(
+            "--refresh-margin",
+            type=int,
+            default=None,
+            help="Refresh cached forecasts expiring within this number of seconds.",
+        )
+
+    def handle(self, *args, **options):
+        if not snapshots_enabled():
+            raise CommandError("FORECAST_SNAPSHOTS must be enabled, requests counts and forecasts are shared with it.")
+        report = warm_popular_forecasts(
+            top_n=options["top"],
+            budget=options["budget"],
+            refresh_margin=options["refresh_margin"],
+        )
+        wait_for_snapshots()
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['locations']} popular locations: {report['upstream_calls']} upstream calls, "
+            f"{report['already_cached']} already cached, {report['over_budget']} over budget, "
+            f"{report['errors']} errors, hit rate {report['hit_rate_before']} -> {report['hit_rate_after']}."
+        ))
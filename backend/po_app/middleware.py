@@ -0,0 +1,185 @@
+from collections import OrderedDict
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+import gzip
+import re
+import threading
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_RESPONSE_COMPRESSION = {
+    "MIN_SIZE": 1024,
+    "GZIP_LEVEL": 6,
+    "BROTLI_QUALITY": 5,
+    "CACHE_ENTRIES": 1000,
+}
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml")
+
+accept_encoding_re = re.compile(r"^\s*([^\s;]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*$")
+
+
+def get_response_compression_settings():
+    """
+    Return response compression settings, with defaults.
+    """
+    return {**DEFAULT_RESPONSE_COMPRESSION, **getattr(settings, "RESPONSE_COMPRESSION", {})}
+
+
+def negotiate_encoding(accept_encoding):
+    """
+    Return preferred supported encoding of Accept-Encoding header,
+    brotli first on equal quality, None if no supported encoding is accepted.
+    """
+    qualities = {}
+    for item in accept_encoding.split(","):
+        match = accept_encoding_re.match(item)
+        if not match:
+            continue
+        try:
+            quality = float(match.group(2)) if match.group(2) else 1.0
+        except ValueError:
+            continue
+        qualities[match.group(1).lower()] = quality
+
+    supported = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best, best_quality = None, 0
+    for encoding in supported:
+        quality = qualities.get(encoding, qualities.get("*", 0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(content, encoding, compression_settings):
+    """
+    Compress bytes with encoding.
+    """
+    if encoding == "br":
+        return brotli.compress(content, quality=compression_settings["BROTLI_QUALITY"])
+    return gzip.compress(content, compresslevel=compression_settings["GZIP_LEVEL"], mtime=0)
+
+
+def compress_stream(chunks, encoding, compression_settings):
+    """
+    Compress a streamed content chunk by chunk.
+    """
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=compression_settings["BROTLI_QUALITY"])
+        for chunk in chunks:
+            data = compressor.process(chunk)
+            if data:
+                yield data
+        yield compressor.finish()
+    else:
+        compressor = zlib.compressobj(compression_settings["GZIP_LEVEL"], zlib.DEFLATED, 31)
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+
+
+class CompressedBodyCache():
+    """
+    LRU cache of compressed bodies of cacheable responses,
+    keyed by ETag, content type and encoding.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """
+        Return compressed body of key, None if missing.
+        """
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def set(self, key, body):
+        """
+        Store compressed body of key, evict least recently used bodies.
+        """
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Drop all compressed bodies.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+compressed_body_cache = CompressedBodyCache(
+    get_response_compression_settings()["CACHE_ENTRIES"])
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress responses with brotli or gzip, negotiated by Accept-Encoding.
+    Only compressible responses above MIN_SIZE bytes are compressed,
+    compressed bodies of responses with an ETag are cached.
+    """
+
+    def process_response(self, request, response):
+        """
+        Compress response body if client accepts a supported encoding.
+        """
+        if response.status_code != 200 or response.has_header("Content-Encoding"):
+            return response
+        if not response.get("Content-Type", "").startswith(COMPRESSIBLE_TYPES):
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = negotiate_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if encoding is None:
+            return response
+
+        compression_settings = get_response_compression_settings()
+        if response.streaming:
+            if response.is_async:
+                return response
+            response.streaming_content = compress_stream(
+                response.streaming_content, encoding, compression_settings)
+            del response["Content-Length"]
+        else:
+            if len(response.content) < compression_settings["MIN_SIZE"]:
+                return response
+            etag = response.get("ETag")
+            cache_key = (etag, response["Content-Type"], encoding) if etag else None
+            body = compressed_body_cache.get(cache_key) if cache_key else None
+            if body is None:
+                body = compress(response.content, encoding, compression_settings)
+                if cache_key:
+                    compressed_body_cache.set(cache_key, body)
+            if len(body) >= len(response.content):
+                return response
+            response.content = body
+            response["Content-Length"] = str(len(body))
+
+        # compressed bytes differ from uncompressed ones, ETag must be weak
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        response["Content-Encoding"] = encoding
+        return response
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('po_app', '0002_geocodingcache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Places',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('geoname_id', models.IntegerField(unique=True)),
+                ('name', models.CharField(max_length=200)),
+                ('ascii_name', models.CharField(blank=True, max_length=200)),
+                ('lat', models.FloatField()),
+                ('lon', models.FloatField()),
+                ('country', models.CharField(blank=True, max_length=2)),
+                ('population', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'Places',
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('po_app', '0003_places'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityWeatherThresholds',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('temp_min', models.FloatField(blank=True, null=True)),
+                ('temp_max', models.FloatField(blank=True, null=True)),
+                ('wind_min', models.FloatField(blank=True, null=True)),
+                ('wind_max', models.FloatField(blank=True, null=True)),
+                ('gust_max', models.FloatField(blank=True, null=True)),
+                ('rain_max', models.FloatField(blank=True, null=True)),
+                ('iso0_min', models.FloatField(blank=True, null=True)),
+                ('iso0_max', models.FloatField(blank=True, null=True)),
+                ('min_duration', models.PositiveIntegerField(default=2)),
+                ('daylight_only', models.BooleanField(default=True)),
+                ('activity', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='weather_thresholds', to='po_app.activities')),
+            ],
+            options={
+                'verbose_name_plural': 'ActivityWeatherThresholds',
+            },
+        ),
+    ]
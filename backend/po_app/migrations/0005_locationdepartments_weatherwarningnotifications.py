@@ -0,0 +1,43 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('po_app', '0004_activityweatherthresholds'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LocationDepartments',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('grid_lat', models.FloatField()),
+                ('grid_lon', models.FloatField()),
+                ('department', models.CharField(blank=True, max_length=3)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'LocationDepartments',
+                'unique_together': {('grid_lat', 'grid_lon')},
+            },
+        ),
+        migrations.CreateModel(
+            name='WeatherWarningNotifications',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('department', models.CharField(max_length=3)),
+                ('phenomenon_id', models.CharField(max_length=2)),
+                ('color', models.PositiveSmallIntegerField()),
+                ('notified_at', models.DateTimeField(auto_now_add=True)),
+                ('planned_activity', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='po_app.plannedactivities')),
+            ],
+            options={
+                'verbose_name_plural': 'WeatherWarningNotifications',
+                'unique_together': {('planned_activity', 'phenomenon_id', 'color')},
+            },
+        ),
+    ]
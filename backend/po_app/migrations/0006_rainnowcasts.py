@@ -0,0 +1,28 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('po_app', '0005_locationdepartments_weatherwarningnotifications'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RainNowcasts',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('grid_lat', models.FloatField()),
+                ('grid_lon', models.FloatField()),
+                ('forecast', models.JSONField(blank=True, default=list)),
+                ('updated_on', models.DateTimeField()),
+                ('fetched_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name_plural': 'RainNowcasts',
+                'unique_together': {('grid_lat', 'grid_lon')},
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('po_app', '0006_rainnowcasts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ForecastSnapshots',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('grid_lat', models.FloatField()),
+                ('grid_lon', models.FloatField()),
+                ('chain', models.PositiveSmallIntegerField(default=0, help_text='Number of delta snapshots since the keyframe')),
+                ('data', models.BinaryField()),
+                ('size', models.PositiveIntegerField(default=0, help_text='Uncompressed size in bytes')),
+                ('updated_on', models.DateTimeField(blank=True, help_text='Meteofrance model run time', null=True)),
+                ('fetched_at', models.DateTimeField(help_text='Last time this forecast was fetched')),
+                ('base', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='deltas', to='po_app.forecastsnapshots')),
+            ],
+            options={
+                'verbose_name_plural': 'ForecastSnapshots',
+                'indexes': [models.Index(fields=['grid_lat', 'grid_lon', 'fetched_at'], name='po_app_fore_grid_la_85421e_idx')],
+            },
+        ),
+    ]
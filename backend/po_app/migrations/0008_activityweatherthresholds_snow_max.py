@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-18 17:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('po_app', '0007_forecastsnapshots'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activityweatherthresholds',
+            name='snow_max',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
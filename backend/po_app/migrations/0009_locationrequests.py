@@ -0,0 +1,28 @@
+# Generated by Django 5.1.3 on 2026-10-18 17:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('po_app', '0008_activityweatherthresholds_snow_max'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LocationRequests',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('grid_lat', models.FloatField()),
+                ('grid_lon', models.FloatField()),
+                ('hour', models.DateTimeField(help_text='Start of the hour')),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'LocationRequests',
+                'indexes': [models.Index(fields=['hour'], name='po_app_loca_hour_69b74a_idx')],
+                'unique_together': {('grid_lat', 'grid_lon', 'hour')},
+            },
+        ),
+    ]
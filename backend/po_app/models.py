@@ -176,3 +176,326 @@ class PlannedActivities(models.Model):
         Returns a string representation of the planned activity object.
         """
         return f"{self.user.username} - {self.activity.name} - {self.start_datetime} - {self.end_datetime}"
+
+
+class GeocodingCache(models.Model):
+    """
+    Model representing a cached geocoding lookup.
+    Empty results mean the city was not found.
+    """
+
+    query = models.CharField(
+        unique=True,
+        max_length=100,
+        blank=False,
+        null=False,
+    )
+    results = models.JSONField(
+        blank=True,
+        null=False,
+        default=list,
+    )
+    expires_at = models.DateTimeField(
+        blank=False,
+        null=False,
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "GeocodingCache"
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the geocoding cache object.
+        """
+        return f"{self.query} - {len(self.results)} results - {self.expires_at}"
+
+
+class Places(models.Model):
+    """
+    Model representing a populated place of the offline gazetteer,
+    imported from a GeoNames dump.
+    """
+
+    geoname_id = models.IntegerField(
+        unique=True,
+        blank=False,
+        null=False,
+    )
+    name = models.CharField(
+        max_length=200,
+        blank=False,
+        null=False,
+    )
+    ascii_name = models.CharField(
+        max_length=200,
+        blank=True,
+        null=False,
+    )
+    lat = models.FloatField(
+        blank=False,
+        null=False,
+    )
+    lon = models.FloatField(
+        blank=False,
+        null=False,
+    )
+    country = models.CharField(
+        max_length=2,
+        blank=True,
+        null=False,
+    )
+    population = models.BigIntegerField(
+        blank=False,
+        null=False,
+        default=0,
+    )
+
+    class Meta:
+        verbose_name_plural = "Places"
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the place object.
+        """
+        return f"{self.name} - {self.country} - {self.population}"
+
+
+class ActivityWeatherThresholds(models.Model):
+    """
+    Model representing weather thresholds suitable for an activity.
+    Empty thresholds are not checked.
+    """
+
+    activity = models.OneToOneField(
+        Activities,
+        on_delete=models.CASCADE,
+        related_name="weather_thresholds",
+    )
+    temp_min = models.FloatField(blank=True, null=True)
+    temp_max = models.FloatField(blank=True, null=True)
+    wind_min = models.FloatField(blank=True, null=True)
+    wind_max = models.FloatField(blank=True, null=True)
+    gust_max = models.FloatField(blank=True, null=True)
+    rain_max = models.FloatField(blank=True, null=True)
+    snow_max = models.FloatField(blank=True, null=True)
+    iso0_min = models.FloatField(blank=True, null=True)
+    iso0_max = models.FloatField(blank=True, null=True)
+    min_duration = models.PositiveIntegerField(
+        blank=False,
+        null=False,
+        default=2,
+    )
+    daylight_only = models.BooleanField(
+        blank=False,
+        null=False,
+        default=True,
+    )
+
+    class Meta:
+        verbose_name_plural = "ActivityWeatherThresholds"
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the activity weather thresholds object.
+        """
+        return f"{self.activity.name} - weather thresholds"
+
+
+class LocationDepartments(models.Model):
+    """
+    Model representing the department of a forecast grid cell,
+    empty for locations without Meteofrance weather warnings.
+    """
+
+    grid_lat = models.FloatField(
+        blank=False,
+        null=False,
+    )
+    grid_lon = models.FloatField(
+        blank=False,
+        null=False,
+    )
+    department = models.CharField(
+        max_length=3,
+        blank=True,
+        null=False,
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("grid_lat", "grid_lon")
+        verbose_name_plural = "LocationDepartments"
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the location department object.
+        """
+        return f"{self.grid_lat}, {self.grid_lon} - {self.department or 'no department'}"
+
+
+class WeatherWarningNotifications(models.Model):
+    """
+    Model representing a weather warning notified for a planned activity,
+    so each warning level is notified only once.
+    """
+
+    planned_activity = models.ForeignKey(
+        PlannedActivities,
+        on_delete=models.CASCADE,
+    )
+    department = models.CharField(
+        max_length=3,
+        blank=False,
+        null=False,
+    )
+    phenomenon_id = models.CharField(
+        max_length=2,
+        blank=False,
+        null=False,
+    )
+    color = models.PositiveSmallIntegerField(
+        blank=False,
+        null=False,
+    )
+    notified_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("planned_activity", "phenomenon_id", "color")
+        verbose_name_plural = "WeatherWarningNotifications"
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the weather warning notification object.
+        """
+        return f"{self.planned_activity} - {self.department} - {self.phenomenon_id} - {self.color}"
+
+
+class RainNowcasts(models.Model):
+    """
+    Model representing the next hour rain forecast of a forecast grid cell,
+    polled for imminent planned activities.
+    """
+
+    grid_lat = models.FloatField(
+        blank=False,
+        null=False,
+    )
+    grid_lon = models.FloatField(
+        blank=False,
+        null=False,
+    )
+    forecast = models.JSONField(
+        blank=True,
+        null=False,
+        default=list,
+    )
+    updated_on = models.DateTimeField(
+        blank=False,
+        null=False,
+    )
+    fetched_at = models.DateTimeField(
+        blank=False,
+        null=False,
+    )
+
+    class Meta:
+        unique_together = ("grid_lat", "grid_lon")
+        verbose_name_plural = "RainNowcasts"
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the rain nowcast object.
+        """
+        return f"{self.grid_lat}, {self.grid_lon} - {self.updated_on}"
+
+
+class ForecastSnapshots(models.Model):
+    """
+    Model representing a forecast fetched for a forecast grid cell, zlib compressed.
+    A delta snapshot is compressed with its base, the previous snapshot of the cell,
+    as preset dictionary. A keyframe has no base.
+    """
+
+    grid_lat = models.FloatField(
+        blank=False,
+        null=False,
+    )
+    grid_lon = models.FloatField(
+        blank=False,
+        null=False,
+    )
+    base = models.ForeignKey(
+        "self",
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name="deltas",
+    )
+    chain = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="Number of delta snapshots since the keyframe",
+    )
+    data = models.BinaryField(
+        blank=False,
+        null=False,
+    )
+    size = models.PositiveIntegerField(
+        default=0,
+        help_text="Uncompressed size in bytes",
+    )
+    updated_on = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text="Meteofrance model run time",
+    )
+    fetched_at = models.DateTimeField(
+        blank=False,
+        null=False,
+        help_text="Last time this forecast was fetched",
+    )
+
+    class Meta:
+        indexes = [models.Index(fields=["grid_lat", "grid_lon", "fetched_at"])]
+        verbose_name_plural = "ForecastSnapshots"
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the forecast snapshot object.
+        """
+        return f"{self.grid_lat}, {self.grid_lon} - {self.fetched_at}"
+
+
+class LocationRequests(models.Model):
+    """
+    Model representing forecast requests of a forecast grid cell during an hour,
+    counted by every process for popular locations cache warming.
+    """
+
+    grid_lat = models.FloatField(
+        blank=False,
+        null=False,
+    )
+    grid_lon = models.FloatField(
+        blank=False,
+        null=False,
+    )
+    hour = models.DateTimeField(
+        blank=False,
+        null=False,
+        help_text="Start of the hour",
+    )
+    count = models.PositiveIntegerField(
+        default=0,
+    )
+
+    class Meta:
+        unique_together = ("grid_lat", "grid_lon", "hour")
+        indexes = [models.Index(fields=["hour"])]
+        verbose_name_plural = "LocationRequests"
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the location requests object.
+        """
+        return f"{self.grid_lat}, {self.grid_lon} - {self.hour} - {self.count}"
@@ -0,0 +1,162 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.utils import timezone
+from .circuit_breaker import meteofrance_breaker
+from .forecast_cache import snap_to_grid
+from .lanes import background_lane
+from .models import PlannedActivities, RainNowcasts
+from .periodic import start_periodic
+from .weather import weather_client
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RAIN_NOWCAST = {
+    "INTERVAL": 0,
+    "WINDOW_MINUTES": 60,
+    "REFRESH_INTERVAL": 300,
+    "MAX_AGE": 900,
+}
+
+# Meteofrance rain levels, 1 is dry
+RAIN_LEVEL_DRY = 1
+
+
+def get_rain_nowcast_settings():
+    """
+    Return rain nowcast settings, with defaults.
+    """
+    return {**DEFAULT_RAIN_NOWCAST, **getattr(settings, "RAIN_NOWCAST", {})}
+
+
+def get_imminent_grid_cells(window_minutes):
+    """
+    Group planned activities starting within window_minutes by grid cell.
+    Return a dict {grid_cell: number of planned activities}.
+    """
+    now = timezone.now()
+    locations = PlannedActivities.objects.filter(
+        start_datetime__gte=now,
+        start_datetime__lte=now + timedelta(minutes=window_minutes),
+    ).values_list("location", flat=True)
+
+    grid_cells = {}
+    for location in locations:
+        grid_cell = snap_to_grid(location["lat"], location["lon"])
+        grid_cells[grid_cell] = grid_cells.get(grid_cell, 0) + 1
+    return grid_cells
+
+
+def fetch_rain_nowcast(grid_lat, grid_lon):
+    """
+    Get next hour rain forecast from Meteofrance API, through its circuit breaker.
+    Return (update datetime, [{"dt", "rain", "desc"}]).
+    """
+    rain = meteofrance_breaker.call(
+        lambda: weather_client.get_rain(grid_lat, grid_lon, language="en")
+    )
+    forecast = [
+        {"dt": item["dt"], "rain": item["rain"], "desc": item.get("desc", "")}
+        for item in rain.forecast
+    ]
+    return datetime.fromtimestamp(rain.updated_on, dt_timezone.utc), forecast
+
+
+@background_lane()
+def poll_rain_nowcasts(window_minutes=None, refresh_interval=None):
+    """
+    Refresh rain nowcasts of planned activities starting soon.
+    One upstream call per grid cell, only for nowcasts older than
+    refresh_interval seconds. Nowcasts not refreshed within MAX_AGE
+    seconds are deleted. Return a report of upstream calls.
+    """
+    nowcast_settings = get_rain_nowcast_settings()
+    if window_minutes is None:
+        window_minutes = nowcast_settings["WINDOW_MINUTES"]
+    if refresh_interval is None:
+        refresh_interval = nowcast_settings["REFRESH_INTERVAL"]
+
+    now = timezone.now()
+    RainNowcasts.objects.filter(
+        fetched_at__lt=now - timedelta(seconds=nowcast_settings["MAX_AGE"])).delete()
+
+    grid_cells = get_imminent_grid_cells(window_minutes)
+    fresh = {
+        (grid_lat, grid_lon)
+        for grid_lat, grid_lon in RainNowcasts.objects.filter(
+            fetched_at__gte=now - timedelta(seconds=refresh_interval),
+        ).values_list("grid_lat", "grid_lon")
+    }
+    report = {
+        "planned_activities": sum(grid_cells.values()),
+        "locations": len(grid_cells),
+        "already_fresh": 0,
+        "upstream_calls": 0,
+        "errors": 0,
+    }
+    for grid_lat, grid_lon in grid_cells:
+        if (grid_lat, grid_lon) in fresh:
+            report["already_fresh"] += 1
+            continue
+        try:
+            updated_on, forecast = fetch_rain_nowcast(grid_lat, grid_lon)
+            report["upstream_calls"] += 1
+        except Exception as e:
+            report["errors"] += 1
+            logger.warning("Rain nowcast failed for %s, %s: %s", grid_lat, grid_lon, e)
+            continue
+        RainNowcasts.objects.update_or_create(
+            grid_lat=grid_lat,
+            grid_lon=grid_lon,
+            defaults={"forecast": forecast, "updated_on": updated_on, "fetched_at": timezone.now()},
+        )
+    # one call per planned activity without grouping
+    report["upstream_calls_saved"] = report["planned_activities"] - \
+        report["upstream_calls"] - report["errors"]
+    return report
+
+
+def get_rain_nowcast(planned_activity):
+    """
+    Return the polled rain nowcast of a planned activity location,
+    None if it does not start soon or has no recent nowcast.
+    Never calls Meteofrance API.
+    """
+    nowcast_settings = get_rain_nowcast_settings()
+    now = timezone.now()
+    if not now <= planned_activity.start_datetime <= now + timedelta(minutes=nowcast_settings["WINDOW_MINUTES"]):
+        return None
+    grid_lat, grid_lon = snap_to_grid(planned_activity.location["lat"], planned_activity.location["lon"])
+    nowcast = RainNowcasts.objects.filter(
+        grid_lat=grid_lat,
+        grid_lon=grid_lon,
+        fetched_at__gte=now - timedelta(seconds=nowcast_settings["MAX_AGE"]),
+    ).first()
+    if nowcast is None:
+        return None
+
+    forecast = [
+        {
+            "datetime": datetime.fromtimestamp(item["dt"], dt_timezone.utc),
+            "rain": item["rain"],
+            "desc": item["desc"],
+        }
+        for item in nowcast.forecast
+    ]
+    return {
+        "updated_on": nowcast.updated_on,
+        "next_rain": next((item["datetime"] for item in forecast if item["rain"] > RAIN_LEVEL_DRY), None),
+        "forecast": forecast,
+    }
+
+
+def start_nowcast_scheduler():
+    """
+    Start rain nowcast polling in a background thread.
+    Return the stop event, or None if INTERVAL is 0.
+    """
+    interval = get_rain_nowcast_settings()["INTERVAL"]
+    if not interval:
+        return None
+    return start_periodic(poll_rain_nowcasts, "Rain nowcast poll", lambda: interval, "rain-nowcast")
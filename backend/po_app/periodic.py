@@ -0,0 +1,37 @@
+from django.db import close_old_connections
+import threading
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def run_periodic(job, label, next_wait, stop_event):
+    """
+    Run job after each next_wait() seconds until stop_event is set.
+    Its report or error is logged, database connections are closed
+    after each run as after a request.
+    """
+    while not stop_event.wait(next_wait()):
+        try:
+            report = job()
+            logger.info("%s: %s", label, report)
+        except Exception as e:
+            logger.error("%s failed: %s", label, e)
+        finally:
+            close_old_connections()
+
+
+def start_periodic(job, label, next_wait, thread_name):
+    """
+    Run job periodically in a background daemon thread, see run_periodic.
+    Return the stop event.
+    """
+    stop_event = threading.Event()
+    threading.Thread(
+        target=run_periodic,
+        args=(job, label, next_wait, stop_event),
+        name=thread_name,
+        daemon=True,
+    ).start()
+    return stop_event
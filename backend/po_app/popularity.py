@@ -0,0 +1,200 @@
+from collections import Counter, deque
+from datetime import datetime, timezone as dt_timezone
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from .models import LocationRequests
+from .periodic import start_periodic
+from .snapshots import snapshots_enabled
+import threading
+import time
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_WARMING = {
+    "SCHEDULE": [],
+    "TOP_N": 300,
+    "BUDGET": 100,
+    "WINDOW_HOURS": 24,
+    "REQUEST_WEIGHT": 1,
+    "USER_WEIGHT": 1,
+    "REFRESH_MARGIN": 300,
+    "FLUSH_INTERVAL": 60,
+}
+
+
+def get_cache_warming_settings():
+    """
+    Return cache warming settings, with defaults.
+    """
+    return {**DEFAULT_CACHE_WARMING, **getattr(settings, "CACHE_WARMING", {})}
+
+
+class LocationPopularity():
+    """
+    Thread safe forecast requests count by grid cell, over the last window_hours
+    in hourly buckets. Counts the first request of each cell warmed ahead,
+    within its TTL, as a cache miss avoided by warming. Requests not flushed
+    yet to LocationRequests are kept apart by hour.
+    """
+
+    def __init__(self, window_hours, clock=time.time):
+        self.window_hours = window_hours
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Forget requests and warmed cells.
+        """
+        with self._lock:
+            self._buckets = deque()
+            self._pending = Counter()
+            self._warmed = {}
+            self.misses_avoided = 0
+            self.last_warming = None
+
+    def _trim(self, hour):
+        """
+        Drop buckets older than the window. Lock must be held.
+        """
+        while self._buckets and self._buckets[0][0] <= hour - self.window_hours:
+            self._buckets.popleft()
+
+    def record(self, key):
+        """
+        Count a forecast request of grid cell key.
+        """
+        now = self.clock()
+        hour = int(now // 3600)
+        with self._lock:
+            if not self._buckets or self._buckets[-1][0] != hour:
+                self._buckets.append((hour, Counter()))
+                self._trim(hour)
+            self._buckets[-1][1][key] += 1
+            self._pending[(hour, key)] += 1
+            warmed_until = self._warmed.pop(key, None)
+            if warmed_until is not None and warmed_until > now:
+                self.misses_avoided += 1
+
+    def counts(self):
+        """
+        Return requests count by grid cell over the window.
+        """
+        with self._lock:
+            self._trim(int(self.clock() // 3600))
+            counts = Counter()
+            for _, bucket in self._buckets:
+                counts.update(bucket)
+            return counts
+
+    def take_pending(self):
+        """
+        Return and forget requests counts not flushed yet, by (hour, key).
+        """
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            return pending
+
+    def restore_pending(self, pending):
+        """
+        Keep requests counts back after a failed flush.
+        """
+        with self._lock:
+            self._pending.update(pending)
+
+    def mark_warmed(self, keys, ttl, report):
+        """
+        Remember cells fetched by a warming run, fresh for ttl seconds, and its report.
+        """
+        warmed_until = self.clock() + ttl
+        with self._lock:
+            now = self.clock()
+            self._warmed = {key: until for key, until in self._warmed.items() if until > now}
+            self._warmed.update((key, warmed_until) for key in keys)
+            self.last_warming = report
+
+    def stats(self):
+        """
+        Return tracked cells and requests, misses avoided by warming and the last warming report.
+        """
+        counts = self.counts()
+        with self._lock:
+            return {
+                "locations": len(counts),
+                "requests": sum(counts.values()),
+                "window_hours": self.window_hours,
+                "misses_avoided": self.misses_avoided,
+                "last_warming": self.last_warming,
+            }
+
+
+location_popularity = LocationPopularity(get_cache_warming_settings()["WINDOW_HOURS"])
+
+
+def hour_start(hour):
+    """
+    Return the UTC datetime starting an hour counted since the epoch.
+    """
+    return datetime.fromtimestamp(hour * 3600, dt_timezone.utc)
+
+
+def add_request_counts(pending):
+    """
+    Add requests counts by (hour, grid cell) to LocationRequests.
+    """
+    for (hour, (grid_lat, grid_lon)), count in pending.items():
+        requests = LocationRequests.objects.filter(grid_lat=grid_lat, grid_lon=grid_lon, hour=hour_start(hour))
+        if requests.update(count=F("count") + count):
+            continue
+        try:
+            with transaction.atomic():
+                LocationRequests.objects.create(
+                    grid_lat=grid_lat, grid_lon=grid_lon, hour=hour_start(hour), count=count)
+        except IntegrityError:
+            # created meanwhile by another process
+            requests.update(count=F("count") + count)
+
+
+def flush_request_counts(popularity=location_popularity):
+    """
+    Add requests counted by this process since the last flush to LocationRequests,
+    shared by all processes, and delete hours out of WINDOW_HOURS.
+    Counts are kept back if the database fails. Return the number of requests flushed.
+    """
+    pending = popularity.take_pending()
+    try:
+        add_request_counts(pending)
+    except Exception:
+        popularity.restore_pending(pending)
+        raise
+    window_start = int(popularity.clock() // 3600) - popularity.window_hours
+    LocationRequests.objects.filter(hour__lte=hour_start(window_start)).delete()
+    return sum(pending.values())
+
+
+def get_shared_request_counts(popularity=location_popularity):
+    """
+    Return requests count by grid cell over the window, counted by all processes.
+    """
+    window_start = int(popularity.clock() // 3600) - popularity.window_hours
+    return Counter({
+        (cell["grid_lat"], cell["grid_lon"]): cell["requests"]
+        for cell in LocationRequests.objects.filter(hour__gt=hour_start(window_start)).values(
+            "grid_lat", "grid_lon").annotate(requests=Sum("count"))
+    })
+
+
+def start_request_counts_flush():
+    """
+    Flush requests counts of this process every FLUSH_INTERVAL seconds,
+    in a background thread. Return the stop event, or None if FLUSH_INTERVAL
+    is 0 or snapshots are disabled.
+    """
+    interval = get_cache_warming_settings()["FLUSH_INTERVAL"]
+    if not interval or not snapshots_enabled():
+        return None
+    return start_periodic(flush_request_counts, "Requests counts flush", lambda: interval, "requests-counts-flush")
@@ -0,0 +1,96 @@
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from .forecast_cache import forecast_cache, snap_to_grid
+from .lanes import background_lane
+from .models import PlannedActivities
+from .periodic import start_periodic
+from .weather import fetch_forecast
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FORECAST_PREFETCH = {
+    "INTERVAL": 0,
+    "HORIZON_DAYS": 15,
+    "REFRESH_MARGIN": 300,
+}
+
+
+def get_prefetch_settings():
+    """
+    Return forecast prefetch settings, with defaults.
+    """
+    return {**DEFAULT_FORECAST_PREFETCH, **getattr(settings, "FORECAST_PREFETCH", {})}
+
+
+def get_upcoming_grid_cells(horizon_days):
+    """
+    Group upcoming planned activities locations by grid cell.
+    Return a dict {grid_cell: number of planned activities}.
+    """
+    now = timezone.now()
+    locations = PlannedActivities.objects.filter(
+        end_datetime__gte=now,
+        start_datetime__lte=now + timedelta(days=horizon_days),
+    ).values_list("location", flat=True)
+
+    grid_cells = {}
+    for location in locations:
+        grid_cell = snap_to_grid(location["lat"], location["lon"])
+        grid_cells[grid_cell] = grid_cells.get(grid_cell, 0) + 1
+    return grid_cells
+
+
+@background_lane()
+def prefetch_planned_forecasts(horizon_days=None, refresh_margin=None):
+    """
+    Refresh forecasts of upcoming planned activities locations.
+    Only cache entries missing or expiring within refresh_margin
+    seconds are fetched. Return a report of upstream calls.
+    """
+    prefetch_settings = get_prefetch_settings()
+    if horizon_days is None:
+        horizon_days = prefetch_settings["HORIZON_DAYS"]
+    if refresh_margin is None:
+        refresh_margin = prefetch_settings["REFRESH_MARGIN"]
+
+    grid_cells = get_upcoming_grid_cells(horizon_days)
+    report = {
+        "planned_activities": sum(grid_cells.values()),
+        "locations": len(grid_cells),
+        "already_cached": 0,
+        "upstream_calls": 0,
+        "errors": 0,
+    }
+    for grid_lat, grid_lon in grid_cells:
+        if forecast_cache.time_to_live((grid_lat, grid_lon)) > refresh_margin:
+            report["already_cached"] += 1
+            continue
+        try:
+            forecast_cache.refresh(
+                (grid_lat, grid_lon),
+                lambda: fetch_forecast(grid_lat, grid_lon),
+            )
+            report["upstream_calls"] += 1
+        except Exception as e:
+            report["errors"] += 1
+            logger.warning("Prefetch failed for %s, %s: %s",
+                           grid_lat, grid_lon, e)
+    # one call per planned activity without grouping and prefetch
+    report["upstream_calls_saved"] = report["planned_activities"] - \
+        report["upstream_calls"] - report["errors"]
+    return report
+
+
+def start_prefetch_scheduler():
+    """
+    Start forecast prefetch in a background thread. Prefetched forecasts
+    reach web workers as snapshots, see START_BACKGROUND_JOBS.
+    Return the stop event, or None if INTERVAL is 0.
+    """
+    interval = get_prefetch_settings()["INTERVAL"]
+    if not interval:
+        return None
+    return start_periodic(prefetch_planned_forecasts, "Forecast prefetch", lambda: interval, "forecast-prefetch")
@@ -0,0 +1,329 @@
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from django.conf import settings
+from .circuit_breaker import UpstreamUnavailableError
+from .lanes import DEFAULT_UPSTREAM_LANES, INTERACTIVE, LaneScheduler, current_lane, get_upstream_lanes_settings
+import asyncio
+import datetime
+import threading
+import time
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROVIDER_QUOTA = {
+    "RATE": 0,
+    "BURST": 1,
+    "MAX_WAIT": 2,
+}
+
+PROVIDERS = ["Meteofrance", "Openweathermap"]
+
+# rolling windows of usage, in seconds
+USAGE_WINDOWS = {"last_minute": 60, "last_hour": 3600}
+
+
+def get_upstream_quota_settings():
+    """
+    Return quota settings of each provider, with defaults.
+    """
+    quota_settings = getattr(settings, "UPSTREAM_QUOTA", {})
+    return {
+        provider: {**DEFAULT_PROVIDER_QUOTA, **quota_settings.get(provider, {})}
+        for provider in PROVIDERS
+    }
+
+
+class QuotaExceededError(UpstreamUnavailableError):
+    """
+    Raised when a call is refused because the provider quota is spent.
+    """
+
+    def __init__(self, name):
+        super().__init__(name, f"{name} quota exceeded, please retry later.")
+
+
+class TokenBucket():
+    """
+    Thread safe token bucket: rate tokens per second, up to capacity.
+    A call reserves a token, and waits until it is refilled if the bucket
+    is empty. Rate 0 means no limit.
+    """
+
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated_at = clock()
+
+    def _refill(self):
+        """
+        Add tokens earned since last update. Lock must be held.
+        """
+        now = self.clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def reserve(self, max_wait):
+        """
+        Reserve a token, return seconds to wait before using it,
+        None if it would take more than max_wait seconds.
+        """
+        if not self.rate:
+            return 0
+        with self._lock:
+            self._refill()
+            wait = max(0, (1 - self._tokens) / self.rate)
+            if wait > max_wait:
+                return None
+            self._tokens -= 1
+            return wait
+
+    def try_take(self, floor=0):
+        """
+        Take a token without waiting, only if more than floor tokens remain after it.
+        """
+        if not self.rate:
+            return True
+        with self._lock:
+            self._refill()
+            if self._tokens < 1 + floor:
+                return False
+            self._tokens -= 1
+            return True
+
+    def consume(self, tokens):
+        """
+        Take tokens without waiting, the bucket may go into debt.
+        """
+        if not self.rate:
+            return
+        with self._lock:
+            self._refill()
+            self._tokens -= tokens
+
+    @property
+    def tokens(self):
+        """
+        Return available tokens.
+        """
+        if not self.rate:
+            return None
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def reset(self):
+        """
+        Fill the bucket.
+        """
+        with self._lock:
+            self._tokens = self.capacity
+            self._updated_at = self.clock()
+
+
+class ProviderLedger():
+    """
+    Calls of one provider: totals since start, calls of the last hour
+    for rolling usage, the token bucket budgeting them and the lanes
+    scheduling interactive and background calls.
+    """
+
+    def __init__(self, name, rate, burst, max_wait, clock=time.monotonic, lanes_settings=None):
+        self.name = name
+        self.max_wait = max_wait
+        self.clock = clock
+        self.bucket = TokenBucket(rate, burst, clock)
+        lanes_settings = {**DEFAULT_UPSTREAM_LANES, **(lanes_settings or {})}
+        self.lanes = LaneScheduler(
+            name, self.bucket, lanes_settings["BACKGROUND_CONCURRENCY"], lanes_settings["INTERACTIVE_BUSY"],
+            lanes_settings["INTERACTIVE_RESERVE"], lanes_settings["BACKGROUND_MAX_WAIT"], clock)
+        self._lock = threading.Lock()
+        self.reset_counters()
+
+    def reset_counters(self):
+        """
+        Reset call counters.
+        """
+        with self._lock:
+            self._recent = deque()
+            self.calls = 0
+            self.errors = 0
+            self.refused = 0
+            self.deferred = 0
+            self.deferred_seconds = 0.0
+            self.latency_total = 0.0
+            self.statuses = {}
+            self.today = datetime.date.today()
+            self.calls_today = 0
+
+    def reserve(self):
+        """
+        Reserve a call, return seconds to wait before sending it.
+        Raise QuotaExceededError if the quota is spent for longer than MAX_WAIT.
+        """
+        wait = self.bucket.reserve(self.max_wait)
+        with self._lock:
+            if wait is None:
+                self.refused += 1
+                logger.warning("Upstream quota of %s exceeded, call refused", self.name)
+                raise QuotaExceededError(self.name)
+            if wait:
+                self.deferred += 1
+                self.deferred_seconds += wait
+        return wait
+
+    def acquire(self):
+        """
+        Wait for a call budget, or raise QuotaExceededError.
+        """
+        wait = self.reserve()
+        if wait:
+            time.sleep(wait)
+
+    async def aacquire(self):
+        """
+        Async version of acquire, waits without blocking the event loop.
+        """
+        wait = self.reserve()
+        if wait:
+            await asyncio.sleep(wait)
+
+    @contextmanager
+    def slot(self):
+        """
+        Hold a call slot in the lane of the current context.
+        Interactive calls wait for the quota, background calls for a token
+        left over by interactive ones, see LaneScheduler.
+        """
+        lane = self.lanes.enter(current_lane())
+        try:
+            if lane == INTERACTIVE:
+                self.acquire()
+            yield
+        finally:
+            self.lanes.leave(lane)
+
+    @asynccontextmanager
+    async def aslot(self):
+        """
+        Async version of slot.
+        """
+        lane = await self.lanes.aenter(current_lane())
+        try:
+            if lane == INTERACTIVE:
+                await self.aacquire()
+            yield
+        finally:
+            self.lanes.leave(lane)
+
+    def record(self, latency, status=None, attempts=1):
+        """
+        Record a sent call, status None for network errors.
+        Retries are recorded as calls and taken from the bucket.
+        """
+        if attempts > 1:
+            self.bucket.consume(attempts - 1)
+        now = self.clock()
+        with self._lock:
+            today = datetime.date.today()
+            if today != self.today:
+                self.today, self.calls_today = today, 0
+            self.calls += attempts
+            self.calls_today += attempts
+            self.latency_total += latency
+            if status is None or status >= 400:
+                self.errors += 1
+            key = str(status) if status is not None else "error"
+            self.statuses[key] = self.statuses.get(key, 0) + 1
+            for _ in range(attempts):
+                self._recent.append(now)
+            self._trim(now)
+        logger.debug("Upstream call %s: status %s, %.1f ms, %s attempts",
+                     self.name, status, latency * 1000, attempts)
+
+    def _trim(self, now):
+        """
+        Drop calls older than the largest usage window. Lock must be held.
+        """
+        oldest = now - max(USAGE_WINDOWS.values())
+        while self._recent and self._recent[0] < oldest:
+            self._recent.popleft()
+
+    def stats(self):
+        """
+        Return call counters, rolling usage and remaining budget.
+        """
+        now = self.clock()
+        with self._lock:
+            self._trim(now)
+            usage = {
+                window: sum(1 for called_at in self._recent if called_at >= now - seconds)
+                for window, seconds in USAGE_WINDOWS.items()
+            }
+            requests_count = sum(self.statuses.values())
+            stats = {
+                "calls": self.calls,
+                "today": self.calls_today if self.today == datetime.date.today() else 0,
+                **usage,
+                "errors": self.errors,
+                "statuses": dict(self.statuses),
+                "avg_latency_ms": round(1000 * self.latency_total / requests_count, 1) if requests_count else None,
+                "refused": self.refused,
+                "deferred": self.deferred,
+                "deferred_seconds": round(self.deferred_seconds, 3),
+            }
+        rate = self.bucket.rate
+        stats["quota"] = {
+            "rate": rate,
+            "burst": self.bucket.capacity,
+            "tokens": round(self.bucket.tokens, 2) if rate else None,
+            "budget_per_minute": rate * 60 if rate else None,
+            "budget_per_hour": rate * 3600 if rate else None,
+        }
+        stats["lanes"] = self.lanes.stats()
+        return stats
+
+
+class UpstreamLedger():
+    """
+    Ledger of outgoing calls to upstream providers, with their quotas.
+    Counters and budgets are kept by each worker process.
+    """
+
+    def __init__(self, quota_settings, clock=time.monotonic, lanes_settings=None):
+        self.providers = {
+            provider: ProviderLedger(
+                provider, quota["RATE"], quota["BURST"], quota["MAX_WAIT"], clock, lanes_settings)
+            for provider, quota in quota_settings.items()
+        }
+
+    def __getitem__(self, provider):
+        return self.providers[provider]
+
+    def get(self, provider):
+        """
+        Return the ledger of provider, None for unknown providers.
+        """
+        return self.providers.get(provider)
+
+    def reset(self):
+        """
+        Reset counters and fill buckets.
+        """
+        for ledger in self.providers.values():
+            ledger.reset_counters()
+            ledger.bucket.reset()
+            ledger.lanes.reset()
+
+    def stats(self):
+        """
+        Return usage of each provider, keyed by lowercase name.
+        """
+        return {provider.lower(): ledger.stats() for provider, ledger in self.providers.items()}
+
+
+upstream_ledger = UpstreamLedger(get_upstream_quota_settings(), lanes_settings=get_upstream_lanes_settings())
@@ -0,0 +1,91 @@
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders, json
+import orjson
+
+# types orjson can't serialize are converted like JSONRenderer does
+drf_encoder = encoders.JSONEncoder()
+
+# orjson reads integers over 64 bits as floats, json module keeps them exact,
+# digits are mapped to 0 to look for 19 digits numbers with a fast bytes search
+digits_table = bytes.maketrans(b"123456789", b"000000000")
+long_integer = b"0" * 19
+
+
+# orjson options of OrjsonRenderer
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def orjson_dumps(data):
+    """
+    Serialize data to compact JSON bytes with orjson, like OrjsonRenderer.
+    Raise orjson.JSONEncodeError for data orjson can't serialize.
+    """
+    ret = orjson.dumps(data, default=drf_encoder.default, option=ORJSON_OPTIONS)
+    # escape \u2028 and \u2029 like JSONRenderer, output is a strict javascript subset
+    return ret.replace("\u2028".encode(), b"\\u2028").replace("\u2029".encode(), b"\\u2029")
+
+
+def has_long_integer(content):
+    """
+    Return True if JSON content may hold an integer over 64 bits.
+    """
+    return long_integer in content.translate(digits_table)
+
+
+class OrjsonRenderer(JSONRenderer):
+    """
+    Renderer which serializes to JSON with orjson.
+    Same output as JSONRenderer with compact and unicode settings, except floats:
+    NaN and Infinity are rendered as null where JSONRenderer raises ValueError,
+    exponents are written without "+" and leading zeros (1e16, not 1e+16),
+    same values once parsed.
+    Indented output (browsable API) is rendered by JSONRenderer.
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Render data into JSON, returning a bytestring.
+        """
+        if data is None:
+            return b""
+
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        if indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            return orjson_dumps(data)
+        except orjson.JSONEncodeError:
+            # integers over 64 bits, circular references...
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+class OrjsonParser(JSONParser):
+    """
+    Parses JSON-serialized data with orjson.
+    """
+    renderer_class = OrjsonRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """
+        Parses the incoming bytestream as JSON and returns the resulting data.
+        """
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if encoding.lower().replace("_", "-") not in ("utf-8", "utf8"):
+            return super().parse(stream, media_type, parser_context)
+
+        content = stream.read()
+        if not has_long_integer(content):
+            try:
+                return orjson.loads(content)
+            except orjson.JSONDecodeError as exc:
+                raise ParseError(f"JSON parse error - {exc}")
+        try:
+            parse_constant = json.strict_constant if self.strict else None
+            return json.loads(content.decode(encoding), parse_constant=parse_constant)
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
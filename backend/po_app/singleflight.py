@@ -0,0 +1,173 @@
+from contextlib import contextmanager
+from django.db import connection
+from .lanes import BACKGROUND, INTERACTIVE, Lane, current_lane, use_lane
+import threading
+import asyncio
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class _Call():
+    """
+    In-flight call shared by the leader and its waiters.
+    """
+
+    def __init__(self, lane):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.lane = lane
+
+
+class SingleFlight():
+    """
+    Coalesce concurrent calls with the same key.
+    Only the first caller (leader) runs the function,
+    other callers wait and share its result or error.
+    An interactive waiter promotes a background leader to the interactive lane.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        """
+        Run fn() once for all concurrent callers with the same key.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = _Call(Lane(INTERACTIVE if current_lane().interactive else BACKGROUND))
+                self._calls[key] = call
+                self.leaders += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            if current_lane().interactive:
+                call.lane.promote()
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            with use_lane(call.lane):
+                call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+    def reset_stats(self):
+        """
+        Reset single flight counters.
+        """
+        with self._lock:
+            self.leaders = 0
+            self.coalesced = 0
+
+    def stats(self):
+        """
+        Return single flight counters.
+        """
+        with self._lock:
+            return {
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls),
+            }
+
+
+class AsyncSingleFlight():
+    """
+    Coalesce concurrent coroutine calls with the same key.
+    Calls are shared between coroutines of the same event loop.
+    The call runs in its own task, a cancelled caller (client disconnected)
+    only stops waiting, the call goes on for the other callers.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def _done(self, call_key, task):
+        """
+        Forget a finished call task.
+        """
+        if self._calls.get(call_key) is task:
+            del self._calls[call_key]
+        if not task.cancelled():
+            # avoid "exception never retrieved" warning without callers left
+            task.exception()
+
+    async def do(self, key, fn):
+        """
+        Await fn() once for all concurrent callers with the same key.
+        """
+        loop = asyncio.get_running_loop()
+        # tasks are bound to their event loop
+        call_key = (id(loop), key)
+        task = self._calls.get(call_key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = loop.create_task(fn())
+            task.add_done_callback(lambda done: self._done(call_key, done))
+            self._calls[call_key] = task
+            self.leaders += 1
+        return await asyncio.shield(task)
+
+    def reset_stats(self):
+        """
+        Reset single flight counters.
+        """
+        self.leaders = 0
+        self.coalesced = 0
+
+    def stats(self):
+        """
+        Return single flight counters.
+        """
+        return {
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._calls),
+        }
+
+
+@contextmanager
+def database_lock(name, timeout=10):
+    """
+    Named lock shared by all workers using the same database.
+    Only MySQL named locks are supported, other backends do not lock.
+    Yield True if the lock is held.
+    """
+    if connection.vendor != "mysql":
+        yield False
+        return
+    # mysql named locks are limited to 64 characters
+    name = name[:64]
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT GET_LOCK(%s, %s)", [name, timeout])
+        acquired = cursor.fetchone()[0] == 1
+    if not acquired:
+        logger.warning("Database lock %s not acquired after %ss.", name, timeout)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", [name])
@@ -0,0 +1,376 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections
+from django.db.models import Max, Sum
+from django.db.models.functions import Length
+from django.utils import timezone
+from .compact_forecast import CompactForecast
+from .forecast_cache import forecast_cache
+from .models import ForecastSnapshots
+import struct
+import threading
+import zlib
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FORECAST_SNAPSHOTS = {
+    "ENABLED": False,
+    "WARM_ON_STARTUP": True,
+    "WARM_MAX_AGE": 10800,
+    "KEYFRAME_INTERVAL": 24,
+    "COMPRESSION_LEVEL": 6,
+    "RETENTION_DAYS": 30,
+    "BASE_CACHE_ENTRIES": 500,
+}
+
+# snapshot data: compressed size of each field, then compressed fields
+FIELDS = ("meta",) + CompactForecast.COLUMNS
+_HEADER = struct.Struct(f"!{len(FIELDS)}I")
+
+
+def get_forecast_snapshots_settings():
+    """
+    Return forecast snapshots settings, with defaults.
+    """
+    return {**DEFAULT_FORECAST_SNAPSHOTS, **getattr(settings, "FORECAST_SNAPSHOTS", {})}
+
+
+def compress_columns(columns, base_columns=None, level=6):
+    """
+    Compress each column, with the same column of base_columns as preset dictionary.
+    Columns are compressed apart so each one stays within the 32KB zlib window.
+    """
+    blobs = []
+    for name in FIELDS:
+        if base_columns is None:
+            compressor = zlib.compressobj(level)
+        else:
+            compressor = zlib.compressobj(level, zdict=base_columns[name])
+        blobs.append(compressor.compress(columns[name]) + compressor.flush())
+    return _HEADER.pack(*(len(blob) for blob in blobs)) + b"".join(blobs)
+
+
+def decompress_columns(data, base_columns=None):
+    """
+    Decompress snapshot data compressed with compress_columns.
+    """
+    data = bytes(data)
+    offset = _HEADER.size
+    columns = {}
+    for name, size in zip(FIELDS, _HEADER.unpack_from(data)):
+        if base_columns is None:
+            decompressor = zlib.decompressobj()
+        else:
+            decompressor = zlib.decompressobj(zdict=base_columns[name])
+        columns[name] = decompressor.decompress(data[offset:offset + size]) + decompressor.flush()
+        offset += size
+    return columns
+
+
+class SnapshotStore():
+    """
+    Forecast snapshots of each grid cell, stored in ForecastSnapshots.
+    Consecutive forecasts of a cell mostly repeat, each snapshot is compressed
+    with the previous one as zlib dictionary. A keyframe starts a new chain
+    every KEYFRAME_INTERVAL snapshots, bounding decompression work.
+    The latest columns of recently written cells are kept to compress the next ones.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._last = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, grid_cell, last):
+        """
+        Keep (snapshot id, chain, columns) of the latest snapshot of grid_cell.
+        """
+        with self._lock:
+            self._last[grid_cell] = last
+            self._last.move_to_end(grid_cell)
+            while len(self._last) > self.max_entries:
+                self._last.popitem(last=False)
+
+    def load_columns(self, snapshot_ids):
+        """
+        Return decompressed columns of snapshots by id, with their bases
+        loaded back to keyframes, one query per chain level.
+        """
+        rows = {}
+        queried = set()
+        missing = set(snapshot_ids)
+        while missing:
+            queried |= missing
+            for snapshot_id, base_id, data in ForecastSnapshots.objects.filter(
+                    id__in=missing).values_list("id", "base_id", "data"):
+                rows[snapshot_id] = (base_id, data)
+            missing = {base_id for base_id, _ in rows.values() if base_id is not None} - queried
+
+        decoded = {}
+        for snapshot_id in snapshot_ids:
+            chain = []
+            while snapshot_id is not None and snapshot_id not in decoded and snapshot_id in rows:
+                chain.append(snapshot_id)
+                snapshot_id = rows[snapshot_id][0]
+            if snapshot_id is not None and snapshot_id not in decoded:
+                # a base was deleted while loading
+                continue
+            base_columns = decoded.get(snapshot_id)
+            for chain_id in reversed(chain):
+                base_columns = decoded[chain_id] = decompress_columns(rows[chain_id][1], base_columns)
+        return {snapshot_id: decoded[snapshot_id] for snapshot_id in snapshot_ids if snapshot_id in decoded}
+
+    def _latest(self, grid_cell, since=None):
+        """
+        Return (snapshot id, chain, columns, fetched_at) of the latest snapshot
+        of grid_cell, fetched since a datetime if given. None if none.
+        """
+        snapshots = ForecastSnapshots.objects.filter(grid_lat=grid_cell[0], grid_lon=grid_cell[1])
+        if since is not None:
+            snapshots = snapshots.filter(fetched_at__gte=since)
+        latest = snapshots.order_by("-id").values_list("id", "chain", "fetched_at").first()
+        if latest is None:
+            return None
+        with self._lock:
+            last = self._last.get(grid_cell)
+        if last is None or last[0] != latest[0]:
+            columns = self.load_columns([latest[0]]).get(latest[0])
+            if columns is None:
+                return None
+            last = (latest[0], latest[1], columns)
+            self._remember(grid_cell, last)
+        return last + (latest[2],)
+
+    def record(self, grid_lat, grid_lon, forecast):
+        """
+        Store a forecast fetched for a grid cell. The same forecast
+        fetched again only updates fetched_at of its snapshot.
+        Return the snapshot id.
+        """
+        snapshots_settings = get_forecast_snapshots_settings()
+        grid_cell = (grid_lat, grid_lon)
+        columns = forecast.to_columns()
+        now = timezone.now()
+        previous = self._latest(grid_cell)
+        if previous is not None and previous[2] == columns:
+            ForecastSnapshots.objects.filter(id=previous[0]).update(fetched_at=now)
+            return previous[0]
+
+        keyframe = previous is None or previous[1] + 1 >= snapshots_settings["KEYFRAME_INTERVAL"]
+        snapshot = ForecastSnapshots.objects.create(
+            grid_lat=grid_lat,
+            grid_lon=grid_lon,
+            base_id=None if keyframe else previous[0],
+            chain=0 if keyframe else previous[1] + 1,
+            data=compress_columns(
+                columns, None if keyframe else previous[2], snapshots_settings["COMPRESSION_LEVEL"]),
+            size=sum(len(column) for column in columns.values()),
+            updated_on=datetime.fromtimestamp(forecast.updated_on, dt_timezone.utc) if forecast.updated_on else None,
+            fetched_at=now,
+        )
+        self._remember(grid_cell, (snapshot.id, snapshot.chain, columns))
+        return snapshot.id
+
+    def latest(self, grid_lat, grid_lon, since):
+        """
+        Return (forecast, fetched_at) of the latest snapshot of a grid cell
+        if fetched since a datetime, else None.
+        """
+        latest = self._latest((grid_lat, grid_lon), since)
+        if latest is None:
+            return None
+        return CompactForecast.from_columns(latest[2]), latest[3]
+
+    def warm_cache(self, cache, max_age=None):
+        """
+        Fill cache with the latest forecast of grid cells fetched within max_age seconds,
+        aged by their fetch time: recent ones are fresh, older ones stale or last good only.
+        Return the number of forecasts loaded.
+        """
+        if max_age is None:
+            max_age = get_forecast_snapshots_settings()["WARM_MAX_AGE"]
+        now = timezone.now()
+        latest_ids = list(
+            ForecastSnapshots.objects.filter(fetched_at__gte=now - timedelta(seconds=max_age))
+            .values("grid_lat", "grid_lon").annotate(latest=Max("id")).values_list("latest", flat=True)
+        )
+        # most recent last, so they are the last evicted
+        snapshots = sorted(
+            ForecastSnapshots.objects.filter(id__in=latest_ids).values_list("id", "grid_lat", "grid_lon", "fetched_at"),
+            key=lambda snapshot: snapshot[3],
+        )[-cache.max_entries:]
+        columns = self.load_columns([snapshot[0] for snapshot in snapshots])
+        loaded = 0
+        for snapshot_id, grid_lat, grid_lon, fetched_at in snapshots:
+            if snapshot_id not in columns:
+                continue
+            cache.set(
+                (grid_lat, grid_lon),
+                CompactForecast.from_columns(columns[snapshot_id]),
+                age=(now - fetched_at).total_seconds(),
+            )
+            loaded += 1
+        return loaded
+
+    def history(self, grid_lat, grid_lon, since=None):
+        """
+        Return (fetched_at, forecast) of the snapshots of a grid cell, oldest first.
+        """
+        snapshots = ForecastSnapshots.objects.filter(grid_lat=grid_lat, grid_lon=grid_lon)
+        if since is not None:
+            snapshots = snapshots.filter(fetched_at__gte=since)
+        snapshots = list(snapshots.order_by("id").values_list("id", "fetched_at"))
+        columns = self.load_columns([snapshot_id for snapshot_id, _ in snapshots])
+        return [
+            (fetched_at, CompactForecast.from_columns(columns[snapshot_id]))
+            for snapshot_id, fetched_at in snapshots if snapshot_id in columns
+        ]
+
+    def prune(self, retention_days=None):
+        """
+        Delete snapshots older than retention_days. A chain is only deleted
+        before the keyframe of a newer one, so kept snapshots stay readable.
+        Return the number of deleted snapshots.
+        """
+        if retention_days is None:
+            retention_days = get_forecast_snapshots_settings()["RETENTION_DAYS"]
+        cutoff = timezone.now() - timedelta(days=retention_days)
+        deleted = 0
+        # cells not fetched since cutoff
+        for cell in ForecastSnapshots.objects.values("grid_lat", "grid_lon").annotate(
+                last=Max("fetched_at")).filter(last__lt=cutoff):
+            deleted += ForecastSnapshots.objects.filter(
+                grid_lat=cell["grid_lat"], grid_lon=cell["grid_lon"]).delete()[0]
+        # chains older than the last keyframe before cutoff
+        for cell in ForecastSnapshots.objects.filter(chain=0, fetched_at__lt=cutoff).values(
+                "grid_lat", "grid_lon").annotate(keyframe=Max("id")):
+            deleted += ForecastSnapshots.objects.filter(
+                grid_lat=cell["grid_lat"], grid_lon=cell["grid_lon"], id__lt=cell["keyframe"]).delete()[0]
+        return deleted
+
+    def stats(self):
+        """
+        Return snapshots count, grid cells, keyframes and compression ratio.
+        """
+        snapshots = ForecastSnapshots.objects.all()
+        sizes = snapshots.aggregate(raw=Sum("size"), stored=Sum(Length("data")))
+        raw, stored = sizes["raw"] or 0, sizes["stored"] or 0
+        return {
+            "snapshots": snapshots.count(),
+            "grid_cells": snapshots.values("grid_lat", "grid_lon").distinct().count(),
+            "keyframes": snapshots.filter(chain=0).count(),
+            "raw_bytes": raw,
+            "stored_bytes": stored,
+            "compression_ratio": round(raw / stored, 1) if stored else None,
+        }
+
+
+snapshot_store = SnapshotStore(get_forecast_snapshots_settings()["BASE_CACHE_ENTRIES"])
+
+# one writer thread, so snapshots of a cell are stored in fetch order
+snapshot_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="forecast-snapshots")
+
+
+def snapshots_enabled():
+    """
+    Return True if fetched forecasts are stored as snapshots.
+    """
+    return get_forecast_snapshots_settings()["ENABLED"]
+
+
+def record_snapshot(grid_lat, grid_lon, forecast):
+    """
+    Store a fetched forecast if snapshots are enabled,
+    a storage error is logged and never fails the fetch.
+    """
+    if not snapshots_enabled():
+        return
+    try:
+        snapshot_store.record(grid_lat, grid_lon, forecast)
+    except DatabaseError as e:
+        logger.warning("Forecast snapshot of %s, %s not stored: %s", grid_lat, grid_lon, e)
+
+
+def _background_record(grid_lat, grid_lon, forecast):
+    """
+    Store a snapshot in the executor thread, its database connection
+    is closed as after a request.
+    """
+    try:
+        record_snapshot(grid_lat, grid_lon, forecast)
+    finally:
+        close_old_connections()
+
+
+def record_snapshot_later(grid_lat, grid_lon, forecast):
+    """
+    Store a fetched forecast in background if snapshots are enabled,
+    so the fetch does not wait for the database write.
+    """
+    if snapshots_enabled():
+        snapshot_executor.submit(_background_record, grid_lat, grid_lon, forecast)
+
+
+def wait_for_snapshots():
+    """
+    Wait until snapshots recorded in background are stored.
+    """
+    snapshot_executor.submit(lambda: None).result()
+
+
+def get_recent_snapshot(grid_lat, grid_lon, since):
+    """
+    Return (forecast, fetched_at) of a grid cell stored since a datetime, None if
+    none or if snapshots are disabled. A storage error is logged and returns None.
+    """
+    if not snapshots_enabled():
+        return None
+    try:
+        return snapshot_store.latest(grid_lat, grid_lon, since)
+    except DatabaseError as e:
+        logger.warning("Forecast snapshot of %s, %s not read: %s", grid_lat, grid_lon, e)
+        return None
+
+
+def get_shared_forecast(grid_lat, grid_lon):
+    """
+    Return (forecast, age) of a grid cell fetched within the forecast cache TTL
+    by any process, from snapshots. None if none or if snapshots are disabled.
+    """
+    now = timezone.now()
+    recent = get_recent_snapshot(grid_lat, grid_lon, now - timedelta(seconds=forecast_cache.ttl))
+    if recent is None:
+        return None
+    forecast, fetched_at = recent
+    return forecast, (now - fetched_at).total_seconds()
+
+
+def run_snapshot_warmup():
+    """
+    Load forecast snapshots into the forecast cache of the current worker.
+    """
+    try:
+        loaded = snapshot_store.warm_cache(forecast_cache)
+        logger.info("Forecast cache warmed with %s snapshots", loaded)
+    except Exception as e:
+        logger.error("Forecast cache warm up failed: %s", e)
+    finally:
+        close_old_connections()
+
+
+def start_snapshot_warmup():
+    """
+    Warm the forecast cache from snapshots in a background thread,
+    so the worker serves requests meanwhile.
+    Return the thread, or None if snapshots or WARM_ON_STARTUP are disabled.
+    """
+    snapshots_settings = get_forecast_snapshots_settings()
+    if not snapshots_settings["ENABLED"] or not snapshots_settings["WARM_ON_STARTUP"]:
+        return None
+    thread = threading.Thread(target=run_snapshot_warmup, name="forecast-snapshots-warmup", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,215 @@
+from django.conf import settings
+from .models import ActivityWeatherThresholds
+import numpy as np
+
+DEFAULT_ACTIVITY_SCORING = {
+    "MIN_SCORE": 0.6,
+    "MAX_WINDOWS": 5,
+    "MISSING_SCORE": 0.5,
+}
+
+THRESHOLD_FIELDS = [
+    "temp_min",
+    "temp_max",
+    "wind_min",
+    "wind_max",
+    "gust_max",
+    "rain_max",
+    "snow_max",
+    "iso0_min",
+    "iso0_max",
+    "min_duration",
+    "daylight_only",
+]
+
+# score falls from 1 to 0 when a value goes this far beyond its threshold
+TOLERANCES = {
+    "temp": 5.0,
+    "wind": 10.0,
+    "gust": 10.0,
+    "rain": 1.0,
+    "snow": 1.0,
+    "iso0": 300.0,
+}
+
+GENERIC_THRESHOLDS = {
+    "temp_min": 5,
+    "temp_max": 30,
+    "wind_min": None,
+    "wind_max": 40,
+    "gust_max": None,
+    "rain_max": 1,
+    "snow_max": 0.5,
+    "iso0_min": None,
+    "iso0_max": None,
+    "min_duration": 2,
+    "daylight_only": True,
+}
+
+# thresholds of catalog activities, used when none are stored in database
+DEFAULT_THRESHOLDS = {
+    "hiking": {"temp_min": 5, "temp_max": 28, "wind_max": 40, "gust_max": 60, "rain_max": 0.5, "min_duration": 3},
+    "camping": {"temp_min": 8, "temp_max": 30, "wind_max": 35, "rain_max": 0.5,
+                "min_duration": 12, "daylight_only": False},
+    "cycling": {"temp_min": 8, "temp_max": 30, "wind_max": 30, "gust_max": 50, "rain_max": 0.3},
+    "fishing": {"temp_min": 5, "temp_max": 30, "wind_max": 30, "rain_max": 2},
+    "rock climbing": {"temp_min": 8, "temp_max": 28, "wind_max": 30, "rain_max": 0, "min_duration": 3},
+    "kayaking": {"temp_min": 12, "temp_max": 32, "wind_max": 25, "rain_max": 1},
+    "birdwatching": {"temp_min": 0, "temp_max": 30, "wind_max": 30, "rain_max": 1},
+    "surfing": {"temp_min": 10, "temp_max": 35, "wind_max": 30, "rain_max": 5},
+    "gardening": {"temp_min": 8, "temp_max": 30, "wind_max": 30, "rain_max": 1},
+    "photography": {"temp_min": -5, "temp_max": 35, "wind_max": 40, "rain_max": 0.5, "min_duration": 1},
+    "archery": {"temp_min": 5, "temp_max": 32, "wind_max": 20, "gust_max": 30, "rain_max": 0.5},
+    "horseback riding": {"temp_min": 5, "temp_max": 28, "wind_max": 40, "rain_max": 1},
+    "kiteboarding": {"temp_min": 8, "temp_max": 35, "wind_min": 20, "wind_max": 50, "gust_max": 60, "rain_max": 2},
+    "paddleboarding": {"temp_min": 15, "temp_max": 35, "wind_max": 15, "rain_max": 1},
+    "ski": {"temp_min": -15, "temp_max": 8, "wind_max": 50, "rain_max": 0.5, "snow_max": None, "iso0_max": 2000,
+            "min_duration": 3},
+    "snowboard": {"temp_min": -15, "temp_max": 8, "wind_max": 50, "rain_max": 0.5, "snow_max": None,
+                  "iso0_max": 2000, "min_duration": 3},
+    "paragliding": {"temp_min": 0, "temp_max": 35, "wind_min": 5, "wind_max": 25, "gust_max": 30, "rain_max": 0},
+}
+
+
+def get_activity_scoring_settings():
+    """
+    Return activity scoring settings, with defaults.
+    """
+    return {**DEFAULT_ACTIVITY_SCORING, **getattr(settings, "ACTIVITY_SCORING", {})}
+
+
+def get_activities_thresholds(activities):
+    """
+    Return weather thresholds of activities, keyed by activity id.
+    Stored thresholds first, then catalog defaults by name, then generic ones.
+    """
+    stored = {
+        thresholds["activity_id"]: thresholds
+        for thresholds in ActivityWeatherThresholds.objects.filter(
+            activity__in=activities).values("activity_id", *THRESHOLD_FIELDS)
+    }
+    activities_thresholds = {}
+    for activity in activities:
+        if activity.id in stored:
+            activities_thresholds[activity.id] = stored[activity.id]
+        else:
+            activities_thresholds[activity.id] = {
+                **GENERIC_THRESHOLDS, **DEFAULT_THRESHOLDS.get(activity.name.lower(), {})}
+    return activities_thresholds
+
+
+def range_score(values, minimum, maximum, tolerance, missing_score):
+    """
+    Score values against a range: 1 inside, down to 0 at tolerance outside.
+    Missing values score missing_score, missing thresholds are not checked.
+    """
+    excess = np.zeros(len(values))
+    if minimum is not None:
+        excess = np.maximum(excess, minimum - values)
+    if maximum is not None:
+        excess = np.maximum(excess, values - maximum)
+    return np.where(np.isnan(excess), missing_score, np.clip(1 - excess / tolerance, 0, 1))
+
+
+def hourly_rate(column_1h, column_3h, column_6h):
+    """
+    Return the hourly rate of each forecast step: the 1h value, else the 3h
+    or 6h value spread over its hours, as further steps only have those.
+    """
+    rate = np.where(np.isnan(column_1h), column_3h / 3, column_1h)
+    return np.where(np.isnan(rate), column_6h / 6, rate)
+
+
+def daylight_mask(weather_data):
+    """
+    Return True for forecast hours between sunrise and sunset.
+    """
+    days = np.searchsorted(weather_data.daily_sunrise, weather_data.hourly_dt, side="right") - 1
+    valid = days >= 0
+    sunsets = weather_data.daily_sunset[np.clip(days, 0, None)]
+    return valid & (weather_data.hourly_dt < sunsets)
+
+
+def score_hours(weather_data, thresholds, daylight=None, missing_score=None):
+    """
+    Return suitability score of each forecast hour, between 0 and 1.
+    """
+    if missing_score is None:
+        missing_score = get_activity_scoring_settings()["MISSING_SCORE"]
+    rain = hourly_rate(weather_data.hourly_rain_1h, weather_data.hourly_rain_3h, weather_data.hourly_rain_6h)
+    snow = hourly_rate(weather_data.hourly_snow_1h, weather_data.hourly_snow_3h, weather_data.hourly_snow_6h)
+    score = (
+        range_score(weather_data.hourly_t, thresholds["temp_min"], thresholds["temp_max"], TOLERANCES["temp"],
+                    missing_score)
+        * range_score(weather_data.hourly_wind_speed, thresholds["wind_min"], thresholds["wind_max"],
+                      TOLERANCES["wind"], missing_score)
+        * range_score(weather_data.hourly_wind_gust, None, thresholds["gust_max"], TOLERANCES["gust"],
+                      missing_score)
+        * range_score(rain, None, thresholds["rain_max"], TOLERANCES["rain"], missing_score)
+        * range_score(snow, None, thresholds["snow_max"], TOLERANCES["snow"], missing_score)
+        * range_score(weather_data.hourly_iso0, thresholds["iso0_min"], thresholds["iso0_max"],
+                      TOLERANCES["iso0"], missing_score)
+    )
+    if thresholds["daylight_only"]:
+        if daylight is None:
+            daylight = daylight_mask(weather_data)
+        score = np.where(daylight, score, 0.0)
+    return score
+
+
+def find_windows(weather_data, scores, min_duration, min_score, max_windows):
+    """
+    Return best time windows: consecutive forecast steps scoring at least
+    min_score and lasting at least min_duration hours.
+    """
+    hourly_dt = weather_data.hourly_dt
+    if len(hourly_dt) == 0:
+        return []
+    steps = np.diff(hourly_dt, append=hourly_dt[-1] + 3600) / 3600
+    suitable = np.concatenate(([False], scores >= min_score, [False]))
+    edges = np.flatnonzero(np.diff(suitable.astype(np.int8)))
+    starts, ends = edges[0::2], edges[1::2]
+    if len(starts) == 0:
+        return []
+
+    cumulated_steps = np.concatenate(([0], np.cumsum(steps)))
+    cumulated_scores = np.concatenate(([0], np.cumsum(scores * steps)))
+    durations = cumulated_steps[ends] - cumulated_steps[starts]
+    mean_scores = (cumulated_scores[ends] - cumulated_scores[starts]) / durations
+    long_enough = durations >= min_duration
+    starts, ends = starts[long_enough], ends[long_enough]
+    durations, mean_scores = durations[long_enough], mean_scores[long_enough]
+
+    best = np.lexsort((-durations, -mean_scores))[:max_windows]
+    windows = []
+    for window in best.tolist():
+        start, end = int(starts[window]), int(ends[window])
+        end_dt = hourly_dt[end - 1] + steps[end - 1] * 3600
+        windows.append({
+            "start": weather_data.timestamp_to_locale_time(hourly_dt[start]).isoformat(),
+            "end": weather_data.timestamp_to_locale_time(end_dt).isoformat(),
+            "hours": int(durations[window]),
+            "score": round(float(mean_scores[window]), 2),
+        })
+    return windows
+
+
+def score_activities(weather_data, activities):
+    """
+    Return best weather windows of each activity over the forecast.
+    """
+    scoring_settings = get_activity_scoring_settings()
+    activities_thresholds = get_activities_thresholds(activities)
+    daylight = daylight_mask(weather_data)
+    output_data = []
+    for activity in activities:
+        thresholds = activities_thresholds[activity.id]
+        scores = score_hours(weather_data, thresholds, daylight, scoring_settings["MISSING_SCORE"])
+        output_data.append({
+            "activity_id": activity.id,
+            "activity": activity.name,
+            "windows": find_windows(
+                weather_data, scores, thresholds["min_duration"],
+                scoring_settings["MIN_SCORE"], scoring_settings["MAX_WINDOWS"]),
+        })
+    return output_data
@@ -0,0 +1,109 @@
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from zoneinfo import ZoneInfo
+import io
+import numpy as np
+import orjson
+import uuid
+from ..renderers import OrjsonRenderer, OrjsonParser
+
+
+class OrjsonRendererTestCase(SimpleTestCase):
+    """
+    Tests case for the OrjsonRenderer, output must match JSONRenderer but for floats differences.
+    """
+
+    def assertSameOutput(self, data):
+        self.assertEqual(OrjsonRenderer().render(data), JSONRenderer().render(data))
+
+    def test_basic_types(self):
+        """
+        Test output of basic and nested types.
+        """
+        self.assertSameOutput({
+            "name": "Saint-Étienne", "lat": 45.43389, "lon": 4.39, "country": "FR",
+            "tags": ["a", "b"], "count": 3, "ratio": 0.1, "empty": None, "ok": True,
+            "tuple": (1, 2), "nested": [{"a": {"b": []}}],
+        })
+        self.assertSameOutput([1, 2.5, "x", None])
+        self.assertSameOutput({1: "int key", "big": 2 ** 70})
+
+    def test_datetimes_and_decimals(self):
+        """
+        Test output of datetimes, decimals and other DRF encoded types.
+        """
+        self.assertSameOutput({
+            "utc": datetime(2025, 1, 1, 10, 0, tzinfo=timezone.utc),
+            "utc_zoneinfo": datetime(2025, 1, 1, 10, 0, 0, 123456, tzinfo=ZoneInfo("UTC")),
+            "paris": datetime(2025, 7, 1, 10, 0, tzinfo=ZoneInfo("Europe/Paris")),
+            "naive": datetime(2025, 1, 1, 10, 0, 5),
+            "date": date(2025, 1, 1),
+            "time": time(10, 30),
+            "duration": timedelta(hours=2),
+            "decimal": Decimal("12.50"),
+            "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+            "lazy": gettext_lazy("Hello"),
+            "set": {1},
+            "numpy": np.array([1.5, 2.0]),
+        })
+
+    def test_line_separators(self):
+        """
+        Test that \\u2028 and \\u2029 are escaped.
+        """
+        data = {"text": "a b c"}
+        self.assertSameOutput(data)
+        self.assertIn(b"\\u2028", OrjsonRenderer().render(data))
+
+    def test_float_differences(self):
+        """
+        Test that non-finite floats are rendered as null and exponents are written shorter, same values.
+        """
+        with self.assertRaises(ValueError):
+            JSONRenderer().render({"nan": float("nan")})
+        self.assertEqual(OrjsonRenderer().render({"nan": float("nan"), "inf": float("-inf")}),
+                         b'{"nan":null,"inf":null}')
+        data = [1e16, 1.5e-7, 123456789012345680.0]
+        self.assertEqual(JSONRenderer().render(data), b"[1e+16,1.5e-07,1.2345678901234568e+17]")
+        self.assertEqual(OrjsonRenderer().render(data), b"[1e16,1.5e-7,1.2345678901234568e17]")
+        self.assertEqual(orjson.loads(OrjsonRenderer().render(data)), data)
+
+    def test_indent_and_none(self):
+        """
+        Test indented output and empty data.
+        """
+        data = {"a": [1, 2]}
+        self.assertEqual(
+            OrjsonRenderer().render(data, "application/json; indent=4"),
+            JSONRenderer().render(data, "application/json; indent=4"))
+        self.assertEqual(OrjsonRenderer().render(None), b"")
+
+
+class OrjsonParserTestCase(SimpleTestCase):
+    """
+    Tests case for the OrjsonParser, result must match JSONParser.
+    """
+
+    def parse(self, parser, content):
+        return parser.parse(io.BytesIO(content), "application/json", {})
+
+    def test_parse(self):
+        """
+        Test that parsed data matches JSONParser.
+        """
+        for content in [b'{"locations": [{"lat": 48.85, "lon": 2.35}]}', b'[1, "\xc3\xa9", null]',
+                        b'{"big": 123456789012345678901234567890}']:
+            self.assertEqual(self.parse(OrjsonParser(), content), self.parse(JSONParser(), content))
+
+    def test_parse_error(self):
+        """
+        Test that invalid JSON raises ParseError.
+        """
+        for content in [b'{"a": ', b'{"a": NaN}', b"\xff"]:
+            with self.assertRaises(ParseError):
+                self.parse(OrjsonParser(), content)
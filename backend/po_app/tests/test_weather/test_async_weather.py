@@ -0,0 +1,146 @@
+from django.test import TestCase, RequestFactory
+from rest_framework import status
+from unittest import mock
+import asyncio
+import httpx
+import json
+from ...async_weather import (
+    AsyncGeocodingView,
+    AsyncWeatherView,
+    AsyncWeatherDetailsView,
+)
+from ...weather import INVALID_DAYS_MESSAGE
+from .test_weather_common import make_forecast_data, reset_weather_state
+
+
+class AsyncWeatherViewsTest(TestCase):
+    """
+    Test class for async weather and geocoding views.
+    """
+
+    def setUp(self):
+        reset_weather_state(self)
+        self.factory = RequestFactory()
+        self.upstream_calls = []
+
+    def mock_http_client(self, handler):
+        """
+        Patch the async HTTP client with a mock transport.
+        """
+        async def counting_handler(request):
+            self.upstream_calls.append(request)
+            return await handler(request)
+
+        client = httpx.AsyncClient(
+            transport=httpx.MockTransport(counting_handler))
+        patcher = mock.patch(
+            "po_app.async_weather.get_http_client", return_value=client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def forecast_handler(self, request):
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json=make_forecast_data())
+
+    async def test_weather_view(self):
+        """
+        Test that async weather view returns 15 days forecast.
+        """
+        self.mock_http_client(self.forecast_handler)
+        request = self.factory.get("/weather/48.8566/2.3522/")
+        response = await AsyncWeatherView.as_view()(request, lat="48.8566", lon="2.3522")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = json.loads(response.content)
+        self.assertEqual(len(data["data"]), 15)
+        self.assertEqual(data["data"][0]["day_id"], 0)
+        self.assertEqual(self.upstream_calls[0].url.params["lat"], "48.85")
+
+    async def test_invalid_coordinates(self):
+        """
+        Test that async weather views return 400 on invalid coordinates.
+        """
+        self.mock_http_client(self.forecast_handler)
+        request = self.factory.get("/weather/91/2.3522/")
+        for view in [AsyncWeatherView, AsyncWeatherDetailsView]:
+            response = await view.as_view()(request, lat="91", lon="2.3522")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("lat", json.loads(response.content))
+        self.assertEqual(self.upstream_calls, [])
+
+    async def test_invalid_days(self):
+        """
+        Test that async details view returns the fixed 400 message on invalid days, even with a matching ETag.
+        """
+        self.mock_http_client(self.forecast_handler)
+        view = AsyncWeatherDetailsView.as_view()
+        response = await view(self.factory.get("/weather-details/48.8566/2.3522/"), lat="48.8566", lon="2.3522")
+        etag = response["ETag"]
+        for days in ["9-2", "x"]:
+            request = self.factory.get("/weather-details/48.8566/2.3522/", {"days": days}, HTTP_IF_NONE_MATCH=etag)
+            response = await view(request, lat="48.8566", lon="2.3522")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(json.loads(response.content), {"error": INVALID_DAYS_MESSAGE})
+
+    async def test_concurrent_requests_single_upstream_call(self):
+        """
+        Test that concurrent async requests call upstream once.
+        """
+        self.mock_http_client(self.forecast_handler)
+        view = AsyncWeatherDetailsView.as_view()
+        responses = await asyncio.gather(*[
+            view(self.factory.get("/"), lat="48.8566", lon="2.3522", day_id=day_id)
+            for day_id in range(10)
+        ])
+        self.assertTrue(
+            all(response.status_code == status.HTTP_200_OK for response in responses))
+        self.assertEqual(len(self.upstream_calls), 1)
+
+    async def test_weather_details_invalid_day(self):
+        """
+        Test that async weather details view rejects invalid day ID.
+        """
+        self.mock_http_client(self.forecast_handler)
+        response = await AsyncWeatherDetailsView.as_view()(
+            self.factory.get("/"), lat="48.8566", lon="2.3522", day_id="-1")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_weather_view_upstream_error(self):
+        """
+        Test that async weather view returns an error on upstream failure.
+        """
+        async def handler(request):
+            return httpx.Response(503)
+
+        self.mock_http_client(handler)
+        response = await AsyncWeatherView.as_view()(
+            self.factory.get("/"), lat="48.8566", lon="2.3522")
+        self.assertEqual(response.status_code,
+                         status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    async def test_geocoding_view(self):
+        """
+        Test that async geocoding view returns coordinates.
+        """
+        async def handler(request):
+            return httpx.Response(200, json=[{
+                "name": "Paris", "lat": 48.8566, "lon": 2.3522, "country": "FR", "state": "Ile-de-France"}])
+
+        self.mock_http_client(handler)
+        response = await AsyncGeocodingView.as_view()(self.factory.get("/"), city="Paris")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content)["data"], [
+                         {"name": "Paris", "lat": 48.8566, "lon": 2.3522, "country": "FR"}])
+        response = await AsyncGeocodingView.as_view()(self.factory.get("/"), city="  PARIS ")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(self.upstream_calls), 1)
+
+    async def test_geocoding_view_not_found(self):
+        """
+        Test that async geocoding view returns 404 for unknown city.
+        """
+        async def handler(request):
+            return httpx.Response(200, json=[])
+
+        self.mock_http_client(handler)
+        response = await AsyncGeocodingView.as_view()(self.factory.get("/"), city="Nowhere")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
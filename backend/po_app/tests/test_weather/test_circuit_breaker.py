@@ -0,0 +1,217 @@
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework import status
+from unittest import mock
+import httpx
+import requests
+from ...circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    UpstreamUnavailableError,
+    is_upstream_failure,
+    meteofrance_breaker,
+    openweathermap_breaker,
+)
+from ...forecast_cache import forecast_cache
+from ...lanes import LaneTimeoutError
+from ...quota import QuotaExceededError
+from .test_weather_common import BaseWeatherTestCase, make_forecast
+
+
+class FakeClock():
+    """
+    Controllable clock for circuit breaker tests.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CircuitBreakerTest(SimpleTestCase):
+    """
+    Test class for CircuitBreaker.
+    """
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(
+            "test", failure_threshold=2, recovery_timeout=30, clock=self.clock)
+        self.failing = mock.Mock(side_effect=requests.exceptions.ConnectionError("upstream error"))
+
+    def open_circuit(self):
+        for _ in range(2):
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                self.breaker.call(self.failing)
+
+    def test_opens_after_failures(self):
+        """
+        Test that circuit opens after consecutive failures and fails fast.
+        """
+        self.open_circuit()
+        self.assertEqual(self.breaker.state, "open")
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.call(self.failing)
+        self.assertEqual(self.failing.call_count, 2)
+        self.assertEqual(self.breaker.stats()["rejected"], 1)
+
+    def test_success_resets_failures(self):
+        """
+        Test that a success resets consecutive failures count.
+        """
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self.breaker.call(self.failing)
+        self.breaker.call(lambda: "ok")
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self.breaker.call(self.failing)
+        self.assertEqual(self.breaker.state, "closed")
+
+    def test_half_open_trial_success_closes(self):
+        """
+        Test that a successful trial call closes the circuit.
+        """
+        self.open_circuit()
+        self.clock.now = 31
+        self.assertEqual(self.breaker.call(lambda: "ok"), "ok")
+        self.assertEqual(self.breaker.state, "closed")
+        self.assertEqual(self.breaker.stats()["transitions"], {
+            "closed->open": 1, "open->half_open": 1, "half_open->closed": 1})
+
+    def test_half_open_trial_failure_reopens(self):
+        """
+        Test that a failed trial call reopens the circuit.
+        """
+        self.open_circuit()
+        self.clock.now = 31
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self.breaker.call(self.failing)
+        self.assertEqual(self.breaker.state, "open")
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.call(lambda: "ok")
+
+    def test_upstream_failures(self):
+        """
+        Test that only timeouts, connection errors and 5xx responses are upstream failures.
+        """
+        def http_error(status_code):
+            response = requests.Response()
+            response.status_code = status_code
+            return requests.exceptions.HTTPError(response=response)
+
+        request = httpx.Request("GET", "https://example.com")
+        self.assertTrue(is_upstream_failure(requests.exceptions.ReadTimeout()))
+        self.assertTrue(is_upstream_failure(httpx.ConnectError("refused", request=request)))
+        self.assertTrue(is_upstream_failure(TimeoutError()))
+        self.assertTrue(is_upstream_failure(http_error(503)))
+        self.assertTrue(is_upstream_failure(httpx.HTTPStatusError(
+            "error", request=request, response=httpx.Response(502, request=request))))
+        self.assertFalse(is_upstream_failure(http_error(404)))
+        self.assertFalse(is_upstream_failure(ValueError("unexpected data")))
+
+    def test_other_errors_ignored(self):
+        """
+        Test that other errors neither open the circuit nor block the half open trial.
+        """
+        for _ in range(3):
+            with self.assertRaises(ValueError):
+                self.breaker.call(mock.Mock(side_effect=ValueError("unexpected data")))
+        self.assertEqual(self.breaker.state, "closed")
+        self.open_circuit()
+        self.clock.now = 31
+        with self.assertRaises(ValueError):
+            self.breaker.call(mock.Mock(side_effect=ValueError("unexpected data")))
+        self.assertEqual(self.breaker.call(lambda: "ok"), "ok")
+        self.assertEqual(self.breaker.state, "closed")
+
+    def test_refusals(self):
+        """
+        Test that refusals before upstream share a base error apart from the open circuit, and are not failures.
+        """
+        quota_error = QuotaExceededError("test")
+        lane_error = LaneTimeoutError("test")
+        self.assertEqual(str(quota_error), "test quota exceeded, please retry later.")
+        self.assertEqual(str(lane_error), "test busy with interactive calls, background call dropped.")
+        for error in [quota_error, lane_error, CircuitOpenError("test")]:
+            self.assertIsInstance(error, UpstreamUnavailableError)
+            self.assertEqual(error.name, "test")
+        self.assertNotIsInstance(quota_error, CircuitOpenError)
+        self.assertNotIsInstance(lane_error, CircuitOpenError)
+        for error in [quota_error, lane_error] * 2:
+            with self.assertRaises(UpstreamUnavailableError):
+                self.breaker.call(mock.Mock(side_effect=error))
+        self.assertEqual(self.breaker.state, "closed")
+
+
+class CircuitBreakerViewsTest(BaseWeatherTestCase):
+    """
+    Test class for weather views behavior with circuit breakers.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("weather", kwargs={"lat": "48.8566", "lon": "2.3522"})
+
+    @mock.patch("po_app.weather.weather_client")
+    def test_open_circuit_serves_last_good_forecast(self, mock_client):
+        """
+        Test that last good forecast is served with a staleness marker.
+        """
+        mock_client.get_forecast.return_value = make_forecast()
+        self.client.get(self.url)
+        # drop fresh entries, keep last good forecast
+        forecast_cache._entries.clear()
+        mock_client.get_forecast.side_effect = requests.exceptions.ConnectionError("upstream error")
+        for _ in range(meteofrance_breaker.failure_threshold):
+            response = self.client.get(self.url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(response.data["stale"])
+        self.assertEqual(meteofrance_breaker.state, "open")
+        calls = mock_client.get_forecast.call_count
+        response = self.client.get(reverse("weather-details", kwargs={
+            "lat": "48.8566", "lon": "2.3522", "day_id": 1}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data["stale"])
+        self.assertEqual(mock_client.get_forecast.call_count, calls)
+
+    @mock.patch("po_app.weather.weather_client")
+    def test_open_circuit_without_last_good(self, mock_client):
+        """
+        Test that open circuit without last good forecast returns 503.
+        """
+        mock_client.get_forecast.side_effect = requests.exceptions.ConnectionError("upstream error")
+        for _ in range(meteofrance_breaker.failure_threshold):
+            response = self.client.get(self.url)
+            self.assertEqual(response.status_code,
+                             status.HTTP_500_INTERNAL_SERVER_ERROR)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code,
+                         status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    @mock.patch("po_app.weather.weather_client")
+    def test_invalid_coordinates(self, mock_client):
+        """
+        Test that invalid or out of range coordinates return 400 without upstream call.
+        """
+        for lat, lon in [("abc", "2.35"), ("91", "2.35"), ("48.85", "-181"), ("nan", "2.35")]:
+            for name in ["weather", "weather-details-all", "weather-hourly"]:
+                response = self.client.get(reverse(name, kwargs={"lat": lat, "lon": lon}))
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        mock_client.get_forecast.assert_not_called()
+        self.assertEqual(meteofrance_breaker.state, "closed")
+
+    @mock.patch("po_app.weather.openweathermap_http.get")
+    def test_geocoding_open_circuit(self, mock_get):
+        """
+        Test that geocoding fails fast when its circuit is open.
+        """
+        mock_get.side_effect = requests.exceptions.ConnectionError("timeout")
+        url = reverse("geocoding", kwargs={"city": "Paris"})
+        for _ in range(openweathermap_breaker.failure_threshold):
+            self.client.get(url)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code,
+                         status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(mock_get.call_count,
+                         openweathermap_breaker.failure_threshold)
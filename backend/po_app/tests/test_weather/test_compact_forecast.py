@@ -0,0 +1,87 @@
+from django.test import SimpleTestCase
+import numpy as np
+from ...compact_forecast import CompactForecast, column_to_list
+from ...weather import (
+    CustomConvertion,
+    build_daily_forecast,
+    build_forecast_details,
+    build_all_forecast_details,
+)
+from .test_weather_common import make_forecast, make_forecast_data
+
+
+class CompactForecastTest(SimpleTestCase):
+    """
+    Test class for compact columnar forecast.
+    """
+
+    def setUp(self):
+        self.compact = CompactForecast.from_forecast(make_forecast())
+
+    def test_columns(self):
+        """
+        Test that daily and hourly values are stored in columns.
+        """
+        self.assertEqual(self.compact.daily_count, 15)
+        self.assertEqual(self.compact.hourly_count, 15 * 24)
+        self.assertEqual(self.compact.daily_t_min[3], 5.0)
+        self.assertEqual(self.compact.hourly_iso0[2], 1502)
+        self.assertEqual(self.compact.position["dept"], "75")
+        self.assertFalse(hasattr(self.compact, "__dict__"))
+
+    def test_missing_values(self):
+        """
+        Test that missing values are NaN in columns and None in output.
+        """
+        self.assertTrue(np.isnan(self.compact.hourly_rain_6h).all())
+        self.assertEqual(column_to_list(self.compact.hourly_rain_6h[:2]), [None, None])
+        self.assertIsNone(build_forecast_details(self.compact, 0)["rain"])
+
+    def test_column_conversions_match_values(self):
+        """
+        Test that column conversions match per value conversions.
+        """
+        conversion = CustomConvertion()
+        temps = [-12.5, 0.0, 21.3, 37.75]
+        directions = [-1, 0, 22.5, 90, 200, 359]
+        self.assertEqual(
+            conversion.convert_temp_in_farhenheit_column(np.array(temps)).tolist(),
+            [conversion.convert_temp_in_farhenheit(temp) for temp in temps])
+        self.assertEqual(
+            conversion.convert_wind_speed_column(np.array(temps)).tolist(),
+            [conversion.convert_wind_speed(temp) for temp in temps])
+        self.assertEqual(
+            conversion.convert_meters_to_feet_column(np.array(temps)).tolist(),
+            [conversion.convert_meters_to_feet(temp) for temp in temps])
+        self.assertEqual(
+            conversion.convert_wind_direction_column(
+                np.array(directions, dtype=np.float64)),
+            [conversion.convert_wind_direction(direction) for direction in directions])
+
+    def test_forecast_details(self):
+        """
+        Test that details built from columns keep the output shape.
+        """
+        data = make_forecast_data()
+        details = build_forecast_details(self.compact, 3)
+        self.assertEqual(details["temperature"], {
+            "min_C": 5.0, "max_C": 13.0, "min_F": 41.0, "max_F": 55.4})
+        self.assertEqual(details["humidity"], {"min": 43, "max": 83})
+        self.assertEqual(details["uv"], 2)
+        self.assertEqual(details["sea_level"], 1015.5)
+        self.assertEqual(details["wind"], {
+            "speed_kmh": 13, "speed_mph": 8.08, "direction": "E"})
+        self.assertEqual(details["iso0"], {"meters": 1503, "feet": 4931.1})
+        self.assertEqual(details["weather"], data["daily_forecast"][3]["weather12H"]["desc"])
+        self.assertEqual(
+            build_all_forecast_details(self.compact, "3")[0], {"day_id": 3, **details})
+
+    def test_daily_forecast(self):
+        """
+        Test that daily forecast is built from columns.
+        """
+        daily = build_daily_forecast(self.compact)
+        self.assertEqual(len(daily), 15)
+        self.assertEqual(daily[1]["day_id"], 1)
+        self.assertEqual(daily[1]["temperature"], {
+            "min_C": 3.0, "max_C": 11.0, "min_F": 37.4, "max_F": 51.8})
@@ -0,0 +1,75 @@
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework import status
+from unittest import mock
+import brotli
+import gzip
+import json
+from ...middleware import compressed_body_cache, negotiate_encoding
+from .test_weather_common import BaseWeatherTestCase, make_forecast
+
+
+class NegotiateEncodingTest(SimpleTestCase):
+    """
+    Test class for Accept-Encoding negotiation.
+    """
+
+    def test_negotiate(self):
+        """
+        Test that preferred supported encoding is chosen.
+        """
+        self.assertEqual(negotiate_encoding("gzip, deflate, br"), "br")
+        self.assertEqual(negotiate_encoding("gzip;q=1.0, br;q=0.5"), "gzip")
+        self.assertEqual(negotiate_encoding("br;q=0, gzip"), "gzip")
+        self.assertEqual(negotiate_encoding("*"), "br")
+        self.assertIsNone(negotiate_encoding("deflate, identity"))
+        self.assertIsNone(negotiate_encoding(""))
+
+
+class CompressionMiddlewareTest(BaseWeatherTestCase):
+    """
+    Test class for response compression middleware.
+    """
+
+    def setUp(self):
+        super().setUp()
+        compressed_body_cache.clear()
+        self.addCleanup(compressed_body_cache.clear)
+        self.url = reverse("weather", kwargs={"lat": "48.8566", "lon": "2.3522"})
+
+    @mock.patch("po_app.weather.weather_client")
+    def test_compressed_weather(self, mock_client):
+        """
+        Test that weather response is compressed and its body cached.
+        """
+        mock_client.get_forecast.return_value = make_forecast()
+        plain = self.client.get(self.url)
+        self.assertNotIn("Content-Encoding", plain)
+        self.assertIn("Accept-Encoding", plain["Vary"])
+
+        for encoding, decompress in [("br", brotli.decompress), ("gzip", gzip.decompress)]:
+            response = self.client.get(self.url, HTTP_ACCEPT_ENCODING=encoding)
+            self.assertEqual(response["Content-Encoding"], encoding)
+            self.assertLess(len(response.content), len(plain.content))
+            self.assertEqual(json.loads(decompress(response.content)), json.loads(plain.content))
+            self.assertEqual(response["ETag"], "W/" + plain["ETag"])
+
+        self.client.get(self.url, HTTP_ACCEPT_ENCODING="br")
+        self.assertEqual(compressed_body_cache.hits, 1)
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="br", HTTP_IF_NONE_MATCH="W/" + plain["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    @mock.patch("po_app.weather.weather_client")
+    def test_streamed_and_small_responses(self, mock_client):
+        """
+        Test that streamed responses are compressed and small ones are not.
+        """
+        mock_client.get_forecast.return_value = make_forecast()
+        url = reverse("weather-hourly", kwargs={"lat": "48.8566", "lon": "2.3522"})
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        data = json.loads(gzip.decompress(b"".join(response.streaming_content)))
+        self.assertEqual(len(data["data"]), 48)
+
+        response = self.client.get(reverse("api-root"), HTTP_ACCEPT_ENCODING="gzip")
+        self.assertNotIn("Content-Encoding", response)
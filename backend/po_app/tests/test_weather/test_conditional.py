@@ -0,0 +1,87 @@
+from django.urls import reverse
+from rest_framework import status
+from unittest import mock
+from ...forecast_cache import forecast_cache
+from ...weather import INVALID_DAYS_MESSAGE
+from .test_weather_common import BaseWeatherTestCase, make_forecast
+
+
+class ConditionalWeatherTest(BaseWeatherTestCase):
+    """
+    Test class for conditional GET on weather and geocoding views.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("weather", kwargs={"lat": "48.8566", "lon": "2.3522"})
+
+    @mock.patch("po_app.weather.weather_client")
+    def test_cache_headers(self, mock_client):
+        """
+        Test that weather response has validators and max-age.
+        """
+        mock_client.get_forecast.return_value = make_forecast()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["ETag"].startswith('"'))
+        self.assertEqual(response["Last-Modified"], "Tue, 31 Dec 2024 23:00:00 GMT")
+        self.assertIn("public", response["Cache-Control"])
+        max_age = int(response["Cache-Control"].split("max-age=")[1])
+        self.assertTrue(forecast_cache.ttl - 5 <= max_age <= forecast_cache.ttl)
+
+    @mock.patch("po_app.weather.weather_client")
+    def test_not_modified(self, mock_client):
+        """
+        Test that matching conditional requests get 304 without body.
+        """
+        mock_client.get_forecast.return_value = make_forecast()
+        etag = self.client.get(self.url)["ETag"]
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE="Tue, 31 Dec 2024 23:00:00 GMT")
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        details_url = reverse("weather-details", kwargs={"lat": "48.8566", "lon": "2.3522", "day_id": 1})
+        response = self.client.get(details_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(details_url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    @mock.patch("po_app.weather.weather_client")
+    def test_invalid_days_not_modified(self, mock_client):
+        """
+        Test that an invalid days selection gets 400 even with a matching ETag.
+        """
+        mock_client.get_forecast.return_value = make_forecast()
+        url = reverse("weather-details-all", kwargs={"lat": "48.8566", "lon": "2.3522"})
+        etag = self.client.get(url)["ETag"]
+        response = self.client.get(url, {"days": "9-2"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {"error": INVALID_DAYS_MESSAGE})
+
+    @mock.patch("po_app.weather.weather_client")
+    def test_updated_forecast(self, mock_client):
+        """
+        Test that a new forecast changes the ETag.
+        """
+        mock_client.get_forecast.return_value = make_forecast()
+        etag = self.client.get(self.url)["ETag"]
+        forecast_cache.clear()
+        mock_client.get_forecast.return_value = make_forecast(updated_on=1735689600)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    @mock.patch("po_app.weather.openweathermap_http.get")
+    def test_geocoding(self, mock_get):
+        """
+        Test that geocoding response has an ETag.
+        """
+        mock_get.return_value.json.return_value = [
+            {"name": "Paris", "lat": 48.8566, "lon": 2.3522, "country": "FR"}]
+        url = reverse("geocoding", kwargs={"city": "Paris"})
+        response = self.client.get(url)
+        self.assertIn("max-age=86400", response["Cache-Control"])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
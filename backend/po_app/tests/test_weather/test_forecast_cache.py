@@ -0,0 +1,243 @@
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework import status
+from unittest import mock
+import asyncio
+import os
+from ...forecast_cache import ForecastCache, snap_to_grid
+from ...models import Users
+from .test_weather_common import BaseWeatherTestCase, make_forecast
+
+
+class FakeClock():
+    """
+    Controllable clock for cache expiration tests.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class ForecastCacheTest(SimpleTestCase):
+    """
+    Test class for ForecastCache.
+    """
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = ForecastCache(ttl=60, max_entries=2, clock=self.clock)
+
+    def test_get_missing_key(self):
+        """
+        Test that a missing key returns None and counts a miss.
+        """
+        self.assertIsNone(self.cache.get("missing"))
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    def test_get_existing_key(self):
+        """
+        Test that a stored key returns value and counts a hit.
+        """
+        self.cache.set("paris", "forecast")
+        self.assertEqual(self.cache.get("paris"), "forecast")
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+    def test_entry_expires_after_ttl(self):
+        """
+        Test that entries expire after TTL.
+        """
+        self.cache.set("paris", "forecast")
+        self.clock.now = 61
+        self.assertIsNone(self.cache.get("paris"))
+        self.assertEqual(self.cache.stats()["size"], 0)
+
+    def test_lru_eviction(self):
+        """
+        Test that least recently used entry is evicted first.
+        """
+        self.cache.set("paris", 1)
+        self.cache.set("lyon", 2)
+        self.cache.get("paris")
+        self.cache.set("nice", 3)
+        self.assertIsNone(self.cache.get("lyon"))
+        self.assertEqual(self.cache.get("paris"), 1)
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_get_or_fetch(self):
+        """
+        Test that fetch is called only on a miss.
+        """
+        fetch = mock.Mock(return_value="forecast")
+        self.assertEqual(self.cache.get_or_fetch("paris", fetch), "forecast")
+        self.assertEqual(self.cache.get_or_fetch("paris", fetch), "forecast")
+        fetch.assert_called_once()
+
+    def test_get_or_fetch_shared(self):
+        """
+        Test that a value found in the shared store is used instead of fetching, with its age.
+        """
+        fetch = mock.Mock(return_value="forecast")
+        self.assertEqual(self.cache.get_or_fetch("paris", fetch, lambda: ("shared forecast", 50)), "shared forecast")
+        fetch.assert_not_called()
+        self.assertEqual(self.cache.time_to_live("paris"), 10)
+        self.assertEqual(self.cache.get_or_fetch("lyon", fetch, lambda: None), "forecast")
+        fetch.assert_called_once()
+
+    def test_snap_to_grid(self):
+        """
+        Test that nearby coordinates share the same grid cell.
+        """
+        self.assertEqual(snap_to_grid(48.8566, 2.3522, 0.025),
+                         snap_to_grid(48.8601, 2.3489, 0.025))
+        self.assertEqual(snap_to_grid(48.8566, 2.3522, 0.025), (48.85, 2.35))
+        self.assertNotEqual(snap_to_grid(48.8566, 2.3522, 0.025),
+                            snap_to_grid(45.764, 4.8357, 0.025))
+
+
+class InlineExecutor():
+    """
+    Executor running submitted functions immediately.
+    """
+
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+class StaleWhileRevalidateTest(SimpleTestCase):
+    """
+    Test class for ForecastCache stale-while-revalidate mode.
+    """
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.executor = InlineExecutor()
+        self.cache = ForecastCache(
+            ttl=60, max_entries=10, hard_ttl=600,
+            refresh_executor=self.executor, clock=self.clock)
+
+    def test_stale_value_served_and_refreshed(self):
+        """
+        Test that a stale value is served and refreshed in background.
+        """
+        self.cache.set("paris", "old forecast")
+        self.clock.now = 61
+        fetch = mock.Mock(return_value="new forecast")
+        self.assertEqual(self.cache.get_or_fetch(
+            "paris", fetch), "old forecast")
+        fetch.assert_called_once()
+        self.assertEqual(self.cache.get("paris"), "new forecast")
+        stats = self.cache.stats()
+        self.assertEqual(stats["stale_hits"], 1)
+        self.assertEqual(stats["background_refreshes"], 1)
+
+    def test_stale_value_kept_on_refresh_error(self):
+        """
+        Test that a failed refresh keeps serving the stale value.
+        """
+        self.cache.set("paris", "old forecast")
+        self.clock.now = 61
+        fetch = mock.Mock(side_effect=ValueError("upstream error"))
+        self.assertEqual(self.cache.get_or_fetch(
+            "paris", fetch), "old forecast")
+        self.assertEqual(self.cache.get_or_fetch(
+            "paris", fetch), "old forecast")
+        self.assertEqual(self.cache.stats()["refresh_errors"], 2)
+
+    def test_one_refresh_per_key(self):
+        """
+        Test that a running refresh is not started twice.
+        """
+        self.executor.submit = mock.Mock()
+        self.cache.set("paris", "old forecast")
+        self.clock.now = 61
+        fetch = mock.Mock(return_value="new forecast")
+        self.cache.get_or_fetch("paris", fetch)
+        self.cache.get_or_fetch("paris", fetch)
+        self.executor.submit.assert_called_once()
+
+    def test_value_expired_after_hard_ttl(self):
+        """
+        Test that values older than hard TTL are fetched synchronously.
+        """
+        self.cache.set("paris", "old forecast")
+        self.clock.now = 601
+        fetch = mock.Mock(return_value="new forecast")
+        self.assertEqual(self.cache.get_or_fetch(
+            "paris", fetch), "new forecast")
+        self.assertEqual(self.cache.stats()["stale_hits"], 0)
+
+    async def test_async_stale_value_served_and_refreshed(self):
+        """
+        Test that async lookups serve stale value and refresh in background.
+        """
+        self.cache.set("paris", "old forecast")
+        self.clock.now = 61
+
+        async def fetch():
+            return "new forecast"
+
+        self.assertEqual(await self.cache.aget_or_fetch("paris", fetch), "old forecast")
+        await asyncio.gather(*self.cache._refresh_tasks)
+        self.assertEqual(self.cache.get("paris"), "new forecast")
+
+
+class ForecastCacheViewsTest(BaseWeatherTestCase):
+    """
+    Test class for forecast cache shared by weather views.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.staff_user = Users.objects.create_user(
+            username="test_staff_user",
+            email="test_staff_user@example.com",
+            password=os.environ.get("VALID_PASSWORD"),
+            location={
+                "name": "London",
+                "lat": 51.5073219,
+                "lon": -0.1276474,
+                "country": "GB",
+            },
+            is_staff=True,
+        )
+
+    @mock.patch("po_app.weather.weather_client")
+    def test_weather_views_share_cache(self, mock_client):
+        """
+        Test that weather and weather details views share one upstream call.
+        """
+        mock_client.get_forecast.return_value = make_forecast()
+        response = self.client.get(
+            reverse("weather", kwargs={"lat": "48.8566", "lon": "2.3522"}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for day_id in range(3):
+            response = self.client.get(reverse("weather-details", kwargs={
+                "lat": "48.8601", "lon": "2.3489", "day_id": day_id}))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mock_client.get_forecast.assert_called_once_with(
+            latitude=48.85, longitude=2.35, language="en")
+
+    @mock.patch("po_app.weather.weather_client")
+    def test_cache_stats_staff(self, mock_client):
+        """
+        Test that staff users can access cache counters.
+        """
+        mock_client.get_forecast.return_value = make_forecast()
+        url = reverse("weather", kwargs={"lat": "48.8566", "lon": "2.3522"})
+        self.client.get(url)
+        self.client.get(url)
+        self.client.force_authenticate(user=self.staff_user)
+        response = self.client.get(reverse("weather-cache-stats"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["data"]["hits"], 1)
+        self.assertEqual(response.data["data"]["misses"], 1)
+
+    def test_cache_stats_unauthenticated(self):
+        """
+        Test that unauthenticated users can't access cache counters.
+        """
+        response = self.client.get(reverse("weather-cache-stats"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,185 @@
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework import status
+from unittest import mock
+import io
+import os
+import tempfile
+import zipfile
+from ...gazetteer import PrefixIndex, SpatialIndex, fold_name, get_gazetteer
+from ...management.commands.import_gazetteer import Command as ImportGazetteerCommand, get_conflict_fields
+from ...models import Places
+from ...validators import CustomLocationValidator
+from .test_weather_common import BaseWeatherTestCase
+
+PLACES = [
+    ("Paris", "Paris", 48.85341, 2.3488, "FR", 2138551),
+    ("Parisot", "Parisot", 44.26, 1.86, "FR", 600),
+    ("Paris", "Paris", 33.66094, -95.55551, "US", 24782),
+    ("Saint-Étienne", "Saint-Etienne", 45.43389, 4.39, "FR", 172565),
+    ("Lyon", "Lyon", 45.74846, 4.84671, "FR", 522969),
+]
+
+
+def geonames_row(geoname_id, name, ascii_name, lat, lon, country, population, feature_class="P"):
+    """
+    Build a GeoNames dump line.
+    """
+    return "\t".join([
+        str(geoname_id), name, ascii_name, "", str(lat), str(lon), feature_class, "PPL",
+        country, "", "", "", "", "", str(population), "", "", "Europe/Paris", "2024-01-01",
+    ]) + "\n"
+
+
+class PrefixIndexTest(SimpleTestCase):
+    """
+    Test class for offline gazetteer prefix index.
+    """
+
+    def setUp(self):
+        self.index = PrefixIndex(PLACES)
+
+    def test_fold_name(self):
+        """
+        Test that names are folded without accents and separators.
+        """
+        self.assertEqual(fold_name(" Saint-Étienne "), "saint etienne")
+        self.assertEqual(fold_name("L'Haÿ-les-Roses"), "l hay les roses")
+
+    def test_ranked_by_population(self):
+        """
+        Test that prefix matches are ranked by population.
+        """
+        results = self.index.search("par")
+        self.assertEqual([(place["name"], place["country"]) for place in results],
+                         [("Paris", "FR"), ("Paris", "US"), ("Parisot", "FR")])
+        self.assertEqual(results[0], {"name": "Paris", "lat": 48.85341, "lon": 2.3488, "country": "FR"})
+        self.assertEqual(len(self.index.search("par", limit=2)), 2)
+
+    def test_accents_and_miss(self):
+        """
+        Test that search ignores accents and returns nothing on a miss.
+        """
+        self.assertEqual(self.index.search("saint etie")[0]["name"], "Saint-Étienne")
+        self.assertEqual(self.index.search("SAINT-ÉTIENNE")[0]["name"], "Saint-Étienne")
+        self.assertEqual(self.index.search("nowhere"), [])
+        self.assertEqual(self.index.search(" "), [])
+
+
+class SpatialIndexTest(SimpleTestCase):
+    """
+    Test class for offline gazetteer spatial index.
+    """
+
+    def setUp(self):
+        self.index = SpatialIndex(PrefixIndex(PLACES + [
+            ("Suva", "Suva", -18.14, 178.44, "FJ", 77366),
+            ("Lambasa", "Lambasa", -16.41, -179.38, "FJ", 24187),
+        ]))
+
+    def test_nearest(self):
+        """
+        Test that nearest places are returned, nearest first.
+        """
+        results = self.index.nearest(45.7, 4.6, limit=2, max_distance=100)
+        self.assertEqual([place["name"] for place in results], ["Lyon", "Saint-Etienne"])
+        self.assertEqual(results[0], {"name": "Lyon", "lat": 45.74846, "lon": 4.84671, "country": "FR"})
+        self.assertIsNone(CustomLocationValidator()(results[1]))
+
+    def test_max_distance(self):
+        """
+        Test that places beyond max distance are ignored.
+        """
+        self.assertEqual(self.index.nearest(45.7, 4.6, max_distance=10), [])
+        self.assertEqual(self.index.nearest(0, 0), [])
+
+    def test_antimeridian(self):
+        """
+        Test that lookup crosses the antimeridian.
+        """
+        results = self.index.nearest(-16.5, 179.9, max_distance=200)
+        self.assertEqual(results[0]["name"], "Lambasa")
+
+
+class GazetteerGeocodingTest(BaseWeatherTestCase):
+    """
+    Test class for gazetteer import and geocoding view.
+    """
+
+    def import_dump(self, *args):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        lines = [geonames_row(index + 1, *place) for index, place in enumerate(PLACES)]
+        lines.append(geonames_row(99, "Lyon River", "Lyon River", 45, 4, "FR", 0, "H"))
+        path = os.path.join(directory.name, "cities.zip")
+        with zipfile.ZipFile(path, "w") as archive:
+            archive.writestr("cities.txt", "".join(lines))
+        out = io.StringIO()
+        call_command("import_gazetteer", path, *args, stdout=out)
+        return out.getvalue()
+
+    def test_import(self):
+        """
+        Test that populated places are imported, and import is idempotent.
+        """
+        self.assertIn("5 places imported", self.import_dump())
+        self.import_dump("--min-population", "1000")
+        self.assertEqual(Places.objects.count(), 5)
+        self.import_dump("--replace", "--countries", "us")
+        self.assertEqual(list(Places.objects.values_list("country", flat=True)), ["US"])
+
+    def test_upsert_without_conflict_target(self):
+        """
+        Test that places upserts are accepted by backends refusing a conflict target, as MySQL.
+        """
+        mysql_features = {"supports_update_conflicts": True, "supports_update_conflicts_with_target": False}
+        with mock.patch.multiple(connection.features, **mysql_features), \
+                mock.patch("django.db.models.query.QuerySet._batched_insert", return_value=[]) as mock_insert:
+            self.assertIsNone(get_conflict_fields())
+            batch = [Places(geoname_id=1, name="Paris", ascii_name="Paris", lat=48.85, lon=2.35,
+                            country="FR", population=2138551)]
+            self.assertEqual(ImportGazetteerCommand().save_batch(batch), 1)
+        self.assertFalse(mock_insert.call_args.kwargs["unique_fields"])
+        self.assertEqual(get_conflict_fields(), ["geoname_id"])
+
+    @mock.patch("po_app.weather.openweathermap_http.get")
+    def test_geocoding_uses_gazetteer(self, mock_get):
+        """
+        Test that geocoding is served by gazetteer without upstream call.
+        """
+        self.import_dump()
+        response = self.client.get(reverse("geocoding", kwargs={"city": "Lyo"}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["data"], [
+            {"name": "Lyon", "lat": 45.74846, "lon": 4.84671, "country": "FR"}])
+        mock_get.assert_not_called()
+        self.assertEqual(len(get_gazetteer()), 5)
+
+    @mock.patch("po_app.weather.openweathermap_http.get")
+    def test_geocoding_miss_falls_back(self, mock_get):
+        """
+        Test that a gazetteer miss calls the remote API.
+        """
+        self.import_dump()
+        mock_get.return_value.json.return_value = [
+            {"name": "Tokyo", "lat": 35.68, "lon": 139.69, "country": "JP"}]
+        response = self.client.get(reverse("geocoding", kwargs={"city": "Tokyo"}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["data"][0]["country"], "JP")
+        mock_get.assert_called_once()
+
+    def test_reverse_geocoding(self):
+        """
+        Test that reverse geocoding returns nearest locations.
+        """
+        self.import_dump()
+        response = self.client.get(reverse("reverse-geocoding", kwargs={"lat": "48.86", "lon": "2.35"}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["data"], [
+            {"name": "Paris", "lat": 48.85341, "lon": 2.3488, "country": "FR"}])
+        response = self.client.get(reverse("reverse-geocoding", kwargs={"lat": "0", "lon": "0"}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(reverse("reverse-geocoding", kwargs={"lat": "91", "lon": "0"}))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,79 @@
+from datetime import timedelta
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from unittest import mock
+from ...geocoding_cache import normalize_city, get_cached_geocoding, set_cached_geocoding
+from ...models import GeocodingCache
+from .test_weather_common import BaseWeatherTestCase
+
+PARIS = [{"name": "Paris", "lat": 48.8566, "lon": 2.3522, "country": "FR"}]
+
+
+class GeocodingCacheTest(TestCase):
+    """
+    Test class for geocoding cache.
+    """
+
+    def test_normalize_city(self):
+        """
+        Test that city names are normalized.
+        """
+        self.assertEqual(normalize_city("  Saint   ÉTIENNE "), "saint étienne")
+        self.assertEqual(normalize_city("Paris"), normalize_city("PARIS"))
+
+    def test_ttl(self):
+        """
+        Test that not found results expire sooner than found results.
+        """
+        set_cached_geocoding("paris", PARIS)
+        set_cached_geocoding("nowhere", [])
+        self.assertEqual(get_cached_geocoding("paris"), PARIS)
+        self.assertEqual(get_cached_geocoding("nowhere"), [])
+        self.assertIsNone(get_cached_geocoding("lyon"))
+        paris = GeocodingCache.objects.get(query="paris")
+        nowhere = GeocodingCache.objects.get(query="nowhere")
+        self.assertGreater(paris.expires_at, nowhere.expires_at)
+
+    def test_expired(self):
+        """
+        Test that expired entries are ignored.
+        """
+        GeocodingCache.objects.create(
+            query="paris", results=PARIS, expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertIsNone(get_cached_geocoding("paris"))
+        set_cached_geocoding("paris", PARIS)
+        self.assertEqual(GeocodingCache.objects.count(), 1)
+
+
+class GeocodingViewCacheTest(BaseWeatherTestCase):
+    """
+    Test class for geocoding view with cache.
+    """
+
+    @mock.patch("po_app.weather.openweathermap_http.get")
+    def test_cache_hit_skips_upstream(self, mock_get):
+        """
+        Test that a cached city is served without upstream call.
+        """
+        mock_get.return_value.json.return_value = [{**PARIS[0], "state": "Ile-de-France"}]
+        response = self.client.get(reverse("geocoding", kwargs={"city": "Paris"}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(mock_get.call_args.kwargs["params"]["q"], "paris")
+        response = self.client.get(reverse("geocoding", kwargs={"city": " PARIS"}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["data"], PARIS)
+        mock_get.assert_called_once()
+
+    @mock.patch("po_app.weather.openweathermap_http.get")
+    def test_not_found_is_cached(self, mock_get):
+        """
+        Test that a not found city is cached.
+        """
+        mock_get.return_value.json.return_value = []
+        url = reverse("geocoding", kwargs={"city": "Nowhere"})
+        for _ in range(2):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        mock_get.assert_called_once()
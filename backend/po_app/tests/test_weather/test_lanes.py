@@ -0,0 +1,178 @@
+from django.test import SimpleTestCase
+from unittest import mock
+import threading
+import time
+from ...lanes import BACKGROUND, INTERACTIVE, Lane, LaneScheduler, LaneTimeoutError, background_lane, current_lane
+from ...prefetch import prefetch_planned_forecasts
+from ...quota import ProviderLedger, TokenBucket
+from ...singleflight import SingleFlight
+from .test_forecast_cache import FakeClock
+
+
+class LaneContextTest(SimpleTestCase):
+    """
+    Test class for the lane of upstream calls.
+    """
+
+    def test_interactive_by_default(self):
+        """
+        Test that calls are interactive outside background jobs.
+        """
+        self.assertTrue(current_lane().interactive)
+
+    def test_background_lane(self):
+        """
+        Test that background_lane applies to blocks and decorated functions.
+        """
+        with background_lane():
+            self.assertEqual(current_lane().name, BACKGROUND)
+            self.assertFalse(current_lane().interactive)
+        self.assertEqual(current_lane().name, INTERACTIVE)
+
+        @background_lane()
+        def job():
+            return current_lane().name
+
+        self.assertEqual(job(), BACKGROUND)
+        self.assertEqual(current_lane().name, INTERACTIVE)
+
+    def test_prefetch_in_background_lane(self):
+        """
+        Test that prefetch fetches forecasts in the background lane.
+        """
+        lanes = []
+        with mock.patch("po_app.prefetch.get_upcoming_grid_cells", return_value={(48.85, 2.35): 1}), \
+                mock.patch("po_app.prefetch.fetch_forecast", side_effect=lambda *args: lanes.append(
+                    current_lane().name)):
+            prefetch_planned_forecasts(refresh_margin=0)
+        self.assertEqual(lanes, [BACKGROUND])
+
+
+class LaneSchedulerTest(SimpleTestCase):
+    """
+    Test class for LaneScheduler.
+    """
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.bucket = TokenBucket(rate=1, capacity=10, clock=self.clock)
+        self.lanes = LaneScheduler(
+            "Provider", self.bucket, background_concurrency=2, interactive_busy=2,
+            interactive_reserve=0.5, background_max_wait=0, clock=self.clock)
+
+    def test_interactive_never_waits(self):
+        """
+        Test that interactive calls get a slot whatever the background load.
+        """
+        self.lanes.enter(Lane(BACKGROUND))
+        self.lanes.enter(Lane(BACKGROUND))
+        self.assertEqual([self.lanes.enter(Lane()) for _ in range(5)], [INTERACTIVE] * 5)
+
+    def test_background_yields_to_interactive(self):
+        """
+        Test that background calls wait while interactive demand is high.
+        """
+        self.lanes.enter(Lane())
+        self.assertEqual(self.lanes.enter(Lane(BACKGROUND)), BACKGROUND)
+        self.lanes.leave(BACKGROUND)
+        self.lanes.enter(Lane())
+        with self.assertRaises(LaneTimeoutError):
+            self.lanes.enter(Lane(BACKGROUND))
+        self.lanes.leave(INTERACTIVE)
+        self.assertEqual(self.lanes.enter(Lane(BACKGROUND)), BACKGROUND)
+        stats = self.lanes.stats()[BACKGROUND]
+        self.assertEqual(stats["calls"], 2)
+        self.assertEqual(stats["dropped"], 1)
+
+    def test_background_concurrency(self):
+        """
+        Test that at most background_concurrency background calls run at once.
+        """
+        self.lanes.enter(Lane(BACKGROUND))
+        self.lanes.enter(Lane(BACKGROUND))
+        with self.assertRaises(LaneTimeoutError):
+            self.lanes.enter(Lane(BACKGROUND))
+        self.lanes.leave(BACKGROUND)
+        self.assertEqual(self.lanes.enter(Lane(BACKGROUND)), BACKGROUND)
+
+    def test_interactive_reserve(self):
+        """
+        Test that background calls leave the reserved share of the bucket to interactive calls.
+        """
+        for _ in range(5):
+            self.lanes.enter(Lane(BACKGROUND))
+            self.lanes.leave(BACKGROUND)
+        self.assertEqual(self.bucket.tokens, 5)
+        with self.assertRaises(LaneTimeoutError):
+            self.lanes.enter(Lane(BACKGROUND))
+        self.clock.now = 1
+        self.assertEqual(self.lanes.enter(Lane(BACKGROUND)), BACKGROUND)
+
+    def test_promoted_call(self):
+        """
+        Test that a waiting background call runs as interactive once promoted.
+        """
+        lanes = LaneScheduler("Provider", self.bucket, background_concurrency=0, interactive_busy=1,
+                              interactive_reserve=0, background_max_wait=5, poll_interval=0.01)
+        lane = Lane(BACKGROUND)
+        threading.Timer(0.05, lane.promote).start()
+        self.assertEqual(lanes.enter(lane), INTERACTIVE)
+        self.assertEqual(lanes.stats()[BACKGROUND]["promoted"], 1)
+
+
+class LedgerSlotTest(SimpleTestCase):
+    """
+    Test class for ProviderLedger lanes.
+    """
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.ledger = ProviderLedger("Provider", rate=1, burst=4, max_wait=0, clock=self.clock,
+                                     lanes_settings={"BACKGROUND_MAX_WAIT": 0})
+
+    def test_background_keeps_interactive_budget(self):
+        """
+        Test that background calls stop at the reserve, interactive calls can spend it.
+        """
+        with background_lane():
+            for _ in range(2):
+                with self.ledger.slot():
+                    pass
+            with self.assertRaises(LaneTimeoutError):
+                with self.ledger.slot():
+                    pass
+        for _ in range(2):
+            with self.ledger.slot():
+                pass
+        stats = self.ledger.stats()["lanes"]
+        self.assertEqual(stats[INTERACTIVE]["calls"], 2)
+        self.assertEqual(stats[BACKGROUND]["calls"], 2)
+        self.assertEqual(stats[BACKGROUND]["running"], 0)
+
+    def test_singleflight_promotion(self):
+        """
+        Test that an interactive request waiting for a background fetch promotes it.
+        """
+        flight = SingleFlight()
+        started = threading.Event()
+        lanes = []
+
+        def fetch():
+            started.set()
+            for _ in range(500):
+                if current_lane().interactive:
+                    break
+                time.sleep(0.01)
+            lanes.append(current_lane().interactive)
+            return "forecast"
+
+        def background_job():
+            with background_lane():
+                flight.do("cell", fetch)
+
+        job = threading.Thread(target=background_job)
+        job.start()
+        started.wait(5)
+        self.assertEqual(flight.do("cell", fetch), "forecast")
+        job.join(5)
+        self.assertEqual(lanes, [True])
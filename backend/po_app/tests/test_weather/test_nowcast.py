@@ -0,0 +1,143 @@
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from meteofrance_api.model import Rain
+from rest_framework import status
+import os
+from ...models import Users, Activities, PlannedActivities, RainNowcasts
+from ...nowcast import poll_rain_nowcasts
+from .test_weather_common import BaseWeatherTestCase
+
+
+def make_rain(start_dt=1735689600, levels=(1, 1, 2, 3)):
+    """
+    Build a Meteofrance rain instance, one rain level every 5 minutes.
+    """
+    return Rain({
+        "position": {"lat": 48.85, "lon": 2.35, "timezone": "Europe/Paris"},
+        "updated_on": start_dt - 300,
+        "quality": 0,
+        "forecast": [
+            {"dt": start_dt + index * 300, "rain": level, "desc": "Rain" if level > 1 else "Dry"}
+            for index, level in enumerate(levels)
+        ],
+    })
+
+
+class RainNowcastTest(BaseWeatherTestCase):
+    """
+    Test class for the rain nowcast poller and its planned activity detail.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = Users.objects.create_user(
+            username="test_user",
+            email="test_user@example.com",
+            password=os.environ.get("VALID_PASSWORD"),
+            location={"name": "Paris", "lat": 48.8566, "lon": 2.3522, "country": "FR"},
+        )
+        self.activity = Activities.objects.create(
+            name="testactivity",
+            description="test activity description",
+        )
+        now = timezone.now()
+        paris_1 = {"name": "Paris", "lat": 48.8566, "lon": 2.3522, "country": "FR"}
+        paris_2 = {"name": "Paris", "lat": 48.8601, "lon": 2.3489, "country": "FR"}
+        lyon = {"name": "Lyon", "lat": 45.764, "lon": 4.8357, "country": "FR"}
+        self.planned_activities = []
+        for location, start in [
+            (paris_1, now + timedelta(minutes=10)),
+            (paris_2, now + timedelta(minutes=30)),
+            (lyon, now + timedelta(minutes=50)),
+            # out of window and started planned activities are ignored
+            (lyon, now + timedelta(hours=3)),
+            (paris_1, now - timedelta(minutes=10)),
+        ]:
+            self.planned_activities.append(PlannedActivities.objects.create(
+                user=self.user,
+                activity=self.activity,
+                location=location,
+                start_datetime=start,
+                end_datetime=start + timedelta(hours=2),
+            ))
+
+    @mock.patch("po_app.nowcast.weather_client")
+    def test_poll_groups_locations(self, mock_client):
+        """
+        Test that each imminent grid cell is polled once.
+        """
+        mock_client.get_rain.return_value = make_rain()
+        report = poll_rain_nowcasts()
+        self.assertEqual(report, {
+            "planned_activities": 3,
+            "locations": 2,
+            "already_fresh": 0,
+            "upstream_calls": 2,
+            "errors": 0,
+            "upstream_calls_saved": 1,
+        })
+        self.assertEqual(RainNowcasts.objects.count(), 2)
+        self.assertEqual(len(RainNowcasts.objects.get(grid_lat=48.85, grid_lon=2.35).forecast), 4)
+
+    @mock.patch("po_app.nowcast.weather_client")
+    def test_poll_skips_fresh_nowcasts(self, mock_client):
+        """
+        Test that nowcasts are refreshed only after the refresh interval.
+        """
+        mock_client.get_rain.return_value = make_rain()
+        poll_rain_nowcasts()
+        report = poll_rain_nowcasts()
+        self.assertEqual(report["already_fresh"], 2)
+        self.assertEqual(mock_client.get_rain.call_count, 2)
+        report = poll_rain_nowcasts(refresh_interval=0)
+        self.assertEqual(report["upstream_calls"], 2)
+
+    @mock.patch("po_app.nowcast.weather_client")
+    def test_poll_deletes_old_nowcasts(self, mock_client):
+        """
+        Test that nowcasts older than MAX_AGE are deleted.
+        """
+        mock_client.get_rain.return_value = make_rain()
+        RainNowcasts.objects.create(
+            grid_lat=43.7, grid_lon=7.25, updated_on=timezone.now(),
+            fetched_at=timezone.now() - timedelta(hours=2),
+        )
+        poll_rain_nowcasts()
+        self.assertFalse(RainNowcasts.objects.filter(grid_lat=43.7).exists())
+
+    @mock.patch("po_app.nowcast.weather_client")
+    def test_planned_activity_detail(self, mock_client):
+        """
+        Test that planned activity detail shows the polled nowcast
+        of imminent planned activities only.
+        """
+        mock_client.get_rain.return_value = make_rain()
+        poll_rain_nowcasts()
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse(
+            "planned-activity-detail", kwargs={"pk": self.planned_activities[1].id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        nowcast = response.data["rain_nowcast"]
+        self.assertEqual(len(nowcast["forecast"]), 4)
+        self.assertEqual(nowcast["next_rain"], nowcast["forecast"][2]["datetime"])
+        self.assertEqual(nowcast["forecast"][3]["rain"], 3)
+
+        response = self.client.get(reverse(
+            "planned-activity-detail", kwargs={"pk": self.planned_activities[3].id}))
+        self.assertIsNone(response.data["rain_nowcast"])
+        self.assertEqual(mock_client.get_rain.call_count, 2)
+
+    @mock.patch("po_app.nowcast.weather_client")
+    def test_poll_command(self, mock_client):
+        """
+        Test poll_rain_nowcasts command output.
+        """
+        mock_client.get_rain.side_effect = ValueError("upstream error")
+        out = StringIO()
+        call_command("poll_rain_nowcasts", stdout=out)
+        self.assertIn("3 planned activities in 2 locations", out.getvalue())
+        self.assertIn("2 errors", out.getvalue())
@@ -0,0 +1,188 @@
+from django.apps import apps
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+import os
+import threading
+from ...compact_forecast import CompactForecast
+from ...forecast_cache import forecast_cache
+from ...models import Users, Activities, PlannedActivities
+from ...periodic import run_periodic
+from ...prefetch import prefetch_planned_forecasts, start_prefetch_scheduler
+from ...snapshots import snapshot_store
+from .test_weather_common import BaseWeatherTestCase, make_forecast
+
+
+class PrefetchPlannedForecastsTest(BaseWeatherTestCase):
+    """
+    Test class for planned activities forecast prefetch.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = Users.objects.create_user(
+            username="test_user",
+            email="test_user@example.com",
+            password=os.environ.get("VALID_PASSWORD"),
+            location={
+                "name": "London",
+                "lat": 51.5073219,
+                "lon": -0.1276474,
+                "country": "GB",
+            },
+        )
+        self.activity = Activities.objects.create(
+            name="testactivity",
+            description="test activity description",
+        )
+        now = timezone.now()
+        paris_1 = {"name": "Paris", "lat": 48.8566,
+                   "lon": 2.3522, "country": "FR"}
+        paris_2 = {"name": "Paris", "lat": 48.8601,
+                   "lon": 2.3489, "country": "FR"}
+        lyon = {"name": "Lyon", "lat": 45.764, "lon": 4.8357, "country": "FR"}
+        nice = {"name": "Nice", "lat": 43.7102, "lon": 7.262, "country": "FR"}
+        for location, start in [
+            (paris_1, now + timedelta(days=1)),
+            (paris_2, now + timedelta(days=2)),
+            (lyon, now + timedelta(days=3)),
+            # out of horizon and past planned activities are ignored
+            (nice, now + timedelta(days=30)),
+            (nice, now - timedelta(days=3)),
+        ]:
+            PlannedActivities.objects.create(
+                user=self.user,
+                activity=self.activity,
+                location=location,
+                start_datetime=start,
+                end_datetime=start + timedelta(hours=2),
+            )
+
+    @mock.patch("po_app.weather.weather_client")
+    def test_prefetch_groups_locations(self, mock_client):
+        """
+        Test that prefetch fetches each upcoming grid cell once.
+        """
+        mock_client.get_forecast.return_value = make_forecast()
+        report = prefetch_planned_forecasts()
+        self.assertEqual(report, {
+            "planned_activities": 3,
+            "locations": 2,
+            "already_cached": 0,
+            "upstream_calls": 2,
+            "errors": 0,
+            "upstream_calls_saved": 1,
+        })
+        self.assertIsNotNone(forecast_cache.get((48.85, 2.35)))
+        self.assertIsNotNone(forecast_cache.get((45.775, 4.825)))
+
+    @mock.patch("po_app.weather.weather_client")
+    def test_prefetch_skips_warm_entries(self, mock_client):
+        """
+        Test that cached forecasts far from expiration are not refetched.
+        """
+        mock_client.get_forecast.return_value = make_forecast()
+        prefetch_planned_forecasts()
+        report = prefetch_planned_forecasts()
+        self.assertEqual(report["already_cached"], 2)
+        self.assertEqual(report["upstream_calls"], 0)
+        self.assertEqual(report["upstream_calls_saved"], 3)
+        self.assertEqual(mock_client.get_forecast.call_count, 2)
+
+    @mock.patch("po_app.weather.weather_client")
+    def test_prefetch_refreshes_expiring_entries(self, mock_client):
+        """
+        Test that cached forecasts close to expiration are refreshed.
+        """
+        mock_client.get_forecast.return_value = make_forecast()
+        prefetch_planned_forecasts()
+        report = prefetch_planned_forecasts(
+            refresh_margin=forecast_cache.ttl + 1)
+        self.assertEqual(report["upstream_calls"], 2)
+
+    @mock.patch("po_app.snapshots.snapshot_executor")
+    @mock.patch("po_app.weather.weather_client")
+    def test_prefetch_command(self, mock_client, mock_executor):
+        """
+        Test that the command skips forecasts fresh in snapshots and stores the others as snapshots.
+        """
+        mock_client.get_forecast.return_value = make_forecast()
+        out = StringIO()
+        with self.assertRaises(CommandError):
+            call_command("prefetch_forecasts", stdout=out)
+        with override_settings(FORECAST_SNAPSHOTS={"ENABLED": True}):
+            snapshot_store.record(48.85, 2.35, CompactForecast.from_forecast(make_forecast()))
+            call_command("prefetch_forecasts", stdout=out)
+        self.assertIn("3 planned activities in 2 locations", out.getvalue())
+        self.assertIn("1 upstream calls, 1 already cached", out.getvalue())
+        # fetched forecast stored, then pending snapshots waited for
+        self.assertEqual(mock_executor.submit.call_count, 2)
+
+
+class BackgroundJobsTest(SimpleTestCase):
+    """
+    Test class for background jobs startup.
+    """
+
+    @mock.patch("po_app.snapshots.start_snapshot_warmup")
+    @mock.patch("po_app.jobs.start_background_jobs")
+    def test_started_only_if_enabled(self, mock_start_background_jobs, mock_start_snapshot_warmup):
+        """
+        Test that every process warms its cache from snapshots on startup,
+        and starts background jobs only if START_BACKGROUND_JOBS is enabled.
+        """
+        app_config = apps.get_app_config("po_app")
+        app_config.ready()
+        mock_start_snapshot_warmup.assert_called_once()
+        mock_start_background_jobs.assert_not_called()
+        with override_settings(START_BACKGROUND_JOBS=True):
+            app_config.ready()
+        mock_start_background_jobs.assert_called_once()
+        self.assertEqual(mock_start_snapshot_warmup.call_count, 2)
+
+    def test_run_command_without_jobs(self):
+        """
+        Test that the background jobs command fails when no job is enabled.
+        """
+        with self.assertRaises(CommandError):
+            call_command("run_background_jobs", stdout=StringIO(), stderr=StringIO())
+
+    @mock.patch("po_app.periodic.close_old_connections")
+    def test_periodic_job(self, mock_close_old_connections):
+        """
+        Test that a periodic job runs until stopped, a failed run is logged and the next one runs.
+        """
+        stop_event = threading.Event()
+        runs = []
+
+        def job():
+            runs.append(len(runs))
+            if len(runs) == 1:
+                raise ValueError("unexpected data")
+            stop_event.set()
+            return {"runs": len(runs)}
+
+        with self.assertLogs("po_app.periodic") as logs:
+            run_periodic(job, "Test job", lambda: 0, stop_event)
+        self.assertEqual(runs, [0, 1])
+        self.assertEqual(mock_close_old_connections.call_count, 2)
+        self.assertEqual(logs.output, [
+            "ERROR:po_app.periodic:Test job failed: unexpected data",
+            "INFO:po_app.periodic:Test job: {'runs': 2}",
+        ])
+
+    @mock.patch("po_app.prefetch.start_periodic")
+    def test_scheduler_interval(self, mock_start_periodic):
+        """
+        Test that a scheduler starts only with an interval, waiting it between runs.
+        """
+        self.assertIsNone(start_prefetch_scheduler())
+        with override_settings(FORECAST_PREFETCH={"INTERVAL": 60}):
+            self.assertEqual(start_prefetch_scheduler(), mock_start_periodic.return_value)
+        job, label, next_wait, thread_name = mock_start_periodic.call_args.args
+        self.assertEqual(job, prefetch_planned_forecasts)
+        self.assertEqual(next_wait(), 60)
@@ -0,0 +1,184 @@
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework import status
+from unittest import mock
+import os
+from ...circuit_breaker import CLOSED, meteofrance_breaker
+from ...models import Users
+from ...quota import ProviderLedger, QuotaExceededError, TokenBucket, upstream_ledger
+from ...upstream import UpstreamClient
+from .test_forecast_cache import FakeClock
+from .test_upstream import UpstreamClientTest
+from .test_weather_common import BaseWeatherTestCase
+
+
+class TokenBucketTest(SimpleTestCase):
+    """
+    Test class for TokenBucket.
+    """
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.bucket = TokenBucket(rate=2, capacity=3, clock=self.clock)
+
+    def test_burst_then_wait(self):
+        """
+        Test that a full bucket serves BURST calls at once, then calls wait for refill.
+        """
+        self.assertEqual([self.bucket.reserve(max_wait=1) for _ in range(3)], [0, 0, 0])
+        self.assertEqual(self.bucket.reserve(max_wait=1), 0.5)
+        self.assertEqual(self.bucket.reserve(max_wait=1), 1)
+        self.assertIsNone(self.bucket.reserve(max_wait=1))
+
+    def test_refill(self):
+        """
+        Test that tokens refill at rate, up to capacity.
+        """
+        for _ in range(3):
+            self.bucket.reserve(max_wait=0)
+        self.clock.now = 1
+        self.assertEqual(self.bucket.tokens, 2)
+        self.clock.now = 100
+        self.assertEqual(self.bucket.tokens, 3)
+
+    def test_debt(self):
+        """
+        Test that consumed tokens delay next calls.
+        """
+        self.bucket.consume(4)
+        self.assertEqual(self.bucket.reserve(max_wait=10), 1)
+
+    def test_no_limit(self):
+        """
+        Test that rate 0 never waits.
+        """
+        bucket = TokenBucket(rate=0, capacity=1, clock=self.clock)
+        self.assertEqual([bucket.reserve(max_wait=0) for _ in range(100)], [0] * 100)
+
+
+class ProviderLedgerTest(SimpleTestCase):
+    """
+    Test class for ProviderLedger.
+    """
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.ledger = ProviderLedger("Provider", rate=1, burst=2, max_wait=1, clock=self.clock)
+
+    def test_refuse_and_defer(self):
+        """
+        Test that calls over quota are deferred up to MAX_WAIT, then refused.
+        """
+        self.assertEqual(self.ledger.reserve(), 0)
+        self.assertEqual(self.ledger.reserve(), 0)
+        self.assertEqual(self.ledger.reserve(), 1)
+        with self.assertRaises(QuotaExceededError):
+            self.ledger.reserve()
+        stats = self.ledger.stats()
+        self.assertEqual(stats["deferred"], 1)
+        self.assertEqual(stats["refused"], 1)
+
+    def test_usage(self):
+        """
+        Test calls, errors and rolling usage counters.
+        """
+        self.ledger.record(0.1, 200)
+        self.clock.now = 120
+        self.ledger.record(0.3, 503, attempts=3)
+        self.ledger.record(0.2)
+        stats = self.ledger.stats()
+        self.assertEqual(stats["calls"], 5)
+        self.assertEqual(stats["last_minute"], 4)
+        self.assertEqual(stats["last_hour"], 5)
+        self.assertEqual(stats["errors"], 2)
+        self.assertEqual(stats["statuses"], {"200": 1, "503": 1, "error": 1})
+        self.assertEqual(stats["avg_latency_ms"], 200)
+        self.assertEqual(stats["quota"]["budget_per_hour"], 3600)
+        self.clock.now = 4000
+        self.assertEqual(self.ledger.stats()["last_hour"], 0)
+
+    def test_refusal_is_not_a_failure(self):
+        """
+        Test that refused calls do not open the circuit breaker.
+        """
+        meteofrance_breaker.reset()
+        self.addCleanup(meteofrance_breaker.reset)
+        self.ledger.bucket.consume(3)
+        for _ in range(10):
+            with self.assertRaises(QuotaExceededError):
+                meteofrance_breaker.call(self.ledger.reserve)
+        self.assertEqual(meteofrance_breaker.state, CLOSED)
+
+
+class UpstreamCallsLedgerTest(SimpleTestCase):
+    """
+    Test class for upstream calls recorded by pooled clients.
+    """
+    start_server = UpstreamClientTest.start_server
+
+    def setUp(self):
+        upstream_ledger.reset()
+        self.addCleanup(upstream_ledger.reset)
+
+    def test_calls_recorded(self):
+        """
+        Test that calls and retries are recorded with their status.
+        """
+        server, url = self.start_server(failures=1)
+        client = UpstreamClient("Openweathermap", BACKOFF_FACTOR=0, MAX_RETRIES=2)
+        self.addCleanup(client.close)
+        self.assertEqual(client.get(url).status_code, 200)
+        stats = upstream_ledger.stats()["openweathermap"]
+        self.assertEqual(stats["calls"], 2)
+        self.assertEqual(stats["statuses"], {"200": 1})
+        self.assertEqual(server.requests, 2)
+
+    def test_calls_refused(self):
+        """
+        Test that calls over quota never reach upstream.
+        """
+        server, url = self.start_server(failures=0)
+        client = UpstreamClient("Openweathermap")
+        self.addCleanup(client.close)
+        ledger = upstream_ledger["Openweathermap"]
+        with mock.patch.object(ledger, "max_wait", 0), mock.patch.object(ledger.bucket, "rate", 0.001):
+            ledger.bucket.consume(ledger.bucket.capacity)
+            with self.assertRaises(QuotaExceededError):
+                client.get(url)
+        self.assertEqual(server.requests, 0)
+        self.assertEqual(upstream_ledger.stats()["openweathermap"]["refused"], 1)
+
+
+class UpstreamQuotaViewsTest(BaseWeatherTestCase):
+    """
+    Test class for quota refusals and usage in weather views.
+    """
+
+    def test_geocoding_quota_exceeded(self):
+        """
+        Test that geocoding answers 503 when Openweathermap quota is spent.
+        """
+        ledger = upstream_ledger["Openweathermap"]
+        with mock.patch.object(ledger, "max_wait", 0), mock.patch.object(ledger.bucket, "rate", 0.001):
+            ledger.bucket.consume(ledger.bucket.capacity)
+            response = self.client.get(reverse("geocoding", kwargs={"city": "Paris"}))
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertIn("quota exceeded", response.data["error"])
+
+    def test_usage_in_cache_stats(self):
+        """
+        Test that staff users get upstream usage with cache counters.
+        """
+        staff_user = Users.objects.create_user(
+            username="test_staff_user",
+            email="test_staff_user@example.com",
+            password=os.environ.get("VALID_PASSWORD"),
+            location={"name": "London", "lat": 51.5073219, "lon": -0.1276474, "country": "GB"},
+            is_staff=True,
+        )
+        upstream_ledger["Meteofrance"].record(0.05, 200)
+        self.client.force_authenticate(user=staff_user)
+        response = self.client.get(reverse("weather-cache-stats"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["upstream"]["meteofrance"]["calls"], 1)
+        self.assertIn("budget_per_hour", response.data["upstream"]["openweathermap"]["quota"])
@@ -0,0 +1,170 @@
+from django.test import SimpleTestCase
+from unittest import mock
+import asyncio
+import threading
+import time
+from ...singleflight import AsyncSingleFlight, SingleFlight, database_lock
+from ...weather import get_forecast
+from .test_weather_common import BaseWeatherTestCase, make_forecast
+
+
+class SingleFlightTest(SimpleTestCase):
+    """
+    Test class for SingleFlight.
+    """
+
+    def run_concurrently(self, flight, fn, count=10):
+        """
+        Run flight.do() from several threads while fn is blocked.
+        """
+        results = []
+        errors = []
+
+        def worker():
+            try:
+                results.append(flight.do("paris", fn))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        return threads, results, errors
+
+    def wait_for_waiters(self, flight, count):
+        """
+        Wait until all threads joined the in-flight call.
+        """
+        deadline = time.monotonic() + 5
+        while flight.stats()["coalesced"] < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_concurrent_calls_share_result(self):
+        """
+        Test that concurrent callers share one call result.
+        """
+        flight = SingleFlight()
+        release = threading.Event()
+        fn = mock.Mock(side_effect=lambda: release.wait() and "forecast")
+        threads, results, errors = self.run_concurrently(flight, fn)
+        self.wait_for_waiters(flight, 9)
+        release.set()
+        for thread in threads:
+            thread.join()
+        fn.assert_called_once()
+        self.assertEqual(results, ["forecast"] * 10)
+        self.assertEqual(errors, [])
+        self.assertEqual(flight.stats(), {
+                         "leaders": 1, "coalesced": 9, "in_flight": 0})
+
+    def test_concurrent_calls_share_error(self):
+        """
+        Test that concurrent callers share one call error.
+        """
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def fn():
+            release.wait()
+            raise ValueError("upstream error")
+
+        threads, results, errors = self.run_concurrently(flight, fn)
+        self.wait_for_waiters(flight, 9)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [])
+        self.assertEqual(len(errors), 10)
+        self.assertTrue(all(isinstance(e, ValueError) for e in errors))
+
+    def test_sequential_calls_not_coalesced(self):
+        """
+        Test that a finished call is not shared with later callers.
+        """
+        flight = SingleFlight()
+        fn = mock.Mock(return_value="forecast")
+        flight.do("paris", fn)
+        flight.do("paris", fn)
+        self.assertEqual(fn.call_count, 2)
+
+    def test_database_lock_without_mysql(self):
+        """
+        Test that database lock is a no-op on other database backends.
+        """
+        with database_lock("po_forecast:48.85:2.35") as acquired:
+            self.assertFalse(acquired)
+
+
+class AsyncSingleFlightTest(SimpleTestCase):
+    """
+    Test class for AsyncSingleFlight.
+    """
+
+    async def test_cancelled_leader(self):
+        """
+        Test that cancelling the leader does not cancel the call of its waiters.
+        """
+        flight = AsyncSingleFlight()
+        release = asyncio.Event()
+
+        async def fn():
+            await release.wait()
+            return "forecast"
+
+        leader = asyncio.create_task(flight.do("paris", fn))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(flight.do("paris", fn))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await leader
+        release.set()
+        self.assertEqual(await waiter, "forecast")
+        self.assertEqual(flight.stats(), {"leaders": 1, "coalesced": 1, "in_flight": 0})
+
+    async def test_shared_error(self):
+        """
+        Test that waiters share the call error, and a finished call is not shared.
+        """
+        flight = AsyncSingleFlight()
+        release = asyncio.Event()
+
+        async def fn():
+            await release.wait()
+            raise ValueError("upstream error")
+
+        calls = [asyncio.create_task(flight.do("paris", fn)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*calls, return_exceptions=True)
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+        self.assertEqual(flight.stats(), {"leaders": 1, "coalesced": 2, "in_flight": 0})
+
+class SingleFlightForecastTest(BaseWeatherTestCase):
+    """
+    Test class for coalescing concurrent forecast fetches.
+    """
+
+    @mock.patch("po_app.weather.weather_client")
+    def test_concurrent_forecasts_single_upstream_call(self, mock_client):
+        """
+        Test that concurrent requests for one location call upstream once.
+        """
+        release = threading.Event()
+        forecast = make_forecast()
+        mock_client.get_forecast.side_effect = lambda **kwargs: release.wait() and forecast
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(
+                get_forecast(48.8566, 2.3522)))
+            for _ in range(10)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.2)
+        release.set()
+        for thread in threads:
+            thread.join()
+        mock_client.get_forecast.assert_called_once()
+        self.assertEqual(len(results), 10)
+        self.assertTrue(all(result is results[0] for result in results))
@@ -0,0 +1,210 @@
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from contextlib import contextmanager
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from ...compact_forecast import CompactForecast
+from ...forecast_cache import ForecastCache, forecast_cache
+from ...models import ForecastSnapshots
+from ...snapshots import SnapshotStore, record_snapshot, snapshot_store
+from ...weather import fetch_forecast, get_forecast
+from .test_forecast_cache import FakeClock
+from .test_weather_common import make_forecast, make_forecast_data, reset_weather_state
+
+SNAPSHOTS_ENABLED = {"ENABLED": True, "KEYFRAME_INTERVAL": 3}
+
+
+def make_run(hour):
+    """
+    Build the compact forecast of the model run of hour, starting one hour later.
+    """
+    start_dt = 1735689600 + hour * 3600
+    return CompactForecast.from_raw_data(make_forecast_data(start_dt=start_dt, updated_on=start_dt - 3600))
+
+
+@override_settings(FORECAST_SNAPSHOTS=SNAPSHOTS_ENABLED)
+class SnapshotStoreTest(TestCase):
+    """
+    Test class for delta-compressed forecast snapshots.
+    """
+
+    def setUp(self):
+        self.store = SnapshotStore(max_entries=10)
+
+    def test_columns_round_trip(self):
+        """
+        Test that a forecast is rebuilt identical from its columns.
+        """
+        forecast = make_run(0)
+        rebuilt = CompactForecast.from_columns(forecast.to_columns())
+        self.assertEqual(rebuilt.to_columns(), forecast.to_columns())
+        self.assertEqual(rebuilt.hourly_iso0.tolist(), forecast.hourly_iso0.tolist())
+        self.assertTrue((rebuilt.hourly_rain_6h != rebuilt.hourly_rain_6h).all())
+
+    def test_delta_chain(self):
+        """
+        Test that snapshots are deltas of the previous one, with a keyframe every KEYFRAME_INTERVAL.
+        """
+        for hour in range(4):
+            self.store.record(48.85, 2.35, make_run(hour))
+        snapshots = list(ForecastSnapshots.objects.order_by("id"))
+        self.assertEqual([snapshot.chain for snapshot in snapshots], [0, 1, 2, 0])
+        self.assertEqual(snapshots[1].base, snapshots[0])
+        self.assertIsNone(snapshots[3].base)
+        self.assertLess(len(snapshots[1].data), len(snapshots[0].data) / 2)
+        self.assertLess(len(snapshots[0].data), snapshots[0].size / 5)
+
+    def test_history(self):
+        """
+        Test that history decodes every snapshot of a location, without cached bases.
+        """
+        for hour in range(4):
+            self.store.record(48.85, 2.35, make_run(hour))
+        history = SnapshotStore(max_entries=10).history(48.85, 2.35)
+        self.assertEqual(
+            [forecast.hourly_dt[0] for _, forecast in history],
+            [1735689600 + hour * 3600 for hour in range(4)])
+        self.assertEqual(history[2][1].to_columns(), make_run(2).to_columns())
+
+    def test_same_forecast(self):
+        """
+        Test that the same forecast fetched again only updates its fetch time.
+        """
+        first_id = self.store.record(48.85, 2.35, make_run(0))
+        ForecastSnapshots.objects.update(fetched_at=timezone.now() - timedelta(minutes=15))
+        self.assertEqual(self.store.record(48.85, 2.35, make_run(0)), first_id)
+        self.assertEqual(ForecastSnapshots.objects.count(), 1)
+        self.assertGreater(ForecastSnapshots.objects.get().fetched_at, timezone.now() - timedelta(minutes=1))
+
+    def test_warm_cache(self):
+        """
+        Test that the latest snapshots fill the cache, fresh or stale by age.
+        """
+        self.store.record(48.85, 2.35, make_run(0))
+        self.store.record(48.85, 2.35, make_run(1))
+        self.store.record(43.3, 5.375, make_run(0))
+        self.store.record(45.75, 4.85, make_run(0))
+        now = timezone.now()
+        ForecastSnapshots.objects.filter(grid_lat=43.3).update(fetched_at=now - timedelta(minutes=30))
+        ForecastSnapshots.objects.filter(grid_lat=45.75).update(fetched_at=now - timedelta(days=1))
+        cache = ForecastCache(ttl=900, hard_ttl=3600, max_entries=10, clock=FakeClock())
+
+        self.assertEqual(SnapshotStore(max_entries=10).warm_cache(cache, max_age=3600), 2)
+        self.assertEqual(cache.get((48.85, 2.35)).hourly_dt[0], 1735689600 + 3600)
+        _, is_stale = cache.get_stale((43.3, 5.375))
+        self.assertTrue(is_stale)
+        self.assertIsNone(cache.get_last_good((45.75, 4.85)))
+
+    def test_prune(self):
+        """
+        Test that pruning deletes old chains and keeps recent snapshots readable.
+        """
+        for hour in range(5):
+            self.store.record(48.85, 2.35, make_run(hour))
+        self.store.record(43.3, 5.375, make_run(0))
+        old = timezone.now() - timedelta(days=40)
+        ids = list(ForecastSnapshots.objects.filter(grid_lat=48.85).order_by("id").values_list("id", flat=True))
+        ForecastSnapshots.objects.filter(id__in=ids[:4]).update(fetched_at=old)
+        ForecastSnapshots.objects.filter(grid_lat=43.3).update(fetched_at=old)
+
+        self.assertEqual(self.store.prune(retention_days=30), 4)
+        history = SnapshotStore(max_entries=10).history(48.85, 2.35)
+        self.assertEqual([forecast.hourly_dt[0] for _, forecast in history],
+                         [1735689600 + 3 * 3600, 1735689600 + 4 * 3600])
+
+    def test_stats_command(self):
+        """
+        Test that the command reports snapshots and compression.
+        """
+        self.store.record(48.85, 2.35, make_run(0))
+        out = StringIO()
+        call_command("forecast_snapshots", stdout=out)
+        self.assertIn("1 snapshots of 1 locations", out.getvalue())
+
+    def test_history_command(self):
+        """
+        Test that the command writes the forecast of each snapshot, wind in km/h.
+        """
+        self.store.record(48.85, 2.35, make_run(0))
+        out = StringIO()
+        call_command("forecast_snapshots", "--history", "48.85", "2.35", stdout=out)
+        self.assertIn("5.0 C, rain 0.0 mm, wind 10.0 km/h", out.getvalue())
+
+
+class RecordSnapshotTest(TestCase):
+    """
+    Test class for snapshots of fetched forecasts.
+    """
+
+    def setUp(self):
+        reset_weather_state(self)
+
+    @mock.patch("po_app.snapshots.snapshot_executor")
+    @mock.patch("po_app.weather.weather_client.get_forecast")
+    def test_fetch_records_snapshot(self, mock_get_forecast, mock_executor):
+        """
+        Test that fetched forecasts are stored in background only when snapshots are enabled.
+        """
+        mock_get_forecast.return_value = make_forecast()
+        fetch_forecast(48.85, 2.35)
+        mock_executor.submit.assert_not_called()
+        with override_settings(FORECAST_SNAPSHOTS=SNAPSHOTS_ENABLED):
+            fetch_forecast(48.85, 2.35)
+            self.assertEqual(ForecastSnapshots.objects.count(), 0)
+            task, *args = mock_executor.submit.call_args.args
+            with mock.patch("po_app.snapshots.close_old_connections") as mock_close_old_connections:
+                task(*args)
+        self.assertEqual(ForecastSnapshots.objects.get().grid_lat, 48.85)
+        mock_close_old_connections.assert_called_once()
+
+    @override_settings(FORECAST_SNAPSHOTS=SNAPSHOTS_ENABLED)
+    @mock.patch("po_app.weather.weather_client.get_forecast")
+    def test_miss_reads_shared_snapshot(self, mock_get_forecast):
+        """
+        Test that a cache miss uses a forecast fetched by another process within the TTL.
+        """
+        snapshot_store.record(48.85, 2.35, make_run(0))
+        ForecastSnapshots.objects.update(fetched_at=timezone.now() - timedelta(seconds=600))
+        self.assertEqual(get_forecast(48.8566, 2.3522).to_columns(), make_run(0).to_columns())
+        mock_get_forecast.assert_not_called()
+        self.assertAlmostEqual(forecast_cache.time_to_live((48.85, 2.35)), forecast_cache.ttl - 600, delta=5)
+
+        ForecastSnapshots.objects.update(fetched_at=timezone.now() - timedelta(seconds=forecast_cache.ttl + 1))
+        mock_get_forecast.return_value = make_forecast()
+        forecast_cache.clear()
+        with mock.patch("po_app.snapshots.snapshot_executor"):
+            get_forecast(48.8566, 2.3522)
+        mock_get_forecast.assert_called_once()
+
+    @override_settings(FORECAST_SNAPSHOTS=SNAPSHOTS_ENABLED, FORECAST_CACHE={"DB_LOCK": True})
+    @mock.patch("po_app.weather.weather_client.get_forecast")
+    def test_lock_waiter_gets_snapshot(self, mock_get_forecast):
+        """
+        Test that a worker getting the lock after another one fetched the cell uses its snapshot.
+        """
+        @contextmanager
+        def database_lock(name, timeout):
+            # another worker fetches the cell meanwhile
+            record_snapshot(48.85, 2.35, make_run(0))
+            yield True
+
+        with mock.patch("po_app.weather.database_lock", database_lock):
+            forecast = fetch_forecast(48.85, 2.35)
+        mock_get_forecast.assert_not_called()
+        self.assertEqual(forecast.to_columns(), make_run(0).to_columns())
+
+        mock_get_forecast.return_value = make_forecast()
+        fetch_forecast(48.85, 2.35)
+        mock_get_forecast.assert_called_once()
+
+    @override_settings(FORECAST_SNAPSHOTS=SNAPSHOTS_ENABLED)
+    def test_storage_error(self):
+        """
+        Test that a storage error does not fail the fetch.
+        """
+        with mock.patch("po_app.snapshots.snapshot_store.record", side_effect=DatabaseError("down")), \
+                self.assertLogs("po_app.snapshots", "WARNING"):
+            record_snapshot(48.85, 2.35, make_run(0))
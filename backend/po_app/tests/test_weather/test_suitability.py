@@ -0,0 +1,171 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from unittest import mock
+import numpy as np
+import os
+from ...compact_forecast import CompactForecast
+from ...models import Activities, ActivityWeatherThresholds, Users
+from ...suitability import (
+    get_activities_thresholds,
+    hourly_rate,
+    range_score,
+    score_activities,
+    score_hours,
+)
+from .test_weather_common import BaseWeatherTestCase, make_forecast
+
+
+def make_calm_forecast():
+    """
+    Build a compact forecast with strong wind except from 10h to 16h (UTC) on first day.
+    """
+    weather_data = CompactForecast.from_forecast(make_forecast())
+    wind_speed = np.full(weather_data.hourly_count, 35.0)
+    wind_speed[10:16] = 10.0
+    weather_data.hourly_wind_speed = wind_speed
+    return weather_data
+
+
+class SuitabilityTest(TestCase):
+    """
+    Test class for activity weather scoring engine.
+    """
+
+    def setUp(self):
+        self.archery = Activities.objects.create(
+            name="Archery", description="Practice accuracy by shooting arrows at targets")
+        self.kiteboarding = Activities.objects.create(
+            name="Kiteboarding", description="Taking advantage of the wind by flying colorful kites")
+
+    def test_range_score(self):
+        """
+        Test that values are scored against a range with tolerance.
+        """
+        values = np.array([0.0, 5.0, 10.0, 12.5, 20.0, np.nan])
+        self.assertEqual(range_score(values, 5, 10, 5, 0.5).tolist(), [0.0, 1.0, 1.0, 0.5, 0.0, 0.5])
+        self.assertEqual(range_score(values, None, None, 5, 0.5).tolist(), [1.0] * 6)
+
+    def test_hourly_rate(self):
+        """
+        Test that 3h and 6h values are spread over their hours where 1h values are missing.
+        """
+        rate = hourly_rate(
+            np.array([0.5, np.nan, np.nan, np.nan]),
+            np.array([np.nan, 3.0, np.nan, np.nan]),
+            np.array([np.nan, np.nan, 6.0, np.nan]),
+        )
+        self.assertEqual(rate[:3].tolist(), [0.5, 1.0, 1.0])
+        self.assertTrue(np.isnan(rate[3]))
+
+    def test_rain_snow_and_missing_values(self):
+        """
+        Test that rain of further steps and snow are scored, missing rain is penalised.
+        """
+        weather_data = make_calm_forecast()
+        thresholds = get_activities_thresholds([self.archery])[self.archery.id]
+        weather_data.hourly_rain_1h[11:13] = np.nan
+        weather_data.hourly_rain_3h[11] = 6.0
+        weather_data.hourly_snow_1h[13] = 2.0
+        scores = score_hours(weather_data, thresholds, missing_score=0.5)
+        self.assertEqual(scores[[10, 11, 12, 13]].tolist(), [1.0, 0.0, 0.5, 0.0])
+
+    def test_best_window(self):
+        """
+        Test that the calm daylight hours are the best window for archery.
+        """
+        result = score_activities(make_calm_forecast(), [self.archery])[0]
+        self.assertEqual(result["activity_id"], self.archery.id)
+        self.assertEqual(result["windows"], [{
+            "start": "2025-01-01T11:00:00+01:00",
+            "end": "2025-01-01T17:00:00+01:00",
+            "hours": 6,
+            "score": 1.0,
+        }])
+
+    def test_wind_activity(self):
+        """
+        Test that windy daylight hours suit kiteboarding, calm hours and nights don't.
+        """
+        weather_data = make_calm_forecast()
+        thresholds = get_activities_thresholds([self.kiteboarding])[self.kiteboarding.id]
+        scores = score_hours(weather_data, thresholds)
+        self.assertEqual(scores[9], 1.0)
+        self.assertEqual(scores[12], 0.0)
+        self.assertEqual(scores[2], 0.0)
+        windows = score_activities(weather_data, [self.kiteboarding])[0]["windows"]
+        self.assertEqual(len(windows), 5)
+        self.assertTrue(all(window["score"] >= 0.6 for window in windows))
+
+    def test_stored_thresholds(self):
+        """
+        Test that stored thresholds override catalog defaults.
+        """
+        ActivityWeatherThresholds.objects.create(
+            activity=self.archery, wind_max=50, daylight_only=False, min_duration=24)
+        thresholds = get_activities_thresholds([self.archery])[self.archery.id]
+        self.assertEqual(thresholds["wind_max"], 50)
+        self.assertIsNone(thresholds["temp_min"])
+        windows = score_activities(make_calm_forecast(), [self.archery])[0]["windows"]
+        self.assertEqual(windows[0]["hours"], 360)
+
+
+class ActivityWeatherViewTest(BaseWeatherTestCase):
+    """
+    Test class for activity weather view.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.auth_user = Users.objects.create_user(
+            username="test_auth_user",
+            email="test_auth_user@example.com",
+            password=os.environ.get("VALID_PASSWORD"),
+            location={
+                "name": "London",
+                "lat": 51.5073219,
+                "lon": -0.1276474,
+                "country": "GB",
+            },
+        )
+        self.hiking = Activities.objects.create(
+            name="Hiking", description="Explore nature and discover natural trails")
+        self.ski = Activities.objects.create(
+            name="Ski", description="Explore ski slopes or wild mountains")
+        self.url = reverse("activity-weather", kwargs={"lat": "48.8566", "lon": "2.3522"})
+
+    def test_unauthenticated(self):
+        """
+        Test that unauthenticated users can't score activities.
+        """
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @mock.patch("po_app.weather.weather_client")
+    def test_all_activities(self, mock_client):
+        """
+        Test that all activities are scored with one upstream call.
+        """
+        mock_client.get_forecast.return_value = make_forecast()
+        self.client.force_authenticate(user=self.auth_user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["activity"] for item in response.data["data"]], ["Hiking", "Ski"])
+        self.assertTrue(response.data["data"][0]["windows"])
+        self.assertTrue(all(window["score"] >= 0.6 for window in response.data["data"][1]["windows"]))
+        mock_client.get_forecast.assert_called_once()
+
+    @mock.patch("po_app.weather.weather_client")
+    def test_one_activity(self, mock_client):
+        """
+        Test activity query parameter.
+        """
+        mock_client.get_forecast.return_value = make_forecast()
+        self.client.force_authenticate(user=self.auth_user)
+        response = self.client.get(self.url, {"activity": self.ski.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["data"]), 1)
+        response = self.client.get(self.url, {"activity": "ski"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {"activity": 999})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
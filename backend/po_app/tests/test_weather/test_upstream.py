@@ -0,0 +1,117 @@
+from django.test import SimpleTestCase
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from meteofrance_api.session import MeteoFranceSession
+from unittest import mock
+import requests
+import threading
+from ...upstream import JitterRetry, PooledMeteoFranceClient, UpstreamClient
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """
+    Answer 503 to the first requests, then 200.
+    """
+
+    def do_GET(self):
+        server = self.server
+        server.requests += 1
+        if server.requests <= server.failures:
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class UpstreamClientTest(SimpleTestCase):
+    """
+    Test class for pooled upstream HTTP clients.
+    """
+
+    def start_server(self, failures):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), FlakyHandler)
+        server.requests = 0
+        server.failures = failures
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server, f"http://127.0.0.1:{server.server_port}/"
+
+    def test_retries_with_jitter(self):
+        """
+        Test that GET is retried on 503 and succeeds.
+        """
+        server, url = self.start_server(failures=2)
+        client = UpstreamClient("test", BACKOFF_FACTOR=0, MAX_RETRIES=2)
+        self.addCleanup(client.close)
+        api_response = client.get(url)
+        self.assertEqual(api_response.status_code, 200)
+        self.assertEqual(api_response.json(), {"ok": True})
+        self.assertEqual(server.requests, 3)
+
+    def test_retries_are_bounded(self):
+        """
+        Test that retries stop after MAX_RETRIES and return the last response.
+        """
+        server, url = self.start_server(failures=5)
+        client = UpstreamClient("test", BACKOFF_FACTOR=0, MAX_RETRIES=1)
+        self.addCleanup(client.close)
+        self.assertEqual(client.get(url).status_code, 503)
+        self.assertEqual(server.requests, 2)
+
+    def test_default_timeout(self):
+        """
+        Test that requests get connect and read timeouts by default.
+        """
+        client = UpstreamClient("test", CONNECT_TIMEOUT=1, READ_TIMEOUT=4)
+        with mock.patch("requests.adapters.HTTPAdapter.send",
+                        side_effect=requests.exceptions.ConnectionError) as mock_send:
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                client.get("http://upstream.test/")
+        self.assertEqual(mock_send.call_args.kwargs["timeout"], (1, 4))
+
+    def test_thread_local_sessions_share_pool(self):
+        """
+        Test that each thread gets its own session on the shared pool.
+        """
+        client = UpstreamClient("test", session_class=MeteoFranceSession)
+        sessions = []
+        thread = threading.Thread(target=lambda: sessions.append(client.session))
+        thread.start()
+        thread.join()
+        self.assertIs(client.session, client.session)
+        self.assertIsNot(client.session, sessions[0])
+        self.assertIs(sessions[0].get_adapter("https://"), client.adapter)
+        self.assertIsInstance(
+            PooledMeteoFranceClient(client).session, MeteoFranceSession)
+
+    def test_jitter_backoff(self):
+        """
+        Test that backoff time is random and capped.
+        """
+        retry = JitterRetry(total=10, backoff_factor=1, backoff_max=2)
+        for _ in range(5):
+            retry = retry.increment(method="GET", url="/")
+        self.assertEqual(retry.backoff_max, 2)
+        for _ in range(20):
+            self.assertTrue(0 <= retry.get_backoff_time() <= 2)
+
+    def test_meteofrance_host(self):
+        """
+        Test that Meteofrance requests are sent to the configured host.
+        """
+        server, url = self.start_server(failures=0)
+        client = UpstreamClient("test", session_class=MeteoFranceSession, host=url.rstrip("/"))
+        self.addCleanup(client.close)
+        api_response = PooledMeteoFranceClient(client).session.request("get", "forecast")
+        self.assertEqual(api_response.json(), {"ok": True})
+        self.assertEqual(server.requests, 1)
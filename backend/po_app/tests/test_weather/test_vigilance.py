@@ -0,0 +1,199 @@
+from django.conf import settings
+from django.core import mail
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from meteofrance_api.model import CurrentPhenomenons
+import os
+from ...models import (
+    Users,
+    Activities,
+    PlannedActivities,
+    LocationDepartments,
+    WeatherWarningNotifications,
+)
+from ...vigilance import fan_out_weather_warnings, get_location_departments
+from .test_weather_common import BaseWeatherTestCase, make_forecast
+
+TEMPLATES = [{
+    "BACKEND": "django.template.backends.django.DjangoTemplates",
+    "DIRS": [settings.BASE_DIR / "planner_outdoor" / "templates"],
+}]
+
+
+def make_phenomenons(department, colors):
+    """
+    Build a Meteofrance current phenomenons instance, colors by phenomenon id.
+    """
+    return CurrentPhenomenons({
+        "update_time": 1735686000,
+        "end_validity_time": 1735772400,
+        "domain_id": department,
+        "phenomenons_max_colors": [
+            {"phenomenon_id": phenomenon_id, "phenomenon_max_color_id": color}
+            for phenomenon_id, color in colors.items()
+        ],
+    })
+
+
+@override_settings(
+    TEMPLATES=TEMPLATES,
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+)
+class WeatherWarningsFanOutTest(BaseWeatherTestCase):
+    """
+    Test class for the weather warnings fan-out.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.activity = Activities.objects.create(
+            name="testactivity",
+            description="test activity description",
+        )
+        now = timezone.now()
+        paris_1 = {"name": "Paris", "lat": 48.8566, "lon": 2.3522, "country": "FR"}
+        paris_2 = {"name": "Paris", "lat": 48.8601, "lon": 2.3489, "country": "FR"}
+        lyon = {"name": "Lyon", "lat": 45.764, "lon": 4.8357, "country": "FR"}
+        users = []
+        for index in range(3):
+            users.append(Users.objects.create_user(
+                username=f"test_user_{index}",
+                email=f"test_user_{index}@example.com",
+                password=os.environ.get("VALID_PASSWORD"),
+                location=paris_1,
+            ))
+        for user, location, start in [
+            (users[0], paris_1, now + timedelta(hours=2)),
+            (users[0], lyon, now + timedelta(hours=5)),
+            (users[1], paris_2, now + timedelta(hours=10)),
+            (users[2], lyon, now + timedelta(hours=20)),
+            # out of horizon planned activity is ignored
+            (users[2], paris_1, now + timedelta(days=10)),
+        ]:
+            PlannedActivities.objects.create(
+                user=user,
+                activity=self.activity,
+                location=location,
+                start_datetime=start,
+                end_datetime=start + timedelta(hours=2),
+            )
+        LocationDepartments.objects.create(grid_lat=48.85, grid_lon=2.35, department="75")
+        LocationDepartments.objects.create(grid_lat=45.775, grid_lon=4.825, department="69")
+
+    @mock.patch("po_app.vigilance.weather_client")
+    def test_one_upstream_call_per_department(self, mock_client):
+        """
+        Test that warnings are fetched once per department and users
+        get one email for all their affected planned activities.
+        """
+        mock_client.get_warning_current_phenomenoms.side_effect = lambda department, **kwargs: {
+            "75": make_phenomenons("75", {"1": 3, "2": 1}),
+            "69": make_phenomenons("69", {"3": 4}),
+        }[department]
+        report = fan_out_weather_warnings()
+        self.assertEqual(report, {
+            "planned_activities": 4,
+            "departments": 2,
+            "upstream_calls": 2,
+            "errors": 0,
+            "warnings": 2,
+            "notifications": 4,
+            "users": 3,
+            "emails": 3,
+        })
+        self.assertEqual(mock_client.get_warning_current_phenomenoms.call_count, 2)
+        self.assertEqual(len(mail.outbox), 3)
+        email = next(email for email in mail.outbox if email.to == ["test_user_0@example.com"])
+        self.assertIn("Wind: Orange", email.body)
+        self.assertIn("Thunderstorms: Red", email.body)
+        self.assertNotIn("Rain-Flood", email.body)
+        self.assertEqual(WeatherWarningNotifications.objects.count(), 4)
+
+    @mock.patch("po_app.vigilance.weather_client")
+    def test_warnings_notified_once(self, mock_client):
+        """
+        Test that a warning is notified again only at a higher level.
+        """
+        mock_client.get_warning_current_phenomenoms.side_effect = lambda department, **kwargs: \
+            make_phenomenons(department, {"1": 3})
+        fan_out_weather_warnings()
+        report = fan_out_weather_warnings()
+        self.assertEqual(report["notifications"], 0)
+        self.assertEqual(report["emails"], 0)
+        self.assertEqual(len(mail.outbox), 3)
+
+        mock_client.get_warning_current_phenomenoms.side_effect = lambda department, **kwargs: \
+            make_phenomenons(department, {"1": 4})
+        report = fan_out_weather_warnings()
+        self.assertEqual(report["notifications"], 4)
+        self.assertEqual(len(mail.outbox), 6)
+
+    @mock.patch("po_app.vigilance.weather_client")
+    def test_emails_sent_in_batches(self, mock_client):
+        """
+        Test that emails are sent in batches over one connection.
+        """
+        mock_client.get_warning_current_phenomenoms.side_effect = lambda department, **kwargs: \
+            make_phenomenons(department, {"1": 3})
+        with override_settings(WEATHER_WARNINGS={"BATCH_SIZE": 2}), \
+                mock.patch("django.core.mail.backends.locmem.EmailBackend.send_messages",
+                           autospec=True, side_effect=lambda backend, messages: len(messages)) as send:
+            report = fan_out_weather_warnings()
+        self.assertEqual(report["emails"], 3)
+        self.assertEqual([len(call.args[1]) for call in send.call_args_list], [2, 1])
+
+    @mock.patch("po_app.vigilance.weather_client")
+    def test_department_error(self, mock_client):
+        """
+        Test that a failing department does not stop the others.
+        """
+        def get_warnings(department, **kwargs):
+            if department == "69":
+                raise ValueError("upstream error")
+            return make_phenomenons(department, {"1": 3})
+
+        mock_client.get_warning_current_phenomenoms.side_effect = get_warnings
+        report = fan_out_weather_warnings()
+        self.assertEqual(report["errors"], 1)
+        self.assertEqual(report["notifications"], 2)
+        self.assertEqual(report["users"], 2)
+
+    @mock.patch("po_app.weather.weather_client")
+    def test_location_index(self, mock_client):
+        """
+        Test that missing grid cells are resolved from their forecast once.
+        """
+        mock_client.get_forecast.return_value = make_forecast()
+        departments = get_location_departments([(48.85, 2.35), (43.7, 7.25)])
+        self.assertEqual(departments, {(48.85, 2.35): "75", (43.7, 7.25): "75"})
+        self.assertEqual(mock_client.get_forecast.call_count, 1)
+        get_location_departments([(43.7, 7.25)])
+        self.assertEqual(mock_client.get_forecast.call_count, 1)
+        self.assertTrue(LocationDepartments.objects.filter(grid_lat=43.7, grid_lon=7.25).exists())
+
+    @mock.patch("po_app.weather.weather_client")
+    def test_location_without_warnings(self, mock_client):
+        """
+        Test that locations outside metropolitan France have no department.
+        """
+        forecast = make_forecast()
+        forecast.position["dept"] = ""
+        mock_client.get_forecast.return_value = forecast
+        self.assertEqual(get_location_departments([(51.5, -0.125)]), {(51.5, -0.125): ""})
+
+    @mock.patch("po_app.vigilance.weather_client")
+    def test_notify_command(self, mock_client):
+        """
+        Test notify_weather_warnings command output, without emails on dry run.
+        """
+        mock_client.get_warning_current_phenomenoms.side_effect = lambda department, **kwargs: \
+            make_phenomenons(department, {"1": 2})
+        out = StringIO()
+        call_command("notify_weather_warnings", "--min-color", "2", "--dry-run", stdout=out)
+        self.assertIn("4 planned activities in 2 departments: 2 upstream calls", out.getvalue())
+        self.assertIn("4 notifications for 3 users, 0 emails sent", out.getvalue())
+        self.assertEqual(len(mail.outbox), 0)
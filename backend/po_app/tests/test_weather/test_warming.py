@@ -0,0 +1,226 @@
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import DatabaseError
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.utils import timezone
+from io import StringIO
+from rest_framework import status
+from unittest import mock
+import os
+from ...circuit_breaker import CircuitOpenError
+from ...compact_forecast import CompactForecast
+from ...forecast_cache import forecast_cache, snap_to_grid
+from ...lanes import background_lane, current_lane
+from ...models import ForecastSnapshots, LocationRequests, Users
+from ...popularity import (
+    LocationPopularity,
+    flush_request_counts,
+    get_shared_request_counts,
+    location_popularity,
+)
+from ...snapshots import snapshot_store
+from ...warming import get_request_counts, rank_locations, seconds_until_next_run, warm_popular_forecasts
+from ...weather import get_forecast
+from .test_forecast_cache import FakeClock
+from .test_weather_common import BaseWeatherTestCase, make_forecast
+
+
+class LocationPopularityTest(SimpleTestCase):
+    """
+    Test class for requests count by location.
+    """
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.popularity = LocationPopularity(window_hours=2, clock=self.clock)
+
+    def test_window(self):
+        """
+        Test that requests are counted over the last window_hours.
+        """
+        self.popularity.record("paris")
+        self.clock.now = 3600
+        self.popularity.record("paris")
+        self.popularity.record("lyon")
+        self.assertEqual(self.popularity.counts(), {"paris": 2, "lyon": 1})
+        self.clock.now = 7200
+        self.assertEqual(self.popularity.counts(), {"paris": 1, "lyon": 1})
+        self.clock.now = 3 * 3600
+        self.assertEqual(self.popularity.counts(), {})
+
+    def test_misses_avoided(self):
+        """
+        Test that the first request of a warmed location within its TTL is a miss avoided.
+        """
+        self.popularity.mark_warmed(["paris", "lyon"], ttl=900, report={})
+        self.popularity.record("paris")
+        self.popularity.record("paris")
+        self.clock.now = 1000
+        self.popularity.record("lyon")
+        self.assertEqual(self.popularity.stats()["misses_avoided"], 1)
+
+    def test_schedule(self):
+        """
+        Test seconds until the next scheduled run, tomorrow once today times passed.
+        """
+        now = datetime(2025, 1, 1, 7, 0, tzinfo=dt_timezone.utc)
+        self.assertEqual(seconds_until_next_run(["06:30", "16:30"], now), 9.5 * 3600)
+        self.assertEqual(seconds_until_next_run(["06:30"], now), 23.5 * 3600)
+
+
+class CacheWarmingTest(BaseWeatherTestCase):
+    """
+    Test class for popular locations cache warming.
+    """
+
+    def setUp(self):
+        super().setUp()
+        for index, location in enumerate([(48.85, 2.35), (48.851, 2.351), (48.849, 2.349), (43.3, 5.375)]):
+            Users.objects.create_user(
+                username=f"test_user_{index}",
+                email=f"test_user_{index}@example.com",
+                password=os.environ.get("VALID_PASSWORD"),
+                location={"name": "Home", "lat": location[0], "lon": location[1], "country": "FR"},
+            )
+        for _ in range(5):
+            location_popularity.record((45.75, 4.85))
+        location_popularity.record((43.3, 5.375))
+        self.forecast = CompactForecast.from_forecast(make_forecast())
+
+    def test_rank_locations(self):
+        """
+        Test that locations are ranked by requests and users living there.
+        """
+        self.assertEqual(
+            rank_locations(2, location_popularity.counts()),
+            [(45.75, 4.85), (48.85, 2.35)])
+
+    @mock.patch("po_app.warming.fetch_forecast")
+    def test_warm_within_budget(self, mock_fetch_forecast):
+        """
+        Test that the most popular locations are fetched in the background lane, within budget.
+        """
+        lanes = []
+        mock_fetch_forecast.side_effect = lambda *args: lanes.append(current_lane().name) or self.forecast
+        forecast_cache.set((43.3, 5.375), self.forecast)
+
+        report = warm_popular_forecasts(top_n=10, budget=1)
+        self.assertEqual(report["locations"], 3)
+        self.assertEqual(report["already_cached"], 1)
+        self.assertEqual(report["upstream_calls"], 1)
+        self.assertEqual(report["over_budget"], 1)
+        self.assertEqual(lanes, ["background"])
+        self.assertEqual(report["hit_rate_before"], round(1 / 6, 4))
+        self.assertEqual(report["hit_rate_after"], 1.0)
+        self.assertIsNotNone(forecast_cache.get((45.75, 4.85)))
+
+        get_forecast(45.75, 4.85)
+        self.assertEqual(location_popularity.stats()["misses_avoided"], 1)
+
+    @override_settings(FORECAST_SNAPSHOTS={"ENABLED": True})
+    @mock.patch("po_app.weather.fetch_forecast")
+    def test_shared_popularity(self, mock_fetch_forecast):
+        """
+        Test that with snapshots, requests of all processes are counted, not forecasts fetched.
+        """
+        mock_fetch_forecast.return_value = self.forecast
+        location_popularity.reset()
+        for _ in range(50):
+            get_forecast(44.8378, -0.5792)
+        # fetched by a background job, never requested
+        snapshot_store.record(47.2184, -1.5536, self.forecast)
+        other_process = LocationPopularity(window_hours=24)
+        other_process.record((45.75, 4.85))
+        other_process.record((45.75, 4.85))
+        self.assertEqual(flush_request_counts(other_process), 2)
+
+        counts = {snap_to_grid(44.8378, -0.5792): 50, (45.75, 4.85): 2}
+        self.assertEqual(get_request_counts(), counts)
+        self.assertEqual(mock_fetch_forecast.call_count, 1)
+        # requests are flushed once
+        self.assertEqual(get_request_counts(), counts)
+
+    def test_flush_window(self):
+        """
+        Test that flushed hours out of the window are deleted, and counts are kept back if flush fails.
+        """
+        clock = FakeClock()
+        popularity = LocationPopularity(window_hours=2, clock=clock)
+        popularity.record((45.75, 4.85))
+        flush_request_counts(popularity)
+        clock.now = 3 * 3600
+        popularity.record((43.3, 5.375))
+        with mock.patch("po_app.popularity.add_request_counts", side_effect=DatabaseError("down")):
+            with self.assertRaises(DatabaseError):
+                flush_request_counts(popularity)
+        popularity.record((43.3, 5.375))
+        self.assertEqual(flush_request_counts(popularity), 2)
+        self.assertEqual(LocationRequests.objects.count(), 1)
+        self.assertEqual(get_shared_request_counts(popularity), {(43.3, 5.375): 2})
+
+    @mock.patch("po_app.snapshots.snapshot_executor")
+    @mock.patch("po_app.warming.fetch_forecast")
+    def test_warm_command(self, mock_fetch_forecast, mock_executor):
+        """
+        Test that the command skips forecasts fresh in snapshots and ranks locations by shared requests.
+        """
+        mock_fetch_forecast.return_value = self.forecast
+        location_popularity.reset()
+        location_popularity.record((45.75, 4.85))
+        out = StringIO()
+        with self.assertRaises(CommandError):
+            call_command("warm_popular_forecasts", stdout=out)
+        with override_settings(FORECAST_SNAPSHOTS={"ENABLED": True}):
+            snapshot_store.record(43.3, 5.375, self.forecast)
+            snapshot_store.record(45.75, 4.85, self.forecast)
+            ForecastSnapshots.objects.filter(grid_lat=45.75).update(fetched_at=timezone.now() - timedelta(hours=12))
+            call_command("warm_popular_forecasts", stdout=out)
+        self.assertIn("3 popular locations: 2 upstream calls, 1 already cached", out.getvalue())
+        self.assertEqual(
+            sorted(call.args for call in mock_fetch_forecast.call_args_list),
+            [(45.75, 4.85), (48.85, 2.35)])
+        # pending snapshots waited for
+        mock_executor.submit.assert_called_once()
+
+    @mock.patch("po_app.warming.fetch_forecast", side_effect=CircuitOpenError("Meteofrance"))
+    def test_stop_when_refused(self, mock_fetch_forecast):
+        """
+        Test that warming stops when the provider refuses calls.
+        """
+        report = warm_popular_forecasts(top_n=10)
+        self.assertEqual(mock_fetch_forecast.call_count, 1)
+        self.assertEqual(report["errors"], 1)
+        self.assertEqual(report["over_budget"], 2)
+
+    @mock.patch("po_app.weather.fetch_forecast")
+    def test_only_user_requests_counted(self, mock_fetch_forecast):
+        """
+        Test that forecasts of background jobs are not counted as requests.
+        """
+        mock_fetch_forecast.return_value = self.forecast
+        location_popularity.reset()
+        get_forecast(44.8378, -0.5792)
+        with background_lane():
+            get_forecast(47.2184, -1.5536)
+        self.assertEqual(len(location_popularity.counts()), 1)
+
+    def test_stats_view(self):
+        """
+        Test that staff users get the last warming report with cache counters.
+        """
+        with mock.patch("po_app.warming.fetch_forecast", return_value=self.forecast):
+            warm_popular_forecasts(top_n=10)
+        staff_user = Users.objects.create_user(
+            username="test_staff_user",
+            email="test_staff_user@example.com",
+            password=os.environ.get("VALID_PASSWORD"),
+            location={"name": "London", "lat": 51.5073219, "lon": -0.1276474, "country": "GB"},
+            is_staff=True,
+        )
+        self.client.force_authenticate(user=staff_user)
+        response = self.client.get(reverse("weather-cache-stats"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["popularity"]["requests"], 6)
+        self.assertEqual(response.data["popularity"]["last_warming"]["upstream_calls"], 3)
@@ -0,0 +1,99 @@
+from django.urls import reverse
+from rest_framework import status
+from unittest import mock
+import os
+from ...models import Users
+from .test_weather_common import BaseWeatherTestCase, make_forecast
+
+
+class WeatherBatchViewTest(BaseWeatherTestCase):
+    """
+    Test class for weather batch view.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.auth_user = Users.objects.create_user(
+            username="test_auth_user",
+            email="test_auth_user@example.com",
+            password=os.environ.get("VALID_PASSWORD"),
+            location={
+                "name": "London",
+                "lat": 51.5073219,
+                "lon": -0.1276474,
+                "country": "GB",
+            },
+        )
+        self.url = reverse("weather-batch")
+
+    def test_batch_unauthenticated(self):
+        """
+        Test that unauthenticated users can't access weather batch.
+        """
+        response = self.client.post(
+            self.url, {"locations": [{"lat": 48.85, "lon": 2.35}]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @mock.patch("po_app.weather.weather_client")
+    def test_batch_removes_duplicates(self, mock_client):
+        """
+        Test that locations in the same grid cell are fetched once.
+        """
+        mock_client.get_forecast.return_value = make_forecast()
+        self.client.force_authenticate(user=self.auth_user)
+        response = self.client.post(self.url, {"locations": [
+            {"lat": 48.8566, "lon": 2.3522},
+            {"lat": 48.8601, "lon": 2.3489},
+            {"lat": 45.764, "lon": 4.8357},
+        ]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["data"]), 3)
+        self.assertEqual(response.data["data"][0]["lat"], 48.8566)
+        self.assertEqual(len(response.data["data"][0]["data"]), 15)
+        self.assertEqual(mock_client.get_forecast.call_count, 2)
+
+    @mock.patch("po_app.weather.close_old_connections")
+    @mock.patch("po_app.weather.weather_client")
+    def test_batch_closes_connections(self, mock_client, mock_close_old_connections):
+        """
+        Test that executor threads close their database connection after each location.
+        """
+        mock_client.get_forecast.return_value = make_forecast()
+        self.client.force_authenticate(user=self.auth_user)
+        self.client.post(self.url, {"locations": [
+            {"lat": 48.8566, "lon": 2.3522},
+            {"lat": 45.764, "lon": 4.8357},
+        ]}, format="json")
+        self.assertEqual(mock_close_old_connections.call_count, 2)
+
+    @mock.patch("po_app.weather.weather_client")
+    def test_batch_error_per_item(self, mock_client):
+        """
+        Test that a failed location returns its own error.
+        """
+        def get_forecast(latitude, longitude, language):
+            if latitude == 45.775:
+                raise ValueError("upstream error")
+            return make_forecast()
+
+        mock_client.get_forecast.side_effect = get_forecast
+        self.client.force_authenticate(user=self.auth_user)
+        response = self.client.post(self.url, {"locations": [
+            {"lat": 48.8566, "lon": 2.3522},
+            {"lat": 45.764, "lon": 4.8357},
+        ]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("data", response.data["data"][0])
+        self.assertEqual(response.data["data"][1]["error"], "upstream error")
+
+    def test_batch_invalid_locations(self):
+        """
+        Test that invalid coordinates are rejected.
+        """
+        self.client.force_authenticate(user=self.auth_user)
+        response = self.client.post(self.url, {"locations": [
+            {"lat": 148.85, "lon": 2.35}]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(
+            self.url, {"locations": []}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
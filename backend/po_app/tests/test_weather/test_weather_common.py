@@ -0,0 +1,89 @@
+from rest_framework.test import APITestCase
+from meteofrance_api.model import Forecast
+from ...forecast_cache import forecast_cache
+from ...circuit_breaker import meteofrance_breaker, openweathermap_breaker
+from ...gazetteer import reset_gazetteer
+from ...popularity import location_popularity
+from ...quota import upstream_ledger
+
+
+def make_forecast_data(start_dt=1735689600, days=15, updated_on=1735686000):
+    """
+    Build raw data shaped like a Meteofrance forecast API response.
+    """
+    daily_forecast = []
+    for day in range(days):
+        dt = start_dt + day * 86400
+        daily_forecast.append(
+            {
+                "dt": dt,
+                "T": {"min": 2.0 + day, "max": 10.0 + day, "sea": None},
+                "humidity": {"min": 40 + day, "max": 80 + day},
+                "precipitation": {"24h": 0.5 * day},
+                "uv": 2,
+                "weather12H": {"icon": "p2j", "desc": "Sunny"},
+                "sun": {"rise": dt + 28800, "set": dt + 61200},
+            }
+        )
+    forecast = []
+    for hour in range(days * 24):
+        forecast.append(
+            {
+                "dt": start_dt + hour * 3600,
+                "T": {"value": 5.0 + hour % 10, "windchill": 3.0},
+                "humidity": 70,
+                "sea_level": 1015.5,
+                "wind": {"speed": 10 + hour % 20, "gust": 0, "direction": 90, "icon": "E"},
+                "rain": {"1h": 0.2 * (hour % 3)},
+                "snow": {"1h": 0},
+                "iso0": 1500 + hour,
+                "rain snow limit": "Non pertinent",
+                "clouds": 30,
+                "weather": {"icon": "p2j", "desc": "Sunny"},
+            }
+        )
+    return {
+        "position": {
+            "lat": 48.85,
+            "lon": 2.35,
+            "alti": 35,
+            "name": "Paris",
+            "country": "FR - France",
+            "dept": "75",
+            "timezone": "Europe/Paris",
+        },
+        "updated_on": updated_on,
+        "daily_forecast": daily_forecast,
+        "forecast": forecast,
+        "probability_forecast": [],
+    }
+
+
+def make_forecast(**kwargs):
+    """
+    Build a Meteofrance Forecast instance with fake data.
+    """
+    return Forecast(make_forecast_data(**kwargs))
+
+
+def reset_weather_state(test_case):
+    """
+    Clear shared forecast cache, gazetteer index, upstream ledger and locations popularity,
+    close circuit breakers before and after a test.
+    """
+    for reset in [forecast_cache.clear, meteofrance_breaker.reset, openweathermap_breaker.reset,
+                  reset_gazetteer, upstream_ledger.reset, location_popularity.reset]:
+        reset()
+        test_case.addCleanup(reset)
+
+
+class BaseWeatherTestCase(APITestCase):
+    """
+    Base class for weather tests, start each test with an empty cache.
+    """
+
+    def setUp(self):
+        """
+        Reset shared weather state.
+        """
+        reset_weather_state(self)
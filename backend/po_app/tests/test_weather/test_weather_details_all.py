@@ -0,0 +1,83 @@
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework import status
+from unittest import mock
+from ...weather import parse_days
+from .test_weather_common import BaseWeatherTestCase, make_forecast
+
+
+class ParseDaysTest(SimpleTestCase):
+    """
+    Test class for days selection parsing.
+    """
+
+    def test_all_days(self):
+        """
+        Test that an empty selection returns all days.
+        """
+        self.assertEqual(parse_days(None, 15), list(range(15)))
+
+    def test_range_and_list(self):
+        """
+        Test ranges and lists selections.
+        """
+        self.assertEqual(parse_days("0-4", 15), [0, 1, 2, 3, 4])
+        self.assertEqual(parse_days("5,1,2-3", 15), [1, 2, 3, 5])
+
+    def test_invalid_selection(self):
+        """
+        Test that invalid selections raise ValueError.
+        """
+        for days in ["a", "-1", "4-0", "0-15", "3-", ",", "a-b", "1-2-3", "1,4-0", "0-20000000"]:
+            with self.assertRaisesMessage(ValueError, "Invalid days selection."):
+                parse_days(days, 15)
+
+
+class WeatherDetailsAllDaysViewTest(BaseWeatherTestCase):
+    """
+    Test class for weather details of several days.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("weather-details-all",
+                           kwargs={"lat": "48.8566", "lon": "2.3522"})
+
+    @mock.patch("po_app.weather.weather_client")
+    def test_all_days_single_upstream_call(self, mock_client):
+        """
+        Test that details of all days come from one upstream call.
+        """
+        mock_client.get_forecast.return_value = make_forecast()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["data"]), 15)
+        self.assertEqual(
+            [day["day_id"] for day in response.data["data"]], list(range(15)))
+        mock_client.get_forecast.assert_called_once()
+
+    @mock.patch("po_app.weather.weather_client")
+    def test_days_subset_matches_single_day(self, mock_client):
+        """
+        Test that a subset of days matches single day details.
+        """
+        mock_client.get_forecast.return_value = make_forecast()
+        response = self.client.get(self.url, {"days": "0-4"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["data"]), 5)
+        single_day = self.client.get(reverse("weather-details", kwargs={
+            "lat": "48.8566", "lon": "2.3522", "day_id": 3}))
+        self.assertEqual(
+            {"day_id": 3, **single_day.data["data"]}, response.data["data"][3])
+
+    @mock.patch("po_app.weather.weather_client")
+    def test_invalid_days(self, mock_client):
+        """
+        Test that an invalid days selection returns 400.
+        """
+        mock_client.get_forecast.return_value = make_forecast()
+        response = self.client.get(self.url, {"days": "0-20"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {"days": "a-b"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {"error": "Invalid days selection."})
@@ -0,0 +1,84 @@
+from django.urls import reverse
+from rest_framework import status
+from unittest import mock
+import json
+from ...renderers import OrjsonRenderer
+from .test_weather_common import BaseWeatherTestCase, make_forecast
+
+
+class WeatherHourlyViewTest(BaseWeatherTestCase):
+    """
+    Test class for hourly weather view.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("weather-hourly", kwargs={"lat": "48.8566", "lon": "2.3522"})
+
+    def get_json(self, params=None):
+        response = self.client.get(self.url, params or {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return json.loads(b"".join(response.streaming_content))
+
+    @mock.patch("po_app.weather.weather_client")
+    def test_pages(self, mock_client):
+        """
+        Test that hours are paged, from one upstream call.
+        """
+        mock_client.get_forecast.return_value = make_forecast()
+        data = self.get_json({"page_size": 30})
+        self.assertEqual(data["count"], 360)
+        self.assertEqual(len(data["data"]), 30)
+        self.assertIsNone(data["previous"])
+        self.assertIn("page=2", data["next"])
+        item = data["data"][0]
+        self.assertEqual(item["dt"], 1735689600)
+        self.assertEqual(item["datetime"], "2025-01-01T01:00:00+01:00")
+        self.assertEqual(item["temperature"], {"C": 5.0, "F": 41.0})
+        self.assertEqual(item["wind"], {"speed_kmh": 10, "speed_mph": 6.21, "gust_kmh": 0, "direction": "E"})
+        self.assertEqual(item["rain"], {"1h": 0.0, "3h": None, "6h": None})
+        last_page = self.get_json({"page_size": 30, "page": 12})
+        self.assertEqual(last_page["data"][-1]["dt"], 1735689600 + 359 * 3600)
+        self.assertIsNone(last_page["next"])
+        mock_client.get_forecast.assert_called_once()
+
+    @mock.patch("po_app.weather.weather_client")
+    def test_same_output_as_renderer(self, mock_client):
+        """
+        Test that streamed chunks join into the output of the API renderer.
+        """
+        mock_client.get_forecast.return_value = make_forecast()
+        response = self.client.get(self.url, {"page_size": 30})
+        content = b"".join(response.streaming_content)
+        self.assertEqual(content, OrjsonRenderer().render(json.loads(content)))
+
+    @mock.patch("po_app.weather.weather_client")
+    def test_time_range_and_fields(self, mock_client):
+        """
+        Test time range and fields selection.
+        """
+        mock_client.get_forecast.return_value = make_forecast()
+        data = self.get_json({
+            "start": "2025-01-02T00:00:00Z",
+            "end": "2025-01-02T06:00:00Z",
+            "fields": "temperature,iso0",
+        })
+        self.assertEqual(data["count"], 6)
+        self.assertEqual([item["dt"] for item in data["data"]],
+                         [1735776000 + hour * 3600 for hour in range(6)])
+        self.assertEqual(set(data["data"][0]), {"dt", "datetime", "temperature", "iso0"})
+        self.assertEqual(data["data"][0]["iso0"], {"meters": 1524, "feet": 5000.0})
+
+    @mock.patch("po_app.weather.weather_client")
+    def test_invalid_query(self, mock_client):
+        """
+        Test that invalid query parameters return 400, invalid page 404.
+        """
+        mock_client.get_forecast.return_value = make_forecast()
+        for params in [{"fields": "temperature,pressure"}, {"page_size": 1000}, {"page": 0},
+                       {"start": "2025-01-02T00:00:00Z", "end": "2025-01-01T00:00:00Z"}]:
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {"page": 100})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
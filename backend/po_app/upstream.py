@@ -0,0 +1,186 @@
+from django.conf import settings
+from meteofrance_api import MeteoFranceClient
+from meteofrance_api.const import METEOFRANCE_API_URL
+from meteofrance_api.session import MeteoFranceSession
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from .quota import upstream_ledger
+import random
+import requests
+import threading
+import time
+
+GEOCODING_URL = "http://api.openweathermap.org/geo/1.0/direct"
+
+DEFAULT_UPSTREAM_HTTP = {
+    "METEOFRANCE_URL": METEOFRANCE_API_URL,
+    "GEOCODING_URL": GEOCODING_URL,
+    "CONNECT_TIMEOUT": 3,
+    "READ_TIMEOUT": 10,
+    "POOL_CONNECTIONS": 10,
+    "POOL_MAXSIZE": 20,
+    "MAX_RETRIES": 2,
+    "BACKOFF_FACTOR": 0.3,
+    "BACKOFF_MAX": 2,
+    "RETRY_STATUSES": [429, 502, 503, 504],
+}
+
+
+def get_upstream_settings():
+    """
+    Return upstream HTTP settings, with defaults.
+    """
+    return {**DEFAULT_UPSTREAM_HTTP, **getattr(settings, "UPSTREAM_HTTP", {})}
+
+
+class JitterRetry(Retry):
+    """
+    Retry policy with full jitter on backoff,
+    so retries of concurrent workers do not hit upstream at the same time.
+    """
+
+    def __init__(self, backoff_max=DEFAULT_UPSTREAM_HTTP["BACKOFF_MAX"], **kwargs):
+        self.backoff_max = backoff_max
+        super().__init__(**kwargs)
+
+    def new(self, **kwargs):
+        """
+        Return the next retry state, keeping the backoff cap.
+        """
+        retry = super().new(**kwargs)
+        retry.backoff_max = self.backoff_max
+        return retry
+
+    def get_backoff_time(self):
+        """
+        Return a random backoff time, up to the exponential backoff.
+        """
+        backoff = min(self.backoff_max, super().get_backoff_time())
+        return random.uniform(0, backoff)
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """
+    HTTP adapter applying default connect and read timeouts.
+    With a provider ledger, calls wait for the provider quota in their lane
+    and are recorded with their latency and status.
+    """
+
+    def __init__(self, timeout=None, ledger=None, **kwargs):
+        self.timeout = timeout
+        self.ledger = ledger
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        """
+        Send request, with default timeout if none given.
+        """
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        if self.ledger is None:
+            return super().send(request, **kwargs)
+
+        with self.ledger.slot():
+            started = time.perf_counter()
+            try:
+                api_response = super().send(request, **kwargs)
+            except Exception:
+                self.ledger.record(time.perf_counter() - started)
+                raise
+        retries = getattr(api_response.raw, "retries", None)
+        self.ledger.record(
+            time.perf_counter() - started,
+            api_response.status_code,
+            attempts=1 + len(retries.history if retries else ()),
+        )
+        return api_response
+
+
+class UpstreamClient():
+    """
+    Pooled HTTP client for one upstream provider.
+    Connections are kept alive in a pool shared by all threads,
+    each thread gets its own session on top of it.
+    host overrides the base URL of sessions having one (Meteofrance).
+    """
+
+    def __init__(self, name, session_class=requests.Session, host=None, **options):
+        self.name = name
+        self.session_class = session_class
+        self.host = host
+        self.options = {**get_upstream_settings(), **options}
+        self.adapter = self.build_adapter()
+        self._local = threading.local()
+
+    def build_adapter(self):
+        """
+        Build the pooled adapter with timeouts and retries.
+        """
+        options = self.options
+        retries = JitterRetry(
+            total=options["MAX_RETRIES"],
+            backoff_factor=options["BACKOFF_FACTOR"],
+            backoff_max=options["BACKOFF_MAX"],
+            status_forcelist=options["RETRY_STATUSES"],
+            allowed_methods=frozenset(["GET"]),
+            raise_on_status=False,
+        )
+        return TimeoutHTTPAdapter(
+            timeout=(options["CONNECT_TIMEOUT"], options["READ_TIMEOUT"]),
+            ledger=upstream_ledger.get(self.name),
+            pool_connections=options["POOL_CONNECTIONS"],
+            pool_maxsize=options["POOL_MAXSIZE"],
+            max_retries=retries,
+        )
+
+    @property
+    def session(self):
+        """
+        Return the session of the current thread.
+        """
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self.session_class()
+            if self.host:
+                session.host = self.host
+            session.mount("https://", self.adapter)
+            session.mount("http://", self.adapter)
+            self._local.session = session
+        return session
+
+    def get(self, url, **kwargs):
+        """
+        Send a GET request through the pool.
+        """
+        return self.session.get(url, **kwargs)
+
+    def close(self):
+        """
+        Close pooled connections.
+        """
+        self.adapter.close()
+
+
+class PooledMeteoFranceClient(MeteoFranceClient):
+    """
+    Meteofrance client using the pooled upstream client,
+    safe to share between threads.
+    """
+
+    def __init__(self, upstream_client):
+        self.upstream_client = upstream_client
+
+    @property
+    def session(self):
+        """
+        Return the Meteofrance session of the current thread.
+        """
+        return self.upstream_client.session
+
+
+meteofrance_http = UpstreamClient(
+    "Meteofrance",
+    session_class=MeteoFranceSession,
+    host=get_upstream_settings()["METEOFRANCE_URL"],
+)
+openweathermap_http = UpstreamClient("Openweathermap")
@@ -15,6 +15,7 @@ from po_app.serializers import (
     UserActivitiesSerializer,
     PlannedActivitiesSerializer,
 )
+from po_app.nowcast import get_rain_nowcast
 
 
 class ApiRootView(APIView):
@@ -341,12 +342,15 @@ class PlannedActivitiesViewSet(viewsets.ModelViewSet):
 
     def retrieve(self, request, pk=None):
         """
-        Retrieve a Planned Activity by id.
+        Retrieve a Planned Activity by id, with the rain nowcast
+        of its location if it starts soon.
         Special permissions for staff and authenticated users.
         """
         planned_activity = self.get_object()
         serializer = self.get_serializer(planned_activity)
-        return Response(serializer.data)
+        data = serializer.data
+        data["rain_nowcast"] = get_rain_nowcast(planned_activity)
+        return Response(data)
 
     def update(self, request, pk=None):
         """
@@ -0,0 +1,257 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.html import strip_tags
+from meteofrance_api.helpers import (
+    get_phenomenon_name_from_indice,
+    get_warning_text_status_from_indice_color,
+    is_valid_warning_department,
+)
+from .circuit_breaker import meteofrance_breaker
+from .forecast_cache import snap_to_grid
+from .lanes import background_lane
+from .models import LocationDepartments, PlannedActivities, WeatherWarningNotifications
+from .periodic import start_periodic
+from .weather import get_forecast, weather_client
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WEATHER_WARNINGS = {
+    "INTERVAL": 0,
+    "HORIZON_HOURS": 48,
+    "MIN_COLOR": 3,
+    "BATCH_SIZE": 100,
+    "FROM_EMAIL": "noreply@po-team.com",
+}
+
+
+def get_weather_warnings_settings():
+    """
+    Return weather warnings settings, with defaults.
+    """
+    return {**DEFAULT_WEATHER_WARNINGS, **getattr(settings, "WEATHER_WARNINGS", {})}
+
+
+def get_upcoming_planned_activities(horizon_hours):
+    """
+    Return planned activities running now or starting within horizon_hours.
+    """
+    now = timezone.now()
+    return PlannedActivities.objects.filter(
+        end_datetime__gte=now,
+        start_datetime__lte=now + timedelta(hours=horizon_hours),
+    ).select_related("user", "activity")
+
+
+def resolve_department(grid_lat, grid_lon):
+    """
+    Return the department of a grid cell from its forecast position,
+    empty if Meteofrance publishes no weather warnings there.
+    """
+    department = get_forecast(grid_lat, grid_lon).position.get("dept") or ""
+    return department if is_valid_warning_department(department) else ""
+
+
+def get_location_departments(grid_cells):
+    """
+    Return a dict {grid_cell: department} from the location index.
+    Missing grid cells are resolved once from their (cached) forecast
+    and added to the index, unresolved ones are left out.
+    """
+    grid_cells = set(grid_cells)
+    if not grid_cells:
+        return {}
+    indexed = LocationDepartments.objects.filter(
+        grid_lat__in={grid_lat for grid_lat, _ in grid_cells},
+        grid_lon__in={grid_lon for _, grid_lon in grid_cells},
+    ).values_list("grid_lat", "grid_lon", "department")
+    departments = {
+        (grid_lat, grid_lon): department
+        for grid_lat, grid_lon, department in indexed
+        if (grid_lat, grid_lon) in grid_cells
+    }
+
+    new_entries = []
+    for grid_lat, grid_lon in grid_cells - departments.keys():
+        try:
+            department = resolve_department(grid_lat, grid_lon)
+        except Exception as e:
+            logger.warning("Department lookup failed for %s, %s: %s", grid_lat, grid_lon, e)
+            continue
+        departments[(grid_lat, grid_lon)] = department
+        new_entries.append(LocationDepartments(
+            grid_lat=grid_lat, grid_lon=grid_lon, department=department))
+    LocationDepartments.objects.bulk_create(new_entries, ignore_conflicts=True)
+    return departments
+
+
+def fetch_department_warnings(department, min_color):
+    """
+    Get current weather warnings of a department from Meteofrance API,
+    coastal bulletin included. Return a list of (phenomenon_id, color)
+    at or above min_color.
+    """
+    phenomenons = meteofrance_breaker.call(
+        lambda: weather_client.get_warning_current_phenomenoms(
+            department, with_coastal_bulletin=True)
+    )
+    return [
+        (str(phenomenon["phenomenon_id"]), phenomenon["phenomenon_max_color_id"])
+        for phenomenon in phenomenons.phenomenons_max_colors
+        if phenomenon["phenomenon_max_color_id"] >= min_color
+    ]
+
+
+def get_notified_colors(planned_activities):
+    """
+    Return a dict {(planned activity id, phenomenon_id): highest notified color}.
+    """
+    notified = {}
+    for planned_activity_id, phenomenon_id, color in WeatherWarningNotifications.objects.filter(
+        planned_activity__in=planned_activities,
+    ).values_list("planned_activity_id", "phenomenon_id", "color"):
+        key = (planned_activity_id, phenomenon_id)
+        notified[key] = max(color, notified.get(key, 0))
+    return notified
+
+
+def build_warning_email(user, items, from_email):
+    """
+    Build the weather warning email of a user,
+    items are (planned activity, department, [(phenomenon_id, color)]).
+    """
+    activities = [
+        {
+            "name": planned_activity.activity.name,
+            "location": planned_activity.location.get("name", ""),
+            "start": timezone.localtime(planned_activity.start_datetime).strftime("%Y-%m-%d %H:%M"),
+            "department": department,
+            "warnings": [
+                {
+                    "phenomenon": get_phenomenon_name_from_indice(phenomenon_id, "en"),
+                    "color": get_warning_text_status_from_indice_color(color, "en"),
+                }
+                for phenomenon_id, color in warnings
+            ],
+        }
+        for planned_activity, department, warnings in items
+    ]
+    msg_html = render_to_string(
+        "weather_warning.html", {"user": user.username, "activities": activities}
+    )
+    message = EmailMultiAlternatives(
+        "Weather warning for your planned activities",
+        strip_tags(msg_html),
+        from_email,
+        [user.email],
+    )
+    message.attach_alternative(msg_html, "text/html")
+    return message
+
+
+def send_warning_emails(user_items, batch_size, from_email):
+    """
+    Send one email per user, in batches over a single mail connection.
+    Notifications of a batch are recorded once it is sent.
+    Return the number of sent emails.
+    """
+    users = list(user_items)
+    sent = 0
+    with get_connection() as connection:
+        for start in range(0, len(users), batch_size):
+            batch = users[start:start + batch_size]
+            sent += connection.send_messages([
+                build_warning_email(user, user_items[user], from_email) for user in batch
+            ]) or 0
+            WeatherWarningNotifications.objects.bulk_create([
+                WeatherWarningNotifications(
+                    planned_activity=planned_activity,
+                    department=department,
+                    phenomenon_id=phenomenon_id,
+                    color=color,
+                )
+                for user in batch
+                for planned_activity, department, warnings in user_items[user]
+                for phenomenon_id, color in warnings
+            ], ignore_conflicts=True)
+    return sent
+
+
+@background_lane()
+def fan_out_weather_warnings(horizon_hours=None, min_color=None, dry_run=False):
+    """
+    Notify users of weather warnings on their upcoming planned activities.
+    Planned activities are grouped by department with the location index,
+    warnings are fetched once per department, never per user.
+    Warnings already notified at the same or a higher color are skipped.
+    Return a report of upstream calls and notifications.
+    """
+    warnings_settings = get_weather_warnings_settings()
+    if horizon_hours is None:
+        horizon_hours = warnings_settings["HORIZON_HOURS"]
+    if min_color is None:
+        min_color = warnings_settings["MIN_COLOR"]
+
+    planned_activities = list(get_upcoming_planned_activities(horizon_hours))
+    grid_cells = {
+        planned_activity.pk: snap_to_grid(planned_activity.location["lat"], planned_activity.location["lon"])
+        for planned_activity in planned_activities
+    }
+    departments = get_location_departments(grid_cells.values())
+    by_department = {}
+    for planned_activity in planned_activities:
+        department = departments.get(grid_cells[planned_activity.pk])
+        if department:
+            by_department.setdefault(department, []).append(planned_activity)
+
+    report = {
+        "planned_activities": len(planned_activities),
+        "departments": len(by_department),
+        "upstream_calls": 0,
+        "errors": 0,
+        "warnings": 0,
+        "notifications": 0,
+        "users": 0,
+        "emails": 0,
+    }
+    notified = get_notified_colors(planned_activities)
+    user_items = {}
+    for department, department_activities in sorted(by_department.items()):
+        try:
+            warnings = fetch_department_warnings(department, min_color)
+            report["upstream_calls"] += 1
+        except Exception as e:
+            report["errors"] += 1
+            logger.warning("Weather warnings failed for department %s: %s", department, e)
+            continue
+        report["warnings"] += len(warnings)
+        for planned_activity in department_activities:
+            new_warnings = [
+                (phenomenon_id, color) for phenomenon_id, color in warnings
+                if color > notified.get((planned_activity.pk, phenomenon_id), 0)
+            ]
+            if new_warnings:
+                report["notifications"] += len(new_warnings)
+                user_items.setdefault(planned_activity.user, []).append(
+                    (planned_activity, department, new_warnings))
+
+    report["users"] = len(user_items)
+    if user_items and not dry_run:
+        report["emails"] = send_warning_emails(
+            user_items, warnings_settings["BATCH_SIZE"], warnings_settings["FROM_EMAIL"])
+    return report
+
+
+def start_warnings_scheduler():
+    """
+    Start weather warnings fan-out in a background thread.
+    Return the stop event, or None if INTERVAL is 0.
+    """
+    interval = get_weather_warnings_settings()["INTERVAL"]
+    if not interval:
+        return None
+    return start_periodic(fan_out_weather_warnings, "Weather warnings fan-out", lambda: interval, "weather-warnings")
@@ -0,0 +1,169 @@
+from collections import Counter
+from datetime import datetime, timedelta
+from django.db import DatabaseError
+from django.utils import timezone
+from .circuit_breaker import UpstreamUnavailableError
+from .forecast_cache import forecast_cache, snap_to_grid
+from .lanes import background_lane
+from .models import Users
+from .periodic import start_periodic
+from .popularity import (
+    flush_request_counts,
+    get_cache_warming_settings,
+    get_shared_request_counts,
+    location_popularity,
+)
+from .snapshots import snapshot_store, snapshots_enabled
+from .weather import fetch_forecast
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def get_home_grid_cells():
+    """
+    Group users home locations by grid cell.
+    Return a Counter {grid_cell: number of users}.
+    """
+    grid_cells = Counter()
+    for location in Users.objects.values_list("location", flat=True).iterator():
+        if isinstance(location, dict) and location.get("lat") is not None and location.get("lon") is not None:
+            grid_cells[snap_to_grid(location["lat"], location["lon"])] += 1
+    return grid_cells
+
+
+def get_request_counts():
+    """
+    Return requests count by grid cell over WINDOW_HOURS. With snapshots,
+    requests of all processes flushed to LocationRequests, this one flushed
+    first, otherwise requests of the current process.
+    """
+    if snapshots_enabled():
+        try:
+            flush_request_counts()
+            return get_shared_request_counts()
+        except DatabaseError as e:
+            logger.warning("Shared requests counts not read: %s", e)
+    return location_popularity.counts()
+
+
+def rank_locations(top_n, request_counts):
+    """
+    Rank grid cells by recent requests and users living there, weighted by
+    REQUEST_WEIGHT and USER_WEIGHT. Return the top_n grid cells, most popular first.
+    """
+    warming_settings = get_cache_warming_settings()
+    scores = Counter()
+    for grid_cell, count in request_counts.items():
+        scores[grid_cell] += warming_settings["REQUEST_WEIGHT"] * count
+    for grid_cell, count in get_home_grid_cells().items():
+        scores[grid_cell] += warming_settings["USER_WEIGHT"] * count
+    return [grid_cell for grid_cell, score in scores.most_common(top_n) if score > 0]
+
+
+def get_hit_rate(request_counts):
+    """
+    Return the share of recent requests on grid cells fresh in the forecast cache.
+    """
+    total = sum(request_counts.values())
+    if not total:
+        return None
+    hits = sum(count for grid_cell, count in request_counts.items() if forecast_cache.time_to_live(grid_cell) > 0)
+    return round(hits / total, 4)
+
+
+@background_lane()
+def warm_popular_forecasts(top_n=None, budget=None, refresh_margin=None):
+    """
+    Fill the forecast cache with forecasts of the top_n most popular locations.
+    Only locations missing or expiring within refresh_margin seconds are fetched,
+    at most budget upstream calls. With snapshots, forecasts fetched recently by
+    any process are loaded first, and warmed ones are shared with web workers.
+    Return a report with the hit rate of recent requests before and after warming.
+    """
+    warming_settings = get_cache_warming_settings()
+    if top_n is None:
+        top_n = warming_settings["TOP_N"]
+    if budget is None:
+        budget = warming_settings["BUDGET"]
+    if refresh_margin is None:
+        refresh_margin = warming_settings["REFRESH_MARGIN"]
+
+    if snapshots_enabled():
+        snapshot_store.warm_cache(forecast_cache, forecast_cache.ttl)
+    request_counts = get_request_counts()
+    grid_cells = rank_locations(top_n, request_counts)
+    report = {
+        "locations": len(grid_cells),
+        "already_cached": 0,
+        "upstream_calls": 0,
+        "errors": 0,
+        "over_budget": 0,
+        "hit_rate_before": get_hit_rate(request_counts),
+    }
+    warmed = []
+    for index, (grid_lat, grid_lon) in enumerate(grid_cells):
+        if forecast_cache.time_to_live((grid_lat, grid_lon)) > refresh_margin:
+            report["already_cached"] += 1
+            continue
+        if report["upstream_calls"] + report["errors"] >= budget:
+            report["over_budget"] += 1
+            continue
+        try:
+            forecast_cache.refresh(
+                (grid_lat, grid_lon),
+                lambda: fetch_forecast(grid_lat, grid_lon),
+            )
+            report["upstream_calls"] += 1
+            warmed.append((grid_lat, grid_lon))
+        except UpstreamUnavailableError as e:
+            # provider unavailable or quota spent, next calls would be refused too
+            report["errors"] += 1
+            report["over_budget"] += len(grid_cells) - index - 1
+            logger.warning("Cache warming stopped: %s", e)
+            break
+        except Exception as e:
+            report["errors"] += 1
+            logger.warning("Cache warming failed for %s, %s: %s", grid_lat, grid_lon, e)
+    report["hit_rate_after"] = get_hit_rate(request_counts)
+    if report["hit_rate_before"] is not None:
+        report["hit_rate_gain"] = round(report["hit_rate_after"] - report["hit_rate_before"], 4)
+    else:
+        report["hit_rate_gain"] = None
+    location_popularity.mark_warmed(warmed, forecast_cache.ttl, {**report, "at": timezone.now().isoformat()})
+    return report
+
+
+def seconds_until_next_run(schedule, now):
+    """
+    Return seconds from now to the next "HH:MM" time of schedule, in now timezone.
+    """
+    runs = []
+    for run_time in schedule:
+        hour, minute = (int(value) for value in run_time.split(":"))
+        run_at = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if run_at <= now:
+            run_at += timedelta(days=1)
+        runs.append(run_at)
+    return (min(runs) - now).total_seconds()
+
+
+def start_warming_scheduler():
+    """
+    Start popular forecasts warming in a background thread, at each SCHEDULE time.
+    Warmed forecasts reach web workers as snapshots, see START_BACKGROUND_JOBS.
+    Return the stop event, or None if SCHEDULE is empty.
+    """
+    schedule = get_cache_warming_settings()["SCHEDULE"]
+    if not schedule:
+        return None
+    # invalid times fail on startup rather than in the thread
+    for run_time in schedule:
+        datetime.strptime(run_time, "%H:%M")
+    return start_periodic(
+        warm_popular_forecasts,
+        "Forecast cache warming",
+        lambda: seconds_until_next_run(schedule, timezone.localtime()),
+        "forecast-cache-warming",
+    )
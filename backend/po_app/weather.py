@@ -1,8 +1,41 @@
 from rest_framework.generics import GenericAPIView
-from rest_framework.permissions import AllowAny, IsAuthenticated
-from meteofrance_api import MeteoFranceClient
+from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
 from rest_framework import status, response
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.utils.urls import replace_query_param
+from .weather_serializers import (
+    HOURLY_FIELDS,
+    CoordinatesSerializer,
+    HourlyForecastSerializer,
+    WeatherBatchSerializer,
+)
+from .forecast_cache import forecast_cache, snap_to_grid, get_forecast_cache_settings
+from .singleflight import database_lock
+from .circuit_breaker import UpstreamUnavailableError, meteofrance_breaker, openweathermap_breaker
+from .compact_forecast import CompactForecast, column_to_list
+from .conditional import add_cache_headers, not_modified_response, forecast_validators, geocoding_validators
+from .lanes import current_lane
+from .models import Activities
+from .popularity import location_popularity
+from .suitability import score_activities
+from .gazetteer import search_gazetteer, reverse_gazetteer
+from .geocoding_cache import normalize_city, get_cached_geocoding, set_cached_geocoding
+from .quota import upstream_ledger
+from .renderers import orjson_dumps
+from .snapshots import (
+    get_recent_snapshot,
+    get_shared_forecast,
+    record_snapshot,
+    record_snapshot_later,
+    snapshots_enabled,
+)
+from .upstream import PooledMeteoFranceClient, get_upstream_settings, meteofrance_http, openweathermap_http
+import numpy as np
 import requests
 import os
 
@@ -10,7 +43,86 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-weather_client = MeteoFranceClient()
+weather_client = PooledMeteoFranceClient(meteofrance_http)
+
+# shared by all batch requests, bound concurrent upstream calls
+batch_executor = ThreadPoolExecutor(
+    max_workers=settings.WEATHER_BATCH["MAX_WORKERS"],
+    thread_name_prefix="weather-batch",
+)
+
+
+def get_forecast(lat, lon):
+    """
+    Get forecast from cache, or from Meteofrance API on a miss.
+    Coordinates are snapped to the provider grid, so nearby
+    locations and all weather views share the same cache entry.
+    A forecast fetched by another process is read from snapshots if enabled.
+    User requests are counted for popular locations cache warming.
+    """
+    grid_lat, grid_lon = snap_to_grid(lat, lon)
+    if current_lane().interactive:
+        location_popularity.record((grid_lat, grid_lon))
+    return forecast_cache.get_or_fetch(
+        (grid_lat, grid_lon),
+        lambda: fetch_forecast(grid_lat, grid_lon),
+        shared=lambda: get_shared_forecast(grid_lat, grid_lon),
+    )
+
+
+def fetch_forecast(grid_lat, grid_lon):
+    """
+    Get compact forecast from Meteofrance API, through its circuit breaker.
+    The forecast is stored as a snapshot in background if FORECAST_SNAPSHOTS is enabled.
+    If DB_LOCK is enabled too, workers sharing the database run only one
+    upstream call per grid cell at a time, the others get its snapshot.
+    """
+    def upstream_call():
+        return CompactForecast.from_forecast(weather_client.get_forecast(
+            latitude=grid_lat, longitude=grid_lon, language="en"
+        ))
+
+    cache_settings = get_forecast_cache_settings()
+    if not cache_settings["DB_LOCK"] or not snapshots_enabled():
+        forecast = meteofrance_breaker.call(upstream_call)
+        record_snapshot_later(grid_lat, grid_lon, forecast)
+        return forecast
+    waiting_since = timezone.now()
+    with database_lock(f"po_forecast:{grid_lat}:{grid_lon}", cache_settings["DB_LOCK_TIMEOUT"]):
+        # another worker may have fetched this cell while this one waited for the lock
+        recent = get_recent_snapshot(grid_lat, grid_lon, waiting_since)
+        if recent is not None:
+            return recent[0]
+        forecast = meteofrance_breaker.call(upstream_call)
+        # stored before the lock is released, for the workers waiting for it
+        record_snapshot(grid_lat, grid_lon, forecast)
+    return forecast
+
+
+def get_forecast_or_last_good(lat, lon):
+    """
+    Get forecast, or the last successful forecast for this grid cell
+    if Meteofrance API is unavailable.
+    Return (forecast, is_stale).
+    """
+    try:
+        return get_forecast(lat, lon), False
+    except Exception:
+        weather_data = forecast_cache.get_last_good(snap_to_grid(lat, lon))
+        if weather_data is None:
+            raise
+        return weather_data, True
+
+
+def batch_get_forecast_or_last_good(lat, lon):
+    """
+    Run get_forecast_or_last_good in a batch executor thread,
+    its database connection is closed as after a request.
+    """
+    try:
+        return get_forecast_or_last_good(lat, lon)
+    finally:
+        close_old_connections()
 
 
 class CustomConvertion():
@@ -60,11 +172,311 @@ class CustomConvertion():
         """
         return round(meters * 3.28084, 2)
 
+    def convert_temp_in_farhenheit_column(self, temps_in_celsius):
+        """
+        Convert a column of temperatures from Celsius to Fahrenheit.
+        """
+        return np.round((temps_in_celsius * 9/5) + 32, 1)
+
+    def convert_wind_speed_column(self, speeds):
+        """
+        Convert a column of wind speeds from km/h to mph.
+        """
+        return np.round(speeds * 0.621371, 2)
+
+    def convert_wind_direction_column(self, directions):
+        """
+        Convert a column of wind directions from degrees to cardinal directions.
+        """
+        cardinal = np.array(["N", "NE", "E", "SE", "S", "SW", "W", "NW"], dtype=object)
+        indexes = np.round(np.nan_to_num(directions) / 45).astype(np.int64) % 8
+        converted = cardinal[indexes]
+        converted[directions == -1] = "Variable"
+        converted[np.isnan(directions)] = None
+        return converted.tolist()
+
+    def convert_meters_to_feet_column(self, meters):
+        """
+        Convert a column of meters to feet.
+        """
+        return np.round(meters * 3.28084, 2)
+
+
+URL_ICON = "https://meteofrance.com/modules/custom/mf_tools_common_theme_public/svg/weather"
+
+
+def build_geocoding_data(data):
+    """
+    Build geocoding output from Openweathermap API data.
+    """
+    output_data = []
+    for item in data:
+        output_data.append(
+            {
+                "name": item["name"],
+                "lat": item["lat"],
+                "lon": item["lon"],
+                "country": item["country"],
+            }
+        )
+    return output_data
+
+
+def build_daily_forecast(weather_data):
+    """
+    Build 15 days forecast output from compact forecast.
+    """
+    days = slice(0, 15)
+    conversion = CustomConvertion()
+    min_c = weather_data.daily_t_min[days]
+    max_c = weather_data.daily_t_max[days]
+    min_f = column_to_list(conversion.convert_temp_in_farhenheit_column(min_c))
+    max_f = column_to_list(conversion.convert_temp_in_farhenheit_column(max_c))
+    min_c = column_to_list(min_c)
+    max_c = column_to_list(max_c)
+
+    final_data = []
+    for index, dt in enumerate(weather_data.daily_dt[days].tolist()):
+        locale_datetime = str(weather_data.timestamp_to_locale_time(dt))
+        converted_datetime = conversion.convert_datetime(locale_datetime)
+
+        final_data.append(
+            {
+                "day_id": index,
+                "date": converted_datetime["date"],
+                "weather": weather_data.daily_weather_desc[index],
+                "weather_icon": weather_data.daily_weather_icon[index],
+                "temperature": {
+                    "min_C": min_c[index],
+                    "max_C": max_c[index],
+                    "min_F": min_f[index],
+                    "max_F": max_f[index],
+                }
+            }
+        )
+    return final_data
+
+
+def build_forecast_details_list(weather_data, day_ids):
+    """
+    Build forecast details output for several days from compact forecast.
+    Unit conversions run once on the selected columns.
+    """
+    days = np.array(day_ids, dtype=np.int64)
+    conversion = CustomConvertion()
+    min_c = weather_data.daily_t_min[days]
+    max_c = weather_data.daily_t_max[days]
+    wind_speed = weather_data.hourly_wind_speed[days]
+    iso0 = weather_data.hourly_iso0[days]
+    columns = {
+        "min_C": column_to_list(min_c),
+        "max_C": column_to_list(max_c),
+        "min_F": column_to_list(conversion.convert_temp_in_farhenheit_column(min_c)),
+        "max_F": column_to_list(conversion.convert_temp_in_farhenheit_column(max_c)),
+        "humidity_min": column_to_list(weather_data.daily_humidity_min[days], integer=True),
+        "humidity_max": column_to_list(weather_data.daily_humidity_max[days], integer=True),
+        "uv": column_to_list(weather_data.daily_uv[days], integer=True),
+        "sea_level": column_to_list(weather_data.hourly_sea_level[days]),
+        "speed_kmh": column_to_list(wind_speed, integer=True),
+        "speed_mph": column_to_list(conversion.convert_wind_speed_column(wind_speed)),
+        "direction": conversion.convert_wind_direction_column(
+            weather_data.hourly_wind_direction[days]),
+        "rain": column_to_list(weather_data.hourly_rain_6h[days]),
+        "iso0_meters": column_to_list(iso0, integer=True),
+        "iso0_feet": column_to_list(conversion.convert_meters_to_feet_column(iso0)),
+    }
+
+    final_detailled_data = []
+    for index, day_id in enumerate(day_ids):
+        converted_datetime = conversion.convert_datetime(str(
+            weather_data.timestamp_to_locale_time(weather_data.daily_dt[day_id])))
+        converted_sunrise = conversion.convert_datetime(str(
+            weather_data.timestamp_to_locale_time(weather_data.daily_sunrise[day_id])))
+        converted_sunset = conversion.convert_datetime(str(
+            weather_data.timestamp_to_locale_time(weather_data.daily_sunset[day_id])))
+
+        final_detailled_data.append({
+            "date": converted_datetime["date"],
+            "weather": weather_data.daily_weather_desc[day_id],
+            "weather_icon": weather_data.daily_weather_icon[day_id],
+            "temperature": {
+                "min_C": columns["min_C"][index],
+                "max_C": columns["max_C"][index],
+                "min_F": columns["min_F"][index],
+                "max_F": columns["max_F"][index],
+            },
+            "humidity": {"min": columns["humidity_min"][index], "max": columns["humidity_max"][index]},
+            "uv": columns["uv"][index],
+            "sunrise": converted_sunrise["hour"],
+            "sunset": converted_sunset["hour"],
+            "sea_level": columns["sea_level"][index],
+            "wind": {
+                "speed_kmh": columns["speed_kmh"][index],
+                "speed_mph": columns["speed_mph"][index],
+                "direction": columns["direction"][index],
+            },
+            "rain": columns["rain"][index],
+            "iso0": {
+                "meters": columns["iso0_meters"][index],
+                "feet": columns["iso0_feet"][index],
+            }
+        })
+    return final_detailled_data
+
+
+def build_forecast_details(weather_data, day_id):
+    """
+    Build forecast details output for one day from compact forecast.
+    """
+    return build_forecast_details_list(weather_data, [day_id])[0]
+
+
+def build_hourly_columns(weather_data, rows, fields):
+    """
+    Build converted hourly forecast columns of selected rows (a range) and fields.
+    """
+    conversion = CustomConvertion()
+    rows = slice(rows.start, rows.stop)
+    columns = {}
+    if "temperature" in fields:
+        temperature = weather_data.hourly_t[rows]
+        columns["temperature"] = {
+            "C": column_to_list(temperature),
+            "F": column_to_list(conversion.convert_temp_in_farhenheit_column(temperature)),
+        }
+    if "humidity" in fields:
+        columns["humidity"] = column_to_list(weather_data.hourly_humidity[rows], integer=True)
+    if "sea_level" in fields:
+        columns["sea_level"] = column_to_list(weather_data.hourly_sea_level[rows])
+    if "wind" in fields:
+        wind_speed = weather_data.hourly_wind_speed[rows]
+        columns["wind"] = {
+            "speed_kmh": column_to_list(wind_speed, integer=True),
+            "speed_mph": column_to_list(conversion.convert_wind_speed_column(wind_speed)),
+            "gust_kmh": column_to_list(weather_data.hourly_wind_gust[rows], integer=True),
+            "direction": conversion.convert_wind_direction_column(weather_data.hourly_wind_direction[rows]),
+        }
+    if "rain" in fields:
+        columns["rain"] = {
+            "1h": column_to_list(weather_data.hourly_rain_1h[rows]),
+            "3h": column_to_list(weather_data.hourly_rain_3h[rows]),
+            "6h": column_to_list(weather_data.hourly_rain_6h[rows]),
+        }
+    if "snow" in fields:
+        columns["snow"] = {"1h": column_to_list(weather_data.hourly_snow_1h[rows])}
+    if "iso0" in fields:
+        iso0 = weather_data.hourly_iso0[rows]
+        columns["iso0"] = {
+            "meters": column_to_list(iso0, integer=True),
+            "feet": column_to_list(conversion.convert_meters_to_feet_column(iso0)),
+        }
+    if "clouds" in fields:
+        columns["clouds"] = column_to_list(weather_data.hourly_clouds[rows], integer=True)
+    if "weather" in fields:
+        columns["weather"] = {
+            "desc": list(weather_data.hourly_weather_desc[rows]),
+            "icon": list(weather_data.hourly_weather_icon[rows]),
+        }
+    return columns
+
+
+def iter_hourly_forecast(weather_data, rows, fields):
+    """
+    Yield hourly forecast items of selected rows, one at a time.
+    """
+    columns = build_hourly_columns(weather_data, rows, fields)
+    for index, row in enumerate(rows):
+        dt = int(weather_data.hourly_dt[row])
+        item = {"dt": dt, "datetime": weather_data.timestamp_to_locale_time(dt).isoformat()}
+        for field, column in columns.items():
+            if isinstance(column, dict):
+                item[field] = {key: values[index] for key, values in column.items()}
+            else:
+                item[field] = column[index]
+        yield item
+
+
+def stream_hourly_response(header, weather_data, rows, fields, chunk_size):
+    """
+    Yield JSON response content: header keys, then data items
+    serialized chunk by chunk, with orjson like other responses.
+    """
+    yield orjson_dumps(header)[:-1] + b',"data":['
+    for start in range(0, len(rows), chunk_size):
+        items = iter_hourly_forecast(weather_data, rows[start:start + chunk_size], fields)
+        chunk = b",".join(orjson_dumps(item) for item in items)
+        yield chunk if start == 0 else b"," + chunk
+    yield b"]}"
+
+
+def build_weather_response(output_data, is_stale):
+    """
+    Build weather response content, with a staleness marker if needed.
+    """
+    content = {"data": output_data, "url_icon": URL_ICON}
+    if is_stale:
+        content["stale"] = True
+    return content
+
+
+def is_valid_day_id(weather_data, day_id):
+    """
+    Check day_id is available in compact forecast.
+    """
+    return 0 <= day_id < min(weather_data.daily_count, weather_data.hourly_count)
+
+
+INVALID_DAYS_MESSAGE = "Invalid days selection."
+
+
+def parse_days(days, days_count):
+    """
+    Parse a days selection, like "0-4" or "0,2,5", into sorted day IDs.
+    Return all available days if days is empty.
+    Raise ValueError if the selection is invalid.
+    """
+    if not days:
+        return list(range(days_count))
+    day_ids = set()
+    for part in days.split(","):
+        try:
+            bounds = [int(bound) for bound in part.split("-")]
+        except ValueError:
+            raise ValueError(INVALID_DAYS_MESSAGE) from None
+        # bounds are checked before building the range, so it never exceeds days_count
+        if len(bounds) > 2 or not all(0 <= bound < days_count for bound in bounds) or bounds[0] > bounds[-1]:
+            raise ValueError(INVALID_DAYS_MESSAGE)
+        day_ids.update(range(bounds[0], bounds[-1] + 1))
+    return sorted(day_ids)
+
+
+def build_all_forecast_details(weather_data, days=None):
+    """
+    Build forecast details output for several days from one compact forecast.
+    Raise ValueError if the days selection is invalid.
+    """
+    days_count = min(15, weather_data.daily_count, weather_data.hourly_count)
+    day_ids = parse_days(days, days_count)
+    return [
+        {"day_id": day_id, **details}
+        for day_id, details in zip(day_ids, build_forecast_details_list(weather_data, day_ids))
+    ]
+
+
+def get_coordinates(kwargs):
+    """
+    Return validated lat and lon of view kwargs.
+    Raise ValidationError if they are not valid coordinates.
+    """
+    serializer = CoordinatesSerializer(data={"lat": kwargs.get("lat"), "lon": kwargs.get("lon")})
+    serializer.is_valid(raise_exception=True)
+    return serializer.validated_data["lat"], serializer.validated_data["lon"]
+
 
 class GeocodingView(GenericAPIView):
     """
     Retreive geographic coordinates.
-    Using Openweathermap Geocoding API.
+    Using offline gazetteer, then Openweathermap Geocoding API.
     """
     permission_classes = [AllowAny]
 
@@ -72,34 +484,59 @@ class GeocodingView(GenericAPIView):
         """
         Get coordinates from city name.
         """
-        city = kwargs.get("city")
+        city = normalize_city(kwargs.get("city"))
         limit = 10
         api_key = os.environ.get("OWM_API_KEY")
-        geocoding_url = f"http://api.openweathermap.org/geo/1.0/direct?q={
-            city}&limit={limit}&appid={api_key}"
+        params = {"q": city, "limit": limit, "appid": api_key}
+        geocoding_url = get_upstream_settings()["GEOCODING_URL"]
 
-        try:
-            api_response = requests.get(geocoding_url)
+        def upstream_call():
+            api_response = openweathermap_http.get(geocoding_url, params=params)
             api_response.raise_for_status()
-            data = api_response.json()
-            if data:
-                output_data = []
-                for item in data:
-                    output_data.append(
-                        {
-                            "name": item["name"],
-                            "lat": item["lat"],
-                            "lon": item["lon"],
-                            "country": item["country"],
-                        }
-                    )
-                return response.Response({"data": output_data}, status=status.HTTP_200_OK)
+            return api_response
+
+        try:
+            output_data = search_gazetteer(city) or get_cached_geocoding(city)
+            if output_data is None:
+                data = openweathermap_breaker.call(upstream_call).json()
+                output_data = build_geocoding_data(data)
+                set_cached_geocoding(city, output_data)
+            if output_data:
+                validators = geocoding_validators(request, output_data)
+                return (not_modified_response(request, validators)
+                        or add_cache_headers(response.Response({"data": output_data}, status=status.HTTP_200_OK),
+                                             validators))
             else:
                 return response.Response({"error": "City not found."}, status.HTTP_404_NOT_FOUND)
+        except UpstreamUnavailableError as e:
+            return response.Response({"error": str(e)}, status.HTTP_503_SERVICE_UNAVAILABLE)
         except requests.exceptions.RequestException as e:
             return response.Response({"error": str(e)}, status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class ReverseGeocodingView(GenericAPIView):
+    """
+    Retreive nearest places of geographic coordinates.
+    Using offline gazetteer, no upstream call.
+    """
+    serializer_class = CoordinatesSerializer
+    permission_classes = [AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        """
+        Get locations of nearest places from coordinates.
+        """
+        serializer = self.get_serializer(
+            data={"lat": kwargs.get("lat"), "lon": kwargs.get("lon")})
+        serializer.is_valid(raise_exception=True)
+        output_data = reverse_gazetteer(
+            serializer.validated_data["lat"], serializer.validated_data["lon"])
+        if output_data:
+            return response.Response({"data": output_data}, status=status.HTTP_200_OK)
+        else:
+            return response.Response({"error": "No place found."}, status.HTTP_404_NOT_FOUND)
+
+
 class WeatherView(GenericAPIView):
     """
     Retreive weather data.
@@ -111,42 +548,18 @@ class WeatherView(GenericAPIView):
         """
         Get weather data from coordinates.
         """
-        lat = float(kwargs.get("lat"))
-        lon = float(kwargs.get("lon"))
+        lat, lon = get_coordinates(kwargs)
         try:
-            weather_data = weather_client.get_forecast(
-                latitude=lat, longitude=lon, language="en"
-            )
-            daily_weather_data = weather_data.daily_forecast[:15]
-            url_icon = "https://meteofrance.com/modules/custom/mf_tools_common_theme_public/svg/weather"
-
-            final_data = []
-            for index, day in enumerate(daily_weather_data):
-                locale_datetime = str(weather_data.timestamp_to_locale_time(
-                    day["dt"]))
-                converted_datetime = CustomConvertion().convert_datetime(
-                    locale_datetime)
-
-                final_data.append(
-                    {
-                        "day_id": index,
-                        "date": converted_datetime["date"],
-                        "weather": day["weather12H"]["desc"],
-                        "weather_icon": day["weather12H"]["icon"],
-                        "temperature": {
-                            "min_C": day["T"]["min"],
-                            "max_C": day["T"]["max"],
-                            "min_F": CustomConvertion().convert_temp_in_farhenheit(
-                                day["T"]["min"]
-                            ),
-                            "max_F": CustomConvertion().convert_temp_in_farhenheit(
-                                day["T"]["max"]
-                            ),
-                        }
-                    }
-                )
-            return response.Response(
-                {"data": final_data, "url_icon": url_icon}, status=status.HTTP_200_OK)
+            weather_data, is_stale = get_forecast_or_last_good(lat, lon)
+            validators = forecast_validators(request, lat, lon, weather_data, is_stale)
+            not_modified = not_modified_response(request, validators)
+            if not_modified:
+                return not_modified
+            return add_cache_headers(response.Response(
+                build_weather_response(build_daily_forecast(weather_data), is_stale), status=status.HTTP_200_OK),
+                validators)
+        except UpstreamUnavailableError as e:
+            return response.Response({"error": str(e)}, status.HTTP_503_SERVICE_UNAVAILABLE)
         except Exception as e:
             return response.Response({"error": str(e)}, status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -161,64 +574,206 @@ class WeatherDetailsView(GenericAPIView):
     def get(self, request, *args, **kwargs):
         """
         Get weather data details from coordinates.
+        Without day_id, get details for all days, or for days
+        selected with "days" query parameter (ex: ?days=0-4).
         """
-        lat = float(kwargs.get("lat"))
-        lon = float(kwargs.get("lon"))
+        lat, lon = get_coordinates(kwargs)
+        if "day_id" not in kwargs:
+            return self.get_all_days(lat, lon, request.query_params.get("days"))
         day_id = int(kwargs.get("day_id"))
         try:
-            weather_data = weather_client.get_forecast(
-                latitude=lat, longitude=lon, language="en"
-            )
+            weather_data, is_stale = get_forecast_or_last_good(lat, lon)
 
-            if day_id < 0 or day_id >= len(weather_data.forecast):
+            if not is_valid_day_id(weather_data, day_id):
                 return response.Response({"error": "Invalid day ID"}, status=status.HTTP_400_BAD_REQUEST)
 
-            selected_day = weather_data.daily_forecast[day_id]
-            selected_day_details = weather_data.forecast[day_id]
-            url_icon = "https://meteofrance.com/modules/custom/mf_tools_common_theme_public/svg/weather"
-
-            locale_datetime = str(weather_data.timestamp_to_locale_time(
-                selected_day["dt"]))
-            converted_datetime = CustomConvertion().convert_datetime(
-                locale_datetime)
-            locale_sunrise = str(weather_data.timestamp_to_locale_time(
-                selected_day["sun"]["rise"]))
-            converted_sunrise = CustomConvertion().convert_datetime(locale_sunrise)
-            locale_sunset = str(weather_data.timestamp_to_locale_time(
-                selected_day["sun"]["set"]))
-            converted_sunset = CustomConvertion().convert_datetime(locale_sunset)
-
-            final_detailled_data = {
-                "date": converted_datetime["date"],
-                "weather": selected_day["weather12H"]["desc"],
-                "weather_icon": selected_day["weather12H"]["icon"],
-                "temperature": {
-                    "min_C": selected_day["T"]["min"],
-                    "max_C": selected_day["T"]["max"],
-                    "min_F": CustomConvertion().convert_temp_in_farhenheit(
-                        selected_day["T"]["min"]
-                    ),
-                    "max_F": CustomConvertion().convert_temp_in_farhenheit(
-                        selected_day["T"]["max"]
-                    )
-                },
-                "humidity": {"min": selected_day["humidity"]["min"], "max": selected_day["humidity"]["max"]},
-                "uv": selected_day["uv"],
-                "sunrise": converted_sunrise["hour"],
-                "sunset": converted_sunset["hour"],
-                "sea_level": selected_day_details["sea_level"],
-                "wind": {
-                    "speed_kmh": selected_day_details["wind"]["speed"],
-                    "speed_mph": CustomConvertion().convert_wind_speed(selected_day_details["wind"]["speed"]),
-                    "direction": CustomConvertion().convert_wind_direction(selected_day_details["wind"]["direction"])
-                },
-                "rain": selected_day_details.get("rain", {}).get("6h"),
-                "iso0": {
-                    "meters": selected_day_details["iso0"],
-                    "feet": CustomConvertion().convert_meters_to_feet(selected_day_details["iso0"])
-                }
-            }
-            return response.Response(
-                {"data": final_detailled_data, "url_icon": url_icon}, status=status.HTTP_200_OK)
+            validators = forecast_validators(request, lat, lon, weather_data, is_stale)
+            not_modified = not_modified_response(request, validators)
+            if not_modified:
+                return not_modified
+            return add_cache_headers(response.Response(
+                build_weather_response(build_forecast_details(weather_data, day_id), is_stale),
+                status=status.HTTP_200_OK), validators)
+        except UpstreamUnavailableError as e:
+            return response.Response({"error": str(e)}, status.HTTP_503_SERVICE_UNAVAILABLE)
         except Exception as e:
             return response.Response({"error": str(e)}, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def get_all_days(self, lat, lon, days):
+        """
+        Get weather data details for several days from one forecast.
+        """
+        try:
+            weather_data, is_stale = get_forecast_or_last_good(lat, lon)
+            try:
+                output_data = build_all_forecast_details(weather_data, days)
+            except ValueError:
+                return response.Response({"error": INVALID_DAYS_MESSAGE}, status=status.HTTP_400_BAD_REQUEST)
+            validators = forecast_validators(self.request, lat, lon, weather_data, is_stale)
+            not_modified = not_modified_response(self.request, validators)
+            if not_modified:
+                return not_modified
+
+            return add_cache_headers(response.Response(
+                build_weather_response(output_data, is_stale), status=status.HTTP_200_OK), validators)
+        except UpstreamUnavailableError as e:
+            return response.Response({"error": str(e)}, status.HTTP_503_SERVICE_UNAVAILABLE)
+        except Exception as e:
+            return response.Response({"error": str(e)}, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class WeatherHourlyView(GenericAPIView):
+    """
+    Retreive hourly weather data, paged.
+    Using Meteofrance API.
+    """
+    serializer_class = HourlyForecastSerializer
+    permission_classes = [AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        """
+        Get hourly weather data from coordinates, in a time range,
+        with selected fields. Response is streamed.
+        """
+        lat, lon = get_coordinates(kwargs)
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        query = serializer.validated_data
+        fields = query.get("fields") or HOURLY_FIELDS
+        page, page_size = query["page"], query["page_size"]
+        try:
+            weather_data, is_stale = get_forecast_or_last_good(lat, lon)
+        except UpstreamUnavailableError as e:
+            return response.Response({"error": str(e)}, status.HTTP_503_SERVICE_UNAVAILABLE)
+        except Exception as e:
+            return response.Response({"error": str(e)}, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        first = 0
+        last = weather_data.hourly_count
+        if "start" in query:
+            first = int(np.searchsorted(weather_data.hourly_dt, query["start"].timestamp(), side="left"))
+        if "end" in query:
+            last = int(np.searchsorted(weather_data.hourly_dt, query["end"].timestamp(), side="left"))
+        count = max(last - first, 0)
+        page_first = first + (page - 1) * page_size
+        rows = range(page_first, min(page_first + page_size, last))
+        if page > 1 and not rows:
+            return response.Response({"error": "Invalid page."}, status.HTTP_404_NOT_FOUND)
+
+        validators = forecast_validators(request, lat, lon, weather_data, is_stale)
+        not_modified = not_modified_response(request, validators)
+        if not_modified:
+            return not_modified
+        url = request.build_absolute_uri()
+        header = {
+            "count": count,
+            "page": page,
+            "next": replace_query_param(url, "page", page + 1) if rows.stop < last else None,
+            "previous": replace_query_param(url, "page", page - 1) if page > 1 else None,
+            "url_icon": URL_ICON,
+        }
+        if is_stale:
+            header["stale"] = True
+        return add_cache_headers(StreamingHttpResponse(
+            stream_hourly_response(header, weather_data, rows, fields,
+                                   settings.WEATHER_HOURLY["STREAM_CHUNK"]),
+            content_type="application/json",
+        ), validators)
+
+
+class WeatherBatchView(GenericAPIView):
+    """
+    Retreive weather data for many locations.
+    Using Meteofrance API.
+    """
+    serializer_class = WeatherBatchSerializer
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        """
+        Get weather data from a list of coordinates.
+        Locations in the same grid cell are fetched once,
+        others are fetched in parallel.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        locations = serializer.validated_data["locations"]
+
+        grid_keys = [snap_to_grid(location["lat"], location["lon"])
+                     for location in locations]
+        futures = {
+            grid_key: batch_executor.submit(batch_get_forecast_or_last_good, *grid_key)
+            for grid_key in dict.fromkeys(grid_keys)
+        }
+
+        results = []
+        for location, grid_key in zip(locations, grid_keys):
+            item = {"lat": location["lat"], "lon": location["lon"]}
+            try:
+                weather_data, is_stale = futures[grid_key].result()
+                item["data"] = build_daily_forecast(weather_data)
+                if is_stale:
+                    item["stale"] = True
+            except Exception as e:
+                item["error"] = str(e)
+            results.append(item)
+
+        return response.Response(
+            {"data": results, "url_icon": URL_ICON}, status=status.HTTP_200_OK)
+
+
+class ActivityWeatherView(GenericAPIView):
+    """
+    Retreive best weather windows of activities at a location.
+    Using Meteofrance API.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        """
+        Get best time windows over the forecast of all activities,
+        or of one activity with activity query parameter.
+        """
+        lat, lon = get_coordinates(kwargs)
+        activities = Activities.objects.order_by("id")
+        activity_id = request.query_params.get("activity")
+        if activity_id is not None:
+            if not activity_id.isdigit():
+                return response.Response({"error": "Invalid activity ID"}, status=status.HTTP_400_BAD_REQUEST)
+            activities = activities.filter(id=int(activity_id))
+        activities = list(activities)
+        if not activities:
+            return response.Response({"error": "Activity not found."}, status.HTTP_404_NOT_FOUND)
+        try:
+            weather_data, is_stale = get_forecast_or_last_good(lat, lon)
+            content = {"data": score_activities(weather_data, activities)}
+            if is_stale:
+                content["stale"] = True
+            return response.Response(content, status=status.HTTP_200_OK)
+        except UpstreamUnavailableError as e:
+            return response.Response({"error": str(e)}, status.HTTP_503_SERVICE_UNAVAILABLE)
+        except Exception as e:
+            return response.Response({"error": str(e)}, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class WeatherCacheStatsView(GenericAPIView):
+    """
+    Retreive forecast cache, circuit breakers and upstream calls counters.
+    Special permissions for staff users.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        """
+        Get forecast cache hits, misses and size, circuit breakers states,
+        upstream calls usage against quotas and popular locations warming.
+        """
+        return response.Response({
+            "data": forecast_cache.stats(),
+            "circuit_breakers": {
+                "meteofrance": meteofrance_breaker.stats(),
+                "openweathermap": openweathermap_breaker.stats(),
+            },
+            "upstream": upstream_ledger.stats(),
+            "popularity": location_popularity.stats(),
+        }, status=status.HTTP_200_OK)
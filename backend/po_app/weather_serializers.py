@@ -0,0 +1,99 @@
+from django.conf import settings
+from rest_framework import serializers
+import math
+
+HOURLY_FIELDS = [
+    "temperature",
+    "humidity",
+    "sea_level",
+    "wind",
+    "rain",
+    "snow",
+    "iso0",
+    "clouds",
+    "weather",
+]
+
+
+class CoordinatesSerializer(serializers.Serializer):
+    """
+    Serializer for coordinates:
+    - lat : Latitude, between -90 and 90.
+    - lon : Longitude, between -180 and 180.
+    """
+    lat = serializers.FloatField(
+        required=True,
+        min_value=-90,
+        max_value=90,
+    )
+    lon = serializers.FloatField(
+        required=True,
+        min_value=-180,
+        max_value=180,
+    )
+
+    def validate(self, data):
+        """
+        Reject NaN coordinates, which pass range checks.
+        """
+        for key in ("lat", "lon"):
+            if math.isnan(data[key]):
+                raise serializers.ValidationError({key: "A valid number is required."})
+        return data
+
+
+class WeatherBatchSerializer(serializers.Serializer):
+    """
+    Serializer for weather batch request:
+    - locations : List of coordinates.
+    """
+    locations = serializers.ListField(
+        child=CoordinatesSerializer(),
+        required=True,
+        allow_empty=False,
+        max_length=settings.WEATHER_BATCH["MAX_LOCATIONS"],
+    )
+
+
+class HourlyForecastSerializer(serializers.Serializer):
+    """
+    Serializer for hourly forecast query parameters:
+    - start : Only hours from this datetime.
+    - end : Only hours before this datetime.
+    - fields : Comma separated fields to return, all by default.
+    - page : Page number, from 1.
+    - page_size : Number of hours per page.
+    """
+    start = serializers.DateTimeField(required=False)
+    end = serializers.DateTimeField(required=False)
+    fields = serializers.CharField(required=False)
+    page = serializers.IntegerField(
+        required=False,
+        default=1,
+        min_value=1,
+    )
+    page_size = serializers.IntegerField(
+        required=False,
+        default=settings.WEATHER_HOURLY["PAGE_SIZE"],
+        min_value=1,
+        max_value=settings.WEATHER_HOURLY["MAX_PAGE_SIZE"],
+    )
+
+    def validate_fields(self, value):
+        """
+        Check fields are hourly forecast fields.
+        """
+        fields = [field.strip() for field in value.split(",") if field.strip()]
+        invalid = [field for field in fields if field not in HOURLY_FIELDS]
+        if invalid:
+            raise serializers.ValidationError(
+                f"Invalid fields: {', '.join(invalid)}. Available fields: {', '.join(HOURLY_FIELDS)}.")
+        return fields
+
+    def validate(self, data):
+        """
+        Check time range.
+        """
+        if "start" in data and "end" in data and data["end"] <= data["start"]:
+            raise serializers.ValidationError("End must be after start.")
+        return data